@@ -0,0 +1,107 @@
+"""CPU time and memory of a monitoring snapshot per unit and poll.
+
+Compares the slotted `MonitoringState` that is decoded straight from the register buffers with the previous
+approach of decoding both blocks into plain dataclasses and merging them with `dataclasses.asdict`.
+
+Usage: python benchmarks/monitoring_state.py
+"""
+
+import dataclasses
+import gc
+import struct
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.append(str((Path(__file__) / "../../custom_components").resolve()))
+
+from komfovent_c5 import api  # noqa: E402
+
+UNITS = api.FlowUnits.CUBIC_METER_PER_HOUR
+IS_EXTENDED = True
+SNAPSHOTS = 1_000
+
+
+def _plain(cls: type) -> type:
+    # what the state classes looked like before: no slots
+    return dataclasses.make_dataclass(
+        f"Plain{cls.__name__}",
+        [(field.name, field.type) for field in dataclasses.fields(cls)],
+        kw_only=True,
+    )
+
+
+PlainBlock1 = _plain(api.monitoring.MonitoringStateBlock1)
+PlainBlock2 = _plain(api.monitoring.MonitoringStateBlock2)
+PlainState = _plain(api.MonitoringState)
+
+
+def _buffers() -> tuple[bytes, bytes]:
+    rng1 = api.MONITORING_BLOCK1.range(is_extended=IS_EXTENDED)
+    rng2 = api.MONITORING_BLOCK2.range(is_extended=False)
+    # zero decodes to a valid value everywhere, block 2 starts with the counter configuration (all enabled)
+    return bytes(2 * rng1.count), struct.pack(">H", 0x1FF) + bytes(2 * rng2.count - 2)
+
+
+def decode_combined(buffer1: bytes, buffer2: bytes) -> Any:
+    block1 = PlainBlock1(
+        **api.MONITORING_BLOCK1.unpack(buffer1, is_extended=IS_EXTENDED)
+    )
+    block2 = PlainBlock2(**api.MONITORING_BLOCK2.unpack(buffer2, is_extended=False))
+    return PlainState(**dataclasses.asdict(block1), **dataclasses.asdict(block2))
+
+
+def decode_snapshot(buffer1: bytes, buffer2: bytes) -> Any:
+    return api.MonitoringState.from_buffers(
+        buffer1, buffer2, units=UNITS, is_extended=IS_EXTENDED
+    )
+
+
+def _cpu(decode: Any, buffer1: bytes, buffer2: bytes) -> float:
+    timer = timeit.Timer(lambda: decode(buffer1, buffer2))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def _memory(decode: Any, buffer1: bytes, buffer2: bytes) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    snapshots = [decode(buffer1, buffer2) for _ in range(SNAPSHOTS)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshots
+    return (after - before) / SNAPSHOTS
+
+
+def run() -> dict[str, dict[str, float]]:
+    buffer1, buffer2 = _buffers()
+    return {
+        name: {
+            "cpu_us": 1e6 * _cpu(decode, buffer1, buffer2),
+            "memory_bytes": _memory(decode, buffer1, buffer2),
+        }
+        for name, decode in (
+            ("combined", decode_combined),
+            ("snapshot", decode_snapshot),
+        )
+    }
+
+
+def main() -> None:
+    results = run()
+    for name, result in results.items():
+        sys.stdout.write(
+            f"{name:<10} {result['cpu_us']:8.2f} us/poll {result['memory_bytes']:8.0f} bytes/unit\n"
+        )
+    combined, snapshot = results["combined"], results["snapshot"]
+    sys.stdout.write(
+        f"saved      {combined['cpu_us'] - snapshot['cpu_us']:8.2f} us/poll "
+        f"{combined['memory_bytes'] - snapshot['memory_bytes']:8.0f} bytes/unit\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Benchmarks of the decoders, a full poll cycle and the write paths of the services.
+
+The IO benchmarks run against the simulator from the tests (`tests/simulator.py`) over a local TCP connection.
+Every benchmark reports the wall time, the allocated bytes and, if it talks to the device, the number
+of Modbus transactions per operation.
+
+Usage:
+    python benchmarks/suite.py                          # run and print the results
+    python benchmarks/suite.py --save baseline.json     # also save them as a baseline
+    python benchmarks/suite.py --compare baseline.json  # fail if something regressed against the baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import gc
+import json
+import multiprocessing
+import struct
+import sys
+import time
+import timeit
+import tracemalloc
+from collections.abc import Awaitable, Callable, Iterator
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any
+
+ROOT_PATH = (Path(__file__) / "../..").resolve()
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / "custom_components"))
+
+from komfovent_c5 import KomfoventState, api  # noqa: E402
+
+from tests.simulator import Simulator  # noqa: E402
+
+UNITS = api.FlowUnits.CUBIC_METER_PER_HOUR
+IS_EXTENDED = True
+# round trip of a unit on the local network
+DEFAULT_LATENCY = 0.002
+# relative slowdown that counts as a regression, timings are noisy
+DEFAULT_THRESHOLD = 0.25
+IO_ITERATIONS = 20
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class Result:
+    # wall time per operation
+    time_us: float
+    # bytes allocated per operation, the peak for operations that talk to the device
+    alloc_bytes: float
+    # Modbus transactions per operation, 'None' for pure decoding
+    transactions: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+def _alloc_bytes(func: Callable[[], Any], number: int = 1_000) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    # keep the results alive, otherwise the memory is reused right away
+    results = [func() for _ in range(number)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return (after - before) / number
+
+
+def _bench_decode(func: Callable[[], Any]) -> Result:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=5, number=number)) / number
+    return Result(time_us=1e6 * seconds, alloc_bytes=_alloc_bytes(func))
+
+
+def decode_benchmarks() -> dict[str, Result]:
+    rng = api.MONITORING_BLOCK1.range(is_extended=IS_EXTENDED)
+    block1 = [0] * rng.count
+    name = list(struct.unpack(">12H", b"Komfovent C5 unit\0\0\0\0\0\0\0"[:24]))
+    entry = api.AlarmHistoryEntry.NUM_REGISTERS
+    # 2024-05-17 13:37:42, alarm 4
+    history = [2024, 0x0511, 0x0D25, 42, 4] * api.Alarms.MAX_HISTORY_ALERTS
+    assert len(history) == entry * api.Alarms.MAX_HISTORY_ALERTS
+
+    return {
+        "decode.monitoring_block1": _bench_decode(
+            lambda: api.monitoring.MonitoringStateBlock1.consume_from_registers(
+                iter(block1), units=UNITS, is_extended=IS_EXTENDED
+            )
+        ),
+        "decode.string": _bench_decode(
+            lambda: api.client.consume_string(iter(name), len(name))
+        ),
+        "decode.alarm_history": _bench_decode(
+            lambda: api.AlarmHistoryEntry.consume_list_from_registers(
+                api.Alarms.MAX_HISTORY_ALERTS, iter(history)
+            )
+        ),
+    }
+
+
+async def _bench_io(
+    client: api.Client, operation: Callable[[], Awaitable[Any]]
+) -> Result:
+    transactions = 0
+
+    def count(_transaction: api.Transaction) -> None:
+        nonlocal transactions
+        transactions += 1
+
+    remove_listener = client.add_transaction_listener(count)
+    try:
+        # warm up, the first request also probes the read size
+        await operation()
+        transactions = 0
+        start = time.perf_counter()
+        for _ in range(IO_ITERATIONS):
+            await operation()
+        elapsed = time.perf_counter() - start
+        operations = transactions / IO_ITERATIONS
+
+        # allocations of the event loop and the transport are part of the cost, they're mostly freed
+        # by the time the operation returns so the peak is what counts. It includes the 256 KiB buffer
+        # the event loop receives into, which is the same for every operation.
+        gc.collect()
+        tracemalloc.start()
+        allocated = 0
+        for _ in range(IO_ITERATIONS):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await operation()
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - before
+        tracemalloc.stop()
+    finally:
+        remove_listener()
+    return Result(
+        time_us=1e6 * elapsed / IO_ITERATIONS,
+        alloc_bytes=allocated / IO_ITERATIONS,
+        transactions=operations,
+    )
+
+
+def _simulate(connection: Connection, latency: float) -> None:
+    async def serve() -> None:
+        async with Simulator(latency=latency, seed=0) as simulator:
+            connection.send(simulator.port)
+            # until the benchmarks are done
+            await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+
+    asyncio.run(serve())
+
+
+@contextlib.contextmanager
+def _simulator(*, latency: float) -> Iterator[int]:
+    """Run the simulator in its own process, so neither its time nor its allocations are measured."""
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=_simulate, args=(child_connection, latency), daemon=True
+    )
+    process.start()
+    try:
+        yield connection.recv()
+    finally:
+        connection.send(None)
+        process.join()
+
+
+async def io_benchmarks(*, port: int) -> dict[str, Result]:
+    client = api.Client(host="127.0.0.1", port=port)
+    await client.connect()
+    modes = api.Modes(client)
+    special = modes.mode_registers(api.OperationMode.SPECIAL)
+
+    async def poll_cycle() -> None:
+        await KomfoventState.read(
+            client, units=UNITS, is_extended=IS_EXTENDED, tiers=set(api.PollTier)
+        )
+
+    async def set_special_mode_config() -> None:
+        flags = await special.configuration()
+        await special.set_configuration(flags ^ api.ConfigurationFlags.COOLING)
+
+    try:
+        return {
+            "poll.full_cycle": await _bench_io(client, poll_cycle),
+            "write.setpoint_temperature": await _bench_io(
+                client, lambda: special.set_setpoint_temperature(21.5)
+            ),
+            "write.mode_preset": await _bench_io(
+                client,
+                lambda: special.apply(
+                    supply_flow=300, extract_flow=300, setpoint_temperature=20.0
+                ),
+            ),
+            "write.special_mode_config": await _bench_io(
+                client, set_special_mode_config
+            ),
+            "write.operation_mode": await _bench_io(
+                client, lambda: modes.set_operation_mode(api.OperationMode.COMFORT1)
+            ),
+            "write.reset_active_alarms": await _bench_io(
+                client, api.Alarms(client).reset_active
+            ),
+        }
+    finally:
+        await client.disconnect()
+
+
+def run(*, latency: float) -> dict[str, Result]:
+    with _simulator(latency=latency) as port:
+        return {
+            **decode_benchmarks(),
+            **asyncio.run(io_benchmarks(port=port)),
+        }
+
+
+def compare(
+    results: dict[str, Result], baseline: dict[str, dict[str, Any]], *, threshold: float
+) -> list[str]:
+    """Get a description of every regression against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result.time_us > previous["time_us"] * (1.0 + threshold):
+            regressions.append(
+                f"{name}: {result.time_us:.1f} us, was {previous['time_us']:.1f} us"
+            )
+        if result.alloc_bytes > previous["alloc_bytes"] * (1.0 + threshold):
+            regressions.append(
+                f"{name}: {result.alloc_bytes:.0f} bytes, was {previous['alloc_bytes']:.0f} bytes"
+            )
+        # the number of round trips is deterministic, any increase counts
+        if (
+            result.transactions is not None
+            and previous.get("transactions") is not None
+            and result.transactions > previous["transactions"]
+        ):
+            regressions.append(
+                f"{name}: {result.transactions:g} transactions, was {previous['transactions']:g}"
+            )
+    return regressions
+
+
+def _format(name: str, result: Result, previous: dict[str, Any] | None) -> str:
+    line = f"{name:<30} {result.time_us:10.1f} us {result.alloc_bytes:10.0f} B"
+    if result.transactions is not None:
+        line += f" {result.transactions:6g} tx"
+    if previous is not None:
+        line += f"  ({result.time_us / previous['time_us'] - 1.0:+.0%} time)"
+    return line + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", type=Path, help="save the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=DEFAULT_LATENCY,
+        help="response time of the simulated unit in seconds",
+    )
+    args = parser.parse_args()
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+
+    results = run(latency=args.latency)
+    for name, result in results.items():
+        sys.stdout.write(_format(name, result, baseline.get(name)))
+
+    if args.save is not None:
+        args.save.write_text(
+            json.dumps(
+                {name: result.as_dict() for name, result in results.items()}, indent=2
+            )
+            + "\n"
+        )
+
+    regressions = compare(results, baseline, threshold=args.threshold)
+    for regression in regressions:
+        sys.stdout.write(f"regression: {regression}\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,96 @@
 import dataclasses
 import logging
-from datetime import timedelta
-from typing import Any
+import math
+import shutil
+import time
+from collections.abc import Callable, Collection
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, ClassVar
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
+    UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
 from . import api, services
-from .const import DOMAIN, PLATFORMS
+from .const import (
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_PIPELINE_DEPTH,
+    CONF_SNAPSHOT_RETENTION,
+    CONF_UNIT_ID,
+    CONF_WRITE_DEBOUNCE,
+    DATA_TRANSPORTS,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_PIPELINE_DEPTH,
+    DEFAULT_SNAPSHOT_RETENTION,
+    DEFAULT_UNIT_ID,
+    DEFAULT_WRITE_DEBOUNCE,
+    DOMAIN,
+    PLATFORMS,
+)
+from .identity import DeviceIdentity, IdentityStore
 
 _LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.empty_config_schema(DOMAIN)  # type: ignore
 
+# The coordinator runs at the rate of the fast tier, the other tiers are only read when they're due.
+# The fast tier follows the adaptive poll interval, see 'KomfoventCoordinator'.
+POLL_INTERVALS: dict[api.PollTier, timedelta] = {
+    api.PollTier.SLOW: timedelta(minutes=5),
+    # Configuration is re-read after every write and whenever the active mode changes.
+    # Changes made on the control panel are only picked up by this fallback.
+    api.PollTier.CONFIG: timedelta(minutes=15),
+}
+UPDATE_INTERVAL = timedelta(seconds=DEFAULT_MIN_POLL_INTERVAL)
+# reads of the identity after a poll until it's accepted as is, a unit might never report its firmware version
+_IDENTITY_ATTEMPTS = 3
+# Point reads of configuration registers are served from the last poll while it's fresh.
+# Command registers (like the VAV status, which starts a calibration when written) are left out.
+_CACHE_TTL_SECONDS = 30.0
+CACHE_TTL = [
+    (api.RegisterRange(api.Modes.REG_AHU_ON, 1), _CACHE_TTL_SECONDS),
+    (
+        api.RegisterRange(
+            api.Modes.REG_OPERATION_MODE,
+            api.Modes.REG_VAV_STATUS - api.Modes.REG_OPERATION_MODE,
+        ),
+        _CACHE_TTL_SECONDS,
+    ),
+    (
+        api.RegisterRange(
+            api.Modes.REG_VAV_SENSORS_RANGE,
+            (api.Modes.REG_NOMINAL_EXHAUST_PRESSURE - api.Modes.REG_VAV_SENSORS_RANGE)
+            + 1,
+        ),
+        _CACHE_TTL_SECONDS,
+    ),
+    (
+        api.RegisterRange(
+            api.Functions.REG_AQC_SETPOINT1,
+            (api.Functions.REG_OCV_STATE - api.Functions.REG_AQC_SETPOINT1) + 1,
+        ),
+        _CACHE_TTL_SECONDS,
+    ),
+]
+
 
 async def async_setup(hass: HomeAssistant, _config: Any) -> bool:
     hass.data[DOMAIN] = {}
+    hass.data[DATA_TRANSPORTS] = api.TransportRegistry()
     await services.register(hass)
     return True
 
@@ -37,19 +104,159 @@ class KomfoventState:
     monitoring: api.MonitoringState
 
     @classmethod
-    async def read_all(
-        cls, client: api.Client, settings: api.SettingsState, *, is_extended: bool
-    ):
+    async def read(
+        cls,
+        client: api.Client,
+        *,
+        units: api.FlowUnits,
+        is_extended: bool,
+        tiers: Collection[api.PollTier],
+        previous: "KomfoventState | None" = None,
+        on_image: Callable[[api.RegisterImage], None] | None = None,
+    ) -> "KomfoventState":
+        """Read the given tiers, everything else is taken from `previous`.
+
+        Without a previous state all tiers have to be read. `on_image` receives the raw registers of the read.
+        """
+        assert previous is not None or tiers == set(api.PollTier)
         alarms = api.Alarms(client)
-        return cls(
-            active_alarms=await alarms.read_active(),
-            alarm_history_count=await alarms.read_history_count(),
-            functions=await api.Functions(client).read_all(),
-            modes=await api.Modes(client).read_all(is_extended=is_extended),
-            monitoring=await api.Monitoring(client).read_all(
-                units=settings.flow_units, is_extended=is_extended
-            ),
+        functions = api.Functions(client)
+        modes = api.Modes(client)
+        monitoring = api.Monitoring(client)
+
+        # all due tiers are read in one planned batch so adjacent ranges share a transaction
+        image = await client.read_ranges(
+            cls.plan(client, tiers=tiers, is_extended=is_extended)
         )
+        if on_image is not None:
+            on_image(image)
+
+        changes: dict[str, Any] = {}
+        if api.PollTier.FAST in tiers:
+            changes["active_alarms"] = alarms.decode_active(image)
+        if api.PollTier.SLOW in tiers:
+            changes["alarm_history_count"] = alarms.decode_history_count(image)
+        if api.PollTier.FAST in tiers or api.PollTier.SLOW in tiers:
+            changes["monitoring"] = monitoring.decode_all(
+                image,
+                units=units,
+                is_extended=is_extended,
+                previous=previous.monitoring if previous is not None else None,
+                block1=api.PollTier.FAST in tiers,
+                block2=api.PollTier.SLOW in tiers,
+            )
+        if api.PollTier.CONFIG in tiers:
+            changes["functions"] = functions.decode_all(image)
+            changes["modes"] = modes.decode_all(image, is_extended=is_extended)
+
+        if previous is None:
+            return cls(**changes)
+        return dataclasses.replace(previous, **changes)
+
+    @staticmethod
+    def plan(
+        client: api.Client, *, tiers: Collection[api.PollTier], is_extended: bool
+    ) -> list[api.RegisterRange]:
+        plan: list[api.RegisterRange] = []
+        if api.PollTier.FAST in tiers:
+            plan += api.Alarms(client).plan_active()
+            plan += api.Monitoring(client).plan_block1(is_extended=is_extended)
+        if api.PollTier.SLOW in tiers:
+            plan += api.Alarms(client).plan_history_count()
+            plan += api.Monitoring(client).plan_block2()
+        if api.PollTier.CONFIG in tiers:
+            plan += api.Functions(client).plan_all()
+            plan += api.Modes(client).plan_all(is_extended=is_extended)
+        return plan
+
+
+# monitoring values that only change when something happens
+_ACTIVITY_FIELDS = (
+    "c5_status",
+    "mode",
+    "temp_setpoint",
+    "supply_air_temp_setpoint",
+    "supply_flow_setpoint",
+    "extract_flow_setpoint",
+    "ovr_input",
+    "fire_system_input",
+    "external_stop_input",
+    "control_input",
+    "water_heater_pump",
+    "water_cooler_pump",
+)
+# measured monitoring values, small movements are just noise
+_MEASURED_FIELDS = (
+    "supply_flow",
+    "exhaust_flow",
+    "supply_temp",
+    "extract_temp",
+    "outdoor_temp",
+    "exhaust_temp",
+    "supply_fan_level",
+    "exhaust_fan_level",
+    "heat_exchanger_level",
+    "electric_heater_level",
+    "water_heater_level",
+    "water_cooler_level",
+)
+_MEASURED_REL_TOLERANCE = 0.05
+_MEASURED_ABS_TOLERANCE = 0.5
+
+
+def _has_activity(reference: KomfoventState, state: KomfoventState) -> bool:
+    if state.active_alarms != reference.active_alarms:
+        return True
+    for name in _ACTIVITY_FIELDS:
+        if getattr(state.monitoring, name) != getattr(reference.monitoring, name):
+            return True
+    for name in _MEASURED_FIELDS:
+        if not math.isclose(
+            getattr(state.monitoring, name),
+            getattr(reference.monitoring, name),
+            rel_tol=_MEASURED_REL_TOLERANCE,
+            abs_tol=_MEASURED_ABS_TOLERANCE,
+        ):
+            return True
+    return False
+
+
+# register behind each state value that entities write, see 'KomfoventCoordinator.async_written'
+_WRITABLE_FIELDS: dict[str, api.Field] = {
+    "modes.ahu": api.AHU_ON,
+    "modes.operation_mode": api.MODES_BLOCK["operation_mode"],
+    "modes.flow_control_mode": api.MODES_BLOCK["flow_control_mode"],
+    "modes.temperature_control_mode": api.MODES_BLOCK["temperature_control_mode"],
+    "functions.ocv_enabled": api.FUNCTIONS_BLOCK["ocv_enabled"],
+}
+_WRITABLE_REGISTERS = frozenset(
+    address
+    for field in _WRITABLE_FIELDS.values()
+    for address in range(field.address, field.address + field.count)
+)
+
+
+def _changed_fields(previous: KomfoventState, state: KomfoventState) -> frozenset[str]:
+    """Get the names of the fields that differ, nested fields are included as "monitoring.supply_temp"."""
+    changed: set[str] = set()
+    for field in dataclasses.fields(state):
+        old = getattr(previous, field.name)
+        new = getattr(state, field.name)
+        # tiers that weren't read keep the previous object
+        if old is new:
+            continue
+        if dataclasses.is_dataclass(new) and type(old) is type(new):
+            nested = {
+                f"{field.name}.{nested_field.name}"
+                for nested_field in dataclasses.fields(new)
+                if getattr(old, nested_field.name) != getattr(new, nested_field.name)
+            }
+            if nested:
+                changed.add(field.name)
+                changed.update(nested)
+        elif old != new:
+            changed.add(field.name)
+    return frozenset(changed)
 
 
 class KomfoventCoordinator(DataUpdateCoordinator[KomfoventState]):
@@ -58,88 +265,400 @@ class KomfoventCoordinator(DataUpdateCoordinator[KomfoventState]):
     def __init__(
         self,
         hass: HomeAssistant,
+        entry: ConfigEntry,
         client: api.Client,
+        *,
+        min_interval: timedelta = UPDATE_INTERVAL,
+        max_interval: timedelta = timedelta(seconds=DEFAULT_MAX_POLL_INTERVAL),
+        snapshot_retention: timedelta | None = None,
     ) -> None:
         super().__init__(
             hass,
             logger=_LOGGER,
+            config_entry=entry,
             name=DOMAIN,
-            update_interval=timedelta(seconds=30),
+            update_interval=min_interval,
         )
         self.__client = client
-        self.__settings: api.SettingsState | None = None
-        self.__is_extended = False
+        self.__identity_store = IdentityStore(hass, entry.entry_id)
+        self.__identity: DeviceIdentity | None = None
+        # a cached identity is checked against the device once it's reachable
+        self.__identity_verified = False
+        self.__identity_attempts = 0
+        self.__revalidating = False
+        # written registers that 'async_written' hasn't confirmed yet
+        self.__unconfirmed: set[int] = set()
+        self.__schedule = api.PollSchedule(
+            {
+                # read with every poll, the coordinator's interval is the one that counts
+                api.PollTier.FAST: 0.0,
+                **{
+                    tier: interval.total_seconds()
+                    for tier, interval in POLL_INTERVALS.items()
+                },
+            }
+        )
+        # backs off while the unit is stopped or nothing changes
+        self.__interval = api.AdaptiveInterval(
+            min_interval=min_interval.total_seconds(),
+            max_interval=max_interval.total_seconds(),
+        )
+        # state at the last poll that showed any activity
+        self.__activity_reference: KomfoventState | None = None
+        self.__changed_fields: frozenset[str] | None = None
+        # recent samples of the monitoring values for window queries without going through the recorder
+        self.__history = api.MonitoringHistory()
+        # only the entries added since the last read are fetched
+        self.__alarm_history = api.AlarmHistory(client)
+        # opt-in store of the raw registers, opened once the layout is known from the identity
+        self.__snapshot_retention = snapshot_retention
+        self.__snapshots: api.SnapshotStore | None = None
+        # writes can change any of the configuration, not just the register that was written
+        self.__remove_transaction_listener = client.add_transaction_listener(
+            self.__on_transaction
+        )
 
         host, port = client.host_and_port
-        self.host_id = f"{host}:{port}"
+        self.host_id = f"{host}:{port}/{client.unit}"
+        # every unit polls in its own slot of the interval, see 'api.delay_until_slot'
+        self.__phase = api.poll_phase(self.host_id)
 
     @property
     def client(self) -> api.Client:
         return self.__client
 
     @property
-    def settings_state(self) -> api.SettingsState:
-        assert self.__settings
-        return self.__settings
+    def identity(self) -> DeviceIdentity:
+        assert self.__identity
+        return self.__identity
 
     @property
     def device_info(self) -> DeviceInfo:
-        assert self.__device_info
-        return self.__device_info
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.identity.serial_number)},
+            name=self.identity.name,
+            configuration_url=f"http://{self.__client.host_and_port[0]}",
+            manufacturer="KOMFOVENT",
+            sw_version=self.identity.sw_version,
+        )
+
+    @property
+    def changed_fields(self) -> frozenset[str] | None:
+        """Fields of the state that changed with the last update, 'None' if everything has to be considered changed."""
+        return self.__changed_fields
+
+    @property
+    def history(self) -> api.MonitoringHistory:
+        return self.__history
+
+    @property
+    def alarm_history(self) -> api.AlarmHistory:
+        return self.__alarm_history
 
     async def _async_update_data(self) -> KomfoventState:
-        await self.__client.connect()
-        return await KomfoventState.read_all(
-            self.client, self.settings_state, is_extended=self.__is_extended
+        # a failed update changes the availability of every entity
+        self.__changed_fields = None
+        previous = self.data
+        if self.__unconfirmed:
+            # written without a confirmation, like by a service call
+            self.__unconfirmed.clear()
+            self.__schedule.invalidate(api.PollTier.CONFIG)
+        tiers = self.__schedule.due()
+        images: list[api.RegisterImage] = []
+        try:
+            await self.__client.connect()
+            state = await KomfoventState.read(
+                self.client,
+                units=self.identity.flow_units,
+                is_extended=self.identity.is_extended,
+                tiers=tiers,
+                previous=previous,
+                on_image=images.append,
+            )
+        except (ConnectionError, api.ModbusError, OSError) as exc:
+            # Includes the fail-fast error while the device is known to be unreachable. The circuit can also
+            # open in the middle of a poll, because of another unit behind the same gateway.
+            raise UpdateFailed(str(exc) or type(exc).__name__) from exc
+        self.__schedule.mark_read(tiers)
+        if self.__snapshot_retention is not None:
+            await self.__async_store_snapshot(images[0])
+        if api.PollTier.FAST in tiers:
+            self.__history.record(state.monitoring)
+        if (
+            previous is not None
+            and api.PollTier.CONFIG not in tiers
+            and (
+                state.monitoring.mode != previous.monitoring.mode
+                or state.monitoring.c5_status != previous.monitoring.c5_status
+            )
+        ):
+            # most likely changed on the control panel or by the scheduler of the unit
+            self.__schedule.invalidate(api.PollTier.CONFIG)
+        self.__adapt_interval(state)
+        if previous is not None and self.last_update_success:
+            self.__changed_fields = _changed_fields(previous, state)
+        self.__revalidate_identity()
+        return state
+
+    def __adapt_interval(self, state: KomfoventState) -> None:
+        changed = self.__activity_reference is None or _has_activity(
+            self.__activity_reference, state
+        )
+        if changed:
+            self.__activity_reference = state
+        self.__set_interval(
+            self.__interval.update(
+                changed=changed, idle=state.monitoring.c5_status == api.C5Status.STOP
+            )
+        )
+
+    def __set_interval(self, interval: float) -> None:
+        # the next refresh is scheduled in the unit's slot of this interval, see '_schedule_refresh'
+        self.update_interval = timedelta(seconds=interval)
+
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll at the start of the unit's slot.
+
+        Replaces the scheduling of 'DataUpdateCoordinator' (as of Home Assistant 2025.2), which truncates the
+        loop clock and adds a random offset of up to half a second. Both would let neighbouring slots overlap.
+        """
+        if self.update_interval is None or self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        # the wall clock keeps the slots of all coordinators in the same frame of reference
+        now = time.time()
+        delay = api.delay_until_slot(
+            self.update_interval.total_seconds(), self.__phase, now=now
+        )
+        self._unsub_refresh = async_track_point_in_utc_time(
+            self.hass, self.__on_slot, dt_util.utc_from_timestamp(now + delay)
         )
 
-    async def _do_init(self) -> None:
-        await self.__client.connect()
-        self.__settings = await api.Settings(self.__client).read_all(is_extended=False)
+    def _reschedule_refresh(self) -> None:
+        """Move the scheduled poll to the unit's slot of the current interval.
+
+        Relies on 'DataUpdateCoordinator' (as of Home Assistant 2025.2) keeping the scheduled refresh in
+        `_unsub_refresh`. It's 'None' while a refresh runs, which schedules the next one itself when it's done.
+        """
+        if self._unsub_refresh is not None:
+            self._schedule_refresh()
+
+    @callback
+    def __on_slot(self, _now: datetime) -> None:
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._handle_refresh_interval(),
+            f"{DOMAIN} poll of {self.host_id}",
+        )
 
-        try:
-            fw_version = await api.Service(self.__client).read_firmware_version()
-            sw_version = f"{fw_version / 1000.0:.3f}"
-        except Exception:
-            _LOGGER.warning("failed to read firmware version", exc_info=True)
-            sw_version = None
-        else:
-            self.__is_extended = api.determine_is_extended(version=fw_version)
+    async def async_written(self, path: str, value: Any) -> None:
+        """Reflect a value that was just written in the state, then confirm it by reading back its register.
 
-        self.__device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.__settings.ahu_serial_number)},
-            name=self.__settings.ahu_name,
-            configuration_url=f"http://{self.__client.host_and_port[0]}",
-            manufacturer="KOMFOVENT",
-            sw_version=sw_version,
+        `path` is the location of the value in the state, like "modes.operation_mode".
+        Falls back to a full refresh if the register can't be read or holds a different value.
+        """
+        field = _WRITABLE_FIELDS[path]
+        self.__unconfirmed.difference_update(
+            range(field.address, field.address + field.count)
+        )
+        if self.data is None:
+            await self.async_request_refresh()
+            return
+        self.__set_optimistic(path, value)
+        try:
+            with self.client.request_priority(api.Priority.INTERACTIVE_READ):
+                confirmed = await self.client.read_field(field, cached=False)
+        except (ConnectionError, TimeoutError, api.ModbusError):
+            _LOGGER.debug("failed to confirm write to %s", path, exc_info=True)
+            self.__schedule.invalidate(api.PollTier.CONFIG)
+            await self.async_request_refresh()
+            return
+        if confirmed != value:
+            _LOGGER.debug("%s is %s after writing %s", path, confirmed, value)
+            self.__schedule.invalidate(api.PollTier.CONFIG)
+            await self.async_request_refresh()
+
+    async def __async_store_snapshot(self, image: api.RegisterImage) -> None:
+        assert self.__snapshot_retention is not None
+        if self.__snapshots is None:
+            self.__snapshots = api.SnapshotStore(
+                snapshot_directory(self.hass, self.config_entry.entry_id),
+                KomfoventState.plan(
+                    self.__client,
+                    tiers=set(api.PollTier),
+                    is_extended=self.identity.is_extended,
+                ),
+                retention=self.__snapshot_retention.total_seconds(),
+            )
+        try:
+            await self.hass.async_add_executor_job(
+                self.__snapshots.append, time.time(), image
+            )
+        except OSError:
+            # troubleshooting data isn't worth failing the update over
+            _LOGGER.warning("failed to store register snapshot", exc_info=True)
+
+    def __set_optimistic(self, path: str, value: Any) -> None:
+        group, name = path.split(".")
+        state = dataclasses.replace(
+            self.data,
+            **{group: dataclasses.replace(getattr(self.data, group), **{name: value})},
+        )
+        self.__changed_fields = frozenset((group, path))
+        self.async_set_updated_data(state)
+
+    def __on_transaction(self, transaction: api.Transaction) -> None:
+        if transaction.operation == "write":
+            written = range(
+                transaction.address, transaction.address + transaction.count
+            )
+            if _WRITABLE_REGISTERS.issuperset(written):
+                # 'async_written' reads back just the written register, the next poll needn't read the whole tier
+                self.__unconfirmed.update(written)
+            else:
+                self.__schedule.invalidate(api.PollTier.CONFIG)
+            # someone is interacting with the unit, keep a close eye on it
+            self.__interval.reset()
+            self.__set_interval(self.__interval.interval)
+            # the next poll might still be a long interval away
+            self._reschedule_refresh()
+
+    def __revalidate_identity(self) -> None:
+        if self.__identity_verified or self.__revalidating:
+            return
+        self.__revalidating = True
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self.__async_revalidate_identity(),
+            f"{DOMAIN} revalidate identity of {self.host_id}",
         )
-        _LOGGER.info("ahu extended: %s", self.__is_extended)
+
+    async def __async_revalidate_identity(self) -> None:
+        assert self.__identity is not None
+        self.__identity_attempts += 1
+        identity: DeviceIdentity | None = None
+        try:
+            with self.__client.request_priority(api.Priority.BULK):
+                identity = await DeviceIdentity.read(self.__client)
+        except Exception:
+            _LOGGER.debug("failed to revalidate the device identity", exc_info=True)
+        finally:
+            self.__revalidating = False
+        if identity is None or identity.firmware_version is None:
+            # without the firmware version the register set is just a guess, it's never persisted
+            if (
+                identity is not None
+                and self.__identity.firmware_version is not None
+                and identity.is_same_device(self.__identity)
+            ):
+                # nothing that can be read differs from the cached identity
+                self.__identity_verified = True
+            elif self.__identity_attempts >= _IDENTITY_ATTEMPTS:
+                _LOGGER.info(
+                    "failed to revalidate the device identity, keeping %s",
+                    self.__identity,
+                )
+                self.__identity_verified = True
+            return
+        self.__identity_verified = True
+        if identity == self.__identity:
+            return
+        _LOGGER.info("device identity changed, reloading: %s", identity)
+        await self.__identity_store.async_save(identity)
+        self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
 
     async def async_config_entry_first_refresh(self) -> None:
+        self.__identity = await self.__identity_store.async_load()
+        if self.__identity is not None:
+            # start right away with what we know, the device doesn't even have to be reachable.
+            # The entities stay unavailable until the first successful poll.
+            await self.async_refresh()
+            return
+
         try:
-            await self._do_init()
+            await self.__client.connect()
+            self.__identity = await DeviceIdentity.read(self.__client)
         except Exception as exc:
             raise ConfigEntryNotReady from exc
+        if self.__identity.firmware_version is None:
+            # kept unverified and out of the store, so it's read again after the next polls
+            _LOGGER.warning(
+                "failed to read the firmware version of %s, assuming the basic register set",
+                self.host_id,
+            )
+        else:
+            self.__identity_verified = True
+            await self.__identity_store.async_save(self.__identity)
         await super().async_config_entry_first_refresh()
 
     async def async_shutdown(self) -> None:
         await super().async_shutdown()
+        self.__remove_transaction_listener()
         await self.client.disconnect()
+        if self.__snapshots is not None:
+            await self.hass.async_add_executor_job(self.__snapshots.close)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
-
-    coordinator = KomfoventCoordinator(hass, api.Client(host=host, port=port))
-    await coordinator.async_config_entry_first_refresh()
+    unit = entry.data.get(CONF_UNIT_ID, DEFAULT_UNIT_ID)
+    pipeline_depth = entry.options.get(CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH)
+    snapshot_retention = entry.options.get(
+        CONF_SNAPSHOT_RETENTION, DEFAULT_SNAPSHOT_RETENTION
+    )
+
+    # all units behind the same gateway share one connection. The first entry decides its settings.
+    registry: api.TransportRegistry = hass.data[DATA_TRANSPORTS]
+    transport = registry.acquire(
+        host=host,
+        port=port,
+        factory=lambda: api.create_transport(
+            host=host,
+            port=port,
+            pipeline_depth=pipeline_depth if pipeline_depth > 1 else None,
+        ),
+    )
+    client = api.Client(
+        host=host,
+        port=port,
+        unit=unit,
+        transport=transport,
+        write_debounce=entry.options.get(CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE),
+        cache_ttl=CACHE_TTL,
+    )
+    coordinator = KomfoventCoordinator(
+        hass,
+        entry,
+        client,
+        min_interval=timedelta(
+            seconds=entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL)
+        ),
+        max_interval=timedelta(
+            seconds=entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+        ),
+        snapshot_retention=timedelta(days=snapshot_retention)
+        if snapshot_retention
+        else None,
+    )
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except BaseException:
+        # every retry of the setup takes another lease on the shared transport
+        await coordinator.async_shutdown()
+        raise
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         coordinator: KomfoventCoordinator | None = hass.data[DOMAIN].pop(entry.entry_id)
@@ -149,19 +668,46 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await IdentityStore(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(
+        shutil.rmtree, snapshot_directory(hass, entry.entry_id), True
+    )
+
+
+def snapshot_directory(hass: HomeAssistant, entry_id: str) -> Path:
+    """Directory of the raw register snapshots of a config entry, read them with 'api.SnapshotReader'."""
+    return Path(hass.config.path(STORAGE_DIR, f"{DOMAIN}.snapshots", entry_id))
+
+
 class KomfoventEntity(CoordinatorEntity[KomfoventCoordinator]):
+    # Fields of the coordinator state that the entity is derived from, like "monitoring.supply_temp" or "modes".
+    # The entity state is only written when one of them changed, 'None' writes it with every update.
+    _state_fields: ClassVar[tuple[str, ...] | None] = None
+
     def __init__(self, coordinator: KomfoventCoordinator) -> None:
         super().__init__(coordinator)
 
-        settings = self.coordinator.settings_state
+        identity = self.coordinator.identity
 
         self._attr_has_entity_name = True
         # legacy unique id format for compatibility
         self._attr_unique_id = (
-            f"{DOMAIN}-{settings.ahu_serial_number}-{type(self).__qualname__}"
+            f"{DOMAIN}-{identity.serial_number}-{type(self).__qualname__}"
         )
         self._attr_device_info = self.coordinator.device_info
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = self.coordinator.changed_fields
+        if (
+            changed is not None
+            and self._state_fields is not None
+            and changed.isdisjoint(self._state_fields)
+        ):
+            return
+        super()._handle_coordinator_update()
+
     @property
     def _active_alarms(self) -> list[api.Alarm]:
         return self.coordinator.data.active_alarms
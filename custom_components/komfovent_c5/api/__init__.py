@@ -1,16 +1,29 @@
-from .client import Client
+from .client import Client, create_transport
 
 # import order matters
 ...
 
+from .adaptive import *  # noqa: E402, F403
 from .alarms import *  # noqa: E402, F403
+from .cache import *  # noqa: E402, F403
 from .functions import *  # noqa: E402, F403
+from .history import *  # noqa: E402, F403
 from .modes import *  # noqa: E402, F403
 from .monitoring import *  # noqa: E402, F403
+from .planner import *  # noqa: E402, F403
+from .polling import *  # noqa: E402, F403
+from .recording import *  # noqa: E402, F403
+from .registers import *  # noqa: E402, F403
+from .scheduler import *  # noqa: E402, F403
 from .service import *  # noqa: E402, F403
 from .settings import *  # noqa: E402, F403
+from .snapshots import *  # noqa: E402, F403
+from .stats import *  # noqa: E402, F403
+from .supervisor import *  # noqa: E402, F403
+from .transport import *  # noqa: E402, F403
+from .write_behind import *  # noqa: E402, F403
 
-_ = Client
+_ = (Client, create_transport)
 
 
 def determine_is_extended(*, version: int) -> bool:
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+
+from .transport import DEFAULT_UNIT, MAX_READ_COUNT, ModbusError, Transport
+
+__all__ = [
+    "AdaptiveReadTransport",
+]
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MIN_READ_COUNT = 8
+# read sizes tried by the probe, largest first
+_PROBE_COUNTS = (MAX_READ_COUNT, 64, 32, 16)
+
+# the standard answer to a read of more registers than the device (or a gateway in front of it) supports
+_ILLEGAL_DATA_VALUE = 0x03
+# the gateway didn't get an answer from the unit, which says nothing about the size of the read
+_GATEWAY_PATH_UNAVAILABLE = 0x0A
+_GATEWAY_TARGET_FAILED = 0x0B
+_GATEWAY_EXCEPTION_CODES = frozenset(
+    (_GATEWAY_PATH_UNAVAILABLE, _GATEWAY_TARGET_FAILED)
+)
+
+
+def _is_size_failure(exc: Exception) -> bool:
+    # timeouts are left out as well, a unit that is briefly offline would shrink the reads for no reason
+    return isinstance(exc, ModbusError) and exc.exception_code == _ILLEGAL_DATA_VALUE
+
+
+class AdaptiveReadTransport(Transport):
+    """Learns the largest read that the device, and any gateway in front of it, reliably answers.
+
+    The first read probes decreasing sizes at `probe_address` and keeps the largest one that gets an answer.
+    Only an "illegal data value" exception counts as a read that is too large. Other exception responses
+    (like "illegal data address") count as an answer, the request made it to the device after all. Without an
+    answer from the device (a timeout or a gateway error) the probe is tried again with the next read.
+    If a read that fits the learned size still fails because of its size, the size is halved and the read is
+    retried in smaller chunks.
+
+    What was learned is forgotten with the connection, the next one might go through a different gateway.
+
+    This sits below the supervisor so that failed probes don't count as connection failures.
+    """
+
+    _inner: Transport
+    _probe_address: int
+    _min_count: int
+    _max_count: int
+    _probed: bool
+    _probe_lock: asyncio.Lock
+
+    def __init__(
+        self,
+        inner: Transport,
+        *,
+        probe_address: int,
+        min_count: int = DEFAULT_MIN_READ_COUNT,
+    ) -> None:
+        self._inner = inner
+        self._probe_address = probe_address
+        self._min_count = min_count
+        self._max_count = inner.max_read_count
+        self._probed = False
+        self._probe_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._inner.connected
+
+    @property
+    def max_read_count(self) -> int:
+        return self._max_count
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        if not self._inner.connected:
+            self._forget()
+        await self._inner.connect(connect_timeout)
+
+    async def close(self) -> None:
+        self._forget()
+        await self._inner.close()
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        if not self._probed:
+            await self._probe(unit)
+
+        if count <= self._max_count:
+            try:
+                return await self._inner.read_holding_registers(
+                    address, count, unit=unit
+                )
+            except Exception as exc:
+                if count <= self._min_count or not _is_size_failure(exc):
+                    raise
+                self._shrink(count)
+
+        end = address + count
+        batches = await asyncio.gather(
+            *(
+                self.read_holding_registers(
+                    start, min(start + self._max_count, end) - start, unit=unit
+                )
+                for start in range(address, end, self._max_count)
+            )
+        )
+        return [register for batch in batches for register in batch]
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._inner.write_register(address, value, unit=unit)
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._inner.write_registers(address, values, unit=unit)
+
+    async def _probe(self, unit: int) -> None:
+        async with self._probe_lock:
+            if self._probed:
+                return
+            counts = [count for count in _PROBE_COUNTS if count <= self._max_count]
+            for count in (*counts, self._min_count):
+                try:
+                    await self._inner.read_holding_registers(
+                        self._probe_address, count, unit=unit
+                    )
+                except ModbusError as exc:
+                    if exc.exception_code in _GATEWAY_EXCEPTION_CODES:
+                        raise
+                    if _is_size_failure(exc):
+                        if count > self._min_count:
+                            continue
+                        # not even the smallest read works, try again with the next read
+                        raise
+                    # any other answer means the request made it to the device
+                self._max_count = count
+                break
+            self._probed = True
+            _LOGGER.debug("reading at most %s registers at once", self._max_count)
+
+    def _forget(self) -> None:
+        self._max_count = self._inner.max_read_count
+        self._probed = False
+
+    def _shrink(self, failed_count: int) -> None:
+        self._max_count = max(self._min_count, min(self._max_count, failed_count // 2))
+        _LOGGER.info(
+            "read of %s registers failed, reading at most %s registers at once",
+            failed_count,
+            self._max_count,
+        )
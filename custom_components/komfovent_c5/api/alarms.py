@@ -1,12 +1,20 @@
 import dataclasses
+import struct
 from collections.abc import Iterator
 from datetime import datetime
 
 from .alarms_db import code_str_from_code, message_for_code
-from .client import Client, consume_u8_couple, consume_u16
+from .client import Client, consume_buffer
+from .planner import RegisterImage, RegisterRange
+from .registers import Field, RegisterBlock
+from .scheduler import Priority
 
 __all__ = [
+    "ACTIVE_ALARMS_BLOCK",
+    "HISTORY_COUNT",
+    "HISTORY_ENTRY_BLOCK",
     "Alarm",
+    "AlarmHistory",
     "AlarmHistoryEntry",
     "Alarms",
 ]
@@ -30,83 +38,187 @@ class Alarm:
 
     @classmethod
     def consume_list_from_registers(cls, count: int, registers: Iterator[int]):
-        alarms: list[Alarm] = []
-        for _ in range(count):
-            code = consume_u16(registers)
-            alarm = cls.lookup(code)
-            alarms.append(alarm)
+        return cls.list_from_buffer(count, consume_buffer(registers, count))
+
+    @classmethod
+    def list_from_buffer(cls, count: int, buffer: bytes | memoryview, offset: int = 0):
+        codes = struct.unpack_from(f">{count}H", buffer, offset)
+        return [cls.lookup(code) for code in codes]
 
-        return alarms
+
+ACTIVE_ALARMS_BLOCK = RegisterBlock(
+    Field(name="count", address=999),
+    # only the first 'count' codes are valid
+    Field(name="codes", address=1000, format="10H"),
+)
+HISTORY_COUNT = Field(name="history_count", address=1099)
+# the first history entry, the others follow directly
+HISTORY_ENTRY_BLOCK = RegisterBlock(
+    # year, month and day, hour and minute, second
+    Field(name="timestamp", address=1100, format="HBBBBH", convert=datetime),
+    Field(name="alarm", address=1104, convert=Alarm.lookup),
+)
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
 class AlarmHistoryEntry:
-    NUM_REGISTERS = 5
+    NUM_REGISTERS = HISTORY_ENTRY_BLOCK.range(is_extended=False).count
 
     alarm: Alarm
     timestamp: datetime
 
     @classmethod
     def consume_from_registers(cls, registers: Iterator[int]):
-        year = consume_u16(registers)
-        month, day = consume_u8_couple(registers)
-        hour, minute = consume_u8_couple(registers)
-        second = consume_u16(registers)
-        code = consume_u16(registers)
+        return cls.from_buffer(consume_buffer(registers, cls.NUM_REGISTERS))
 
-        return cls(
-            alarm=Alarm.lookup(code),
-            timestamp=datetime(year, month, day, hour, minute, second),
-        )
+    @classmethod
+    def from_buffer(cls, buffer: bytes | memoryview, offset: int = 0):
+        return cls(**HISTORY_ENTRY_BLOCK.unpack(buffer, offset, is_extended=False))
 
     @classmethod
     def consume_list_from_registers(cls, count: int, registers: Iterator[int]):
-        alarms: list[AlarmHistoryEntry] = []
-        for _ in range(count):
-            alarms.append(cls.consume_from_registers(registers))
+        return cls.list_from_buffer(
+            count, consume_buffer(registers, count * cls.NUM_REGISTERS)
+        )
 
-        return alarms
+    @classmethod
+    def list_from_buffer(cls, count: int, buffer: bytes | memoryview):
+        return [
+            cls.from_buffer(buffer, 2 * index * cls.NUM_REGISTERS)
+            for index in range(count)
+        ]
 
 
 class Alarms:
     MAX_ACTIVE_ALERTS = 10
     MAX_HISTORY_ALERTS = 50
 
-    REG_ACTIVE_ALARMS_COUNT = 999
-    REG_ACTIVE_ALARM1_CODE = 1000
-    REG_HISTORY_COUNT = 1099
-    REG_ALARM1_YEAR = 1100
+    REG_ACTIVE_ALARMS_COUNT = ACTIVE_ALARMS_BLOCK["count"].address
+    REG_ACTIVE_ALARM1_CODE = ACTIVE_ALARMS_BLOCK["codes"].address
+    REG_HISTORY_COUNT = HISTORY_COUNT.address
+    REG_ALARM1_YEAR = HISTORY_ENTRY_BLOCK["timestamp"].address
 
     _client: Client
 
     def __init__(self, client: Client) -> None:
         self._client = client
 
+    def plan_active(self) -> list[RegisterRange]:
+        # reading all codes up front is cheaper than a second round trip once the count is known
+        return ACTIVE_ALARMS_BLOCK.plan(is_extended=False)
+
+    def decode_active(self, image: RegisterImage) -> list[Alarm]:
+        values = ACTIVE_ALARMS_BLOCK.decode(image, is_extended=False)
+        count = values["count"]
+        assert 0 <= count <= self.MAX_ACTIVE_ALERTS
+        return [Alarm.lookup(code) for code in values["codes"][:count]]
+
     async def read_active(self) -> list[Alarm]:
-        count = await self._client.read_u16(self.REG_ACTIVE_ALARMS_COUNT)
-        assert 0 <= count <= 10
-        if count > 0:
-            registers = await self._client.read_many_u16(
-                self.REG_ACTIVE_ALARM1_CODE, count
-            )
-        else:
-            registers = []
-        return Alarm.consume_list_from_registers(count, iter(registers))
+        image = await self._client.read_ranges(self.plan_active())
+        return self.decode_active(image)
 
     async def reset_active(self) -> None:
         await self._client.write_u16(self.REG_ACTIVE_ALARMS_COUNT, 0x99C5)
 
+    def plan_history_count(self) -> list[RegisterRange]:
+        return [HISTORY_COUNT.range]
+
+    def decode_history_count(self, image: RegisterImage) -> int:
+        return HISTORY_COUNT.decode(image.registers(HISTORY_COUNT.address, 1))
+
     async def read_history_count(self) -> int:
-        return await self._client.read_u16(self.REG_HISTORY_COUNT)
+        return await self._client.read_field(HISTORY_COUNT)
 
     async def read_history(self) -> list[AlarmHistoryEntry]:
-        count = await self.read_history_count()
-        assert 0 <= count <= self.MAX_HISTORY_ALERTS
-        if count > 0:
-            register_count = count * AlarmHistoryEntry.NUM_REGISTERS
-            registers = await self._client.read_many_u16(
-                self.REG_ALARM1_YEAR, register_count
+        # the history is only needed for diagnostics, it shouldn't hold up anything else
+        with self._client.request_priority(Priority.BULK):
+            count = await self.read_history_count()
+            assert 0 <= count <= self.MAX_HISTORY_ALERTS
+            if count == 0:
+                return []
+            rng = RegisterRange(
+                self.REG_ALARM1_YEAR, count * AlarmHistoryEntry.NUM_REGISTERS
             )
+            image = await self._client.read_ranges([rng])
+        return AlarmHistoryEntry.list_from_buffer(
+            count, image.buffer(rng.address, rng.count)
+        )
+
+
+class AlarmHistory:
+    """Keeps the alarm history and reads only the entries that were added since the last read.
+
+    The unit stores the newest entry first. New alarms push the older entries back, and once the history
+    is full the oldest ones drop out. Every read gets the count and the newest entry in a single request.
+    If both still match the cache then nothing changed. Otherwise the entry that used to be newest should
+    now sit right after the new ones. If it doesn't (the history was cleared or too many alarms came in),
+    the whole history is read again.
+    """
+
+    _client: Client
+    # newest first, like on the unit
+    _entries: list[AlarmHistoryEntry]
+
+    def __init__(self, client: Client) -> None:
+        self._client = client
+        self._entries = []
+
+    @property
+    def entries(self) -> list[AlarmHistoryEntry]:
+        """Entries as of the last read, newest first."""
+        return list(self._entries)
+
+    def invalidate(self) -> None:
+        """Make the next read get the whole history."""
+        self._entries = []
+
+    async def read(self) -> list[AlarmHistoryEntry]:
+        # the history is only needed for diagnostics, it shouldn't hold up anything else
+        with self._client.request_priority(Priority.BULK):
+            self._entries = await self._read()
+        return list(self._entries)
+
+    async def _read(self) -> list[AlarmHistoryEntry]:
+        head = await self._read_head()
+        if head is None:
+            return []
+        count, newest = head
+        cached = self._entries
+        if cached and count == len(cached) and newest == cached[0]:
+            return cached
+
+        if count < Alarms.MAX_HISTORY_ALERTS:
+            added = count - len(cached)
         else:
-            registers = []
-        return AlarmHistoryEntry.consume_list_from_registers(count, iter(registers))
+            # the oldest entries dropped out, assume as few new ones as possible
+            added = max(Alarms.MAX_HISTORY_ALERTS - len(cached), 1)
+        if cached and 0 < added < count:
+            entries = [newest, *await self._read_entries(1, added + 1)]
+            if entries[added] == cached[0]:
+                return entries[:added] + cached[: count - added]
+            return [*entries, *await self._read_entries(added + 1, count)]
+        return [newest, *await self._read_entries(1, count)]
+
+    async def _read_head(self) -> tuple[int, AlarmHistoryEntry] | None:
+        # the count is right in front of the first entry
+        rng = RegisterRange(Alarms.REG_ALARM1_YEAR, AlarmHistoryEntry.NUM_REGISTERS)
+        image = await self._client.read_ranges([HISTORY_COUNT.range, rng])
+        count = HISTORY_COUNT.decode(image.registers(HISTORY_COUNT.address, 1))
+        assert 0 <= count <= Alarms.MAX_HISTORY_ALERTS
+        if count == 0:
+            return None
+        return count, AlarmHistoryEntry.from_buffer(
+            image.buffer(rng.address, rng.count)
+        )
+
+    async def _read_entries(self, start: int, stop: int) -> list[AlarmHistoryEntry]:
+        if start >= stop:
+            return []
+        rng = RegisterRange(
+            Alarms.REG_ALARM1_YEAR + start * AlarmHistoryEntry.NUM_REGISTERS,
+            (stop - start) * AlarmHistoryEntry.NUM_REGISTERS,
+        )
+        image = await self._client.read_ranges([rng])
+        return AlarmHistoryEntry.list_from_buffer(
+            stop - start, image.buffer(rng.address, rng.count)
+        )
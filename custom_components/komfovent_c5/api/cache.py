@@ -0,0 +1,57 @@
+import time
+from collections.abc import Callable, Iterable, Sequence
+
+from .planner import RegisterRange
+
+__all__ = [
+    "RegisterCache",
+]
+
+
+class RegisterCache:
+    """Image of the device registers, each register is valid for the TTL of the range it belongs to.
+
+    Registers outside of all configured ranges are never cached.
+    """
+
+    _ttls: list[tuple[RegisterRange, float]]
+    _clock: Callable[[], float]
+    # address -> (value, expires at)
+    _registers: dict[int, tuple[int, float]]
+
+    def __init__(
+        self,
+        ttls: Iterable[tuple[RegisterRange, float]],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttls = list(ttls)
+        self._clock = clock
+        self._registers = {}
+
+    def store(self, address: int, registers: Sequence[int]) -> None:
+        now = self._clock()
+        for rng, ttl in self._ttls:
+            start = max(rng.address, address)
+            end = min(rng.end, address + len(registers))
+            expires_at = now + ttl
+            for reg in range(start, end):
+                self._registers[reg] = (registers[reg - address], expires_at)
+
+    def lookup(self, address: int, count: int) -> list[int] | None:
+        """Get the given registers if all of them are cached and still fresh."""
+        now = self._clock()
+        values: list[int] = []
+        for reg in range(address, address + count):
+            entry = self._registers.get(reg)
+            if entry is None or entry[1] <= now:
+                return None
+            values.append(entry[0])
+        return values
+
+    def invalidate(self, address: int, count: int) -> None:
+        for reg in range(address, address + count):
+            self._registers.pop(reg, None)
+
+    def clear(self) -> None:
+        self._registers.clear()
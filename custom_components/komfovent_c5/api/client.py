@@ -1,71 +1,173 @@
 import asyncio
-import ctypes
+import contextlib
+import contextvars
 import datetime
 import itertools
 import logging
-from collections.abc import Iterator
+import struct
+import time
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
 from ipaddress import IPv4Address
-from typing import TYPE_CHECKING, cast
-
-from pymodbus.client import AsyncModbusTcpClient
-
-if TYPE_CHECKING:
-    from pymodbus.pdu.register_message import (
-        ReadHoldingRegistersResponse,
-        WriteMultipleRegistersResponse,
-        WriteSingleRegisterResponse,
-    )
+from typing import Any, BinaryIO, TypeVar
+
+from .adaptive import AdaptiveReadTransport
+from .cache import RegisterCache
+from .planner import RegisterImage, RegisterRange, plan_reads
+from .recording import RecordingTransport
+from .registers import Field
+from .scheduler import Priority, current_priority, request_priority
+from .stats import (
+    Transaction,
+    TransactionOutcome,
+    TransactionStats,
+    track_queue_wait,
+)
+from .supervisor import SupervisedTransport
+from .transport import (
+    DEFAULT_UNIT,
+    PipelinedTransport,
+    PymodbusTransport,
+    Transport,
+)
+from .write_behind import WriteBehindQueue
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# On a RS485 gateway a round trip costs about as much as transferring ~30 additional registers.
+DEFAULT_MAX_READ_GAP = 32
+
+
+def create_transport(
+    *, host: str, port: int, pipeline_depth: int | None = None
+) -> Transport:
+    transport: Transport
+    if pipeline_depth is None:
+        transport = PymodbusTransport(host=host, port=port)
+    else:
+        transport = PipelinedTransport(host=host, port=port, depth=pipeline_depth)
+    transport = AdaptiveReadTransport(transport, probe_address=_PROBE_REGISTER)
+    return SupervisedTransport(transport, heartbeat_address=_HEARTBEAT_REGISTER)
+
+
+class _WriteBatch:
+    client: "Client"
+    registers: dict[int, int]
+
+    def __init__(self, client: "Client") -> None:
+        self.client = client
+        self.registers = {}
+
+    def runs(self) -> Iterator[tuple[int, list[int]]]:
+        """Group the pending registers into runs of adjacent addresses."""
+        run_start = -1
+        run: list[int] = []
+        for address in sorted(self.registers):
+            if (
+                run
+                and address == run_start + len(run)
+                and len(run) < _MAX_REGISTERS_PER_WRITE
+            ):
+                run.append(self.registers[address])
+                continue
+            if run:
+                yield run_start, run
+            run_start, run = address, [self.registers[address]]
+        if run:
+            yield run_start, run
+
+
+_WRITE_BATCH: contextvars.ContextVar[_WriteBatch | None] = contextvars.ContextVar(
+    "write_batch", default=None
+)
+_DEBOUNCE_WRITES: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "debounce_writes", default=False
+)
+
 
 class Client:
-    _modbus: AsyncModbusTcpClient
-    _lock: asyncio.Lock
+    _transport: Transport
     _addr: tuple[str, int]
-
-    def __init__(self, *, host: str, port: int) -> None:
+    _unit: int
+    _max_read_gap: int
+    _write_behind: WriteBehindQueue | None
+    _cache: RegisterCache | None
+    _stats: TransactionStats
+    _transaction_listeners: list[Callable[[Transaction], None]]
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        max_read_gap: int = DEFAULT_MAX_READ_GAP,
+        unit: int = DEFAULT_UNIT,
+        pipeline_depth: int | None = None,
+        transport: Transport | None = None,
+        write_debounce: float = 0.0,
+        cache_ttl: Iterable[tuple[RegisterRange, float]] = (),
+    ) -> None:
         self._addr = (host, port)
-        self._modbus = AsyncModbusTcpClient(host, port=port)
-        self._lock = asyncio.Lock()
+        self._unit = unit
+        if transport is None:
+            transport = create_transport(
+                host=host, port=port, pipeline_depth=pipeline_depth
+            )
+        self._transport = transport
+        self._max_read_gap = max_read_gap
+        self._write_behind = (
+            WriteBehindQueue(self._send_registers, delay=write_debounce)
+            if write_debounce > 0.0
+            else None
+        )
+        cache_ttl = list(cache_ttl)
+        self._cache = RegisterCache(cache_ttl) if cache_ttl else None
+        self._stats = TransactionStats()
+        self._transaction_listeners = []
 
     @property
     def host_and_port(self) -> tuple[str, int]:
         return self._addr
 
+    @property
+    def unit(self) -> int:
+        return self._unit
+
+    @property
+    def stats(self) -> TransactionStats:
+        return self._stats
+
+    def add_transaction_listener(
+        self, listener: Callable[[Transaction], None]
+    ) -> Callable[[], None]:
+        """Call `listener` after every transaction, successful or not. Returns a function that removes it again."""
+        self._transaction_listeners.append(listener)
+        return lambda: self._transaction_listeners.remove(listener)
+
     async def connect(self, connect_timeout: float | None = None) -> None:
-        if self._modbus.connected:
-            return
-        async with self._lock:
-            if connect_timeout is not None:
-                self._modbus.comm_params.timeout_connect = connect_timeout
-            _LOGGER.debug("connecting to %s", self.host_and_port)
-            await self._modbus.connect()
-            # the 'connect' function doesn't bubble the exception unfortunately
-            if not self._modbus.connected:
-                raise ConnectionError("failed to connect")
+        _LOGGER.debug("ensuring connection to %s", self.host_and_port)
+        await self._transport.connect(connect_timeout)
 
     async def disconnect(self) -> None:
-        async with self._lock:
-            _LOGGER.debug("closing the connection")
-            self._modbus.close()
+        if self._write_behind is not None:
+            await self._write_behind.flush()
+        _LOGGER.debug("closing the connection")
+        await self._transport.close()
 
     async def read_u16(self, address: int) -> int:
-        async with self._lock:
-            read_response = cast(
-                "ReadHoldingRegistersResponse",
-                await self._modbus.read_holding_registers(address, count=1),
-            )
-        assert not read_response.isError()
-        return read_response.registers[0]
+        (value,) = await self._read_cached(address, 1)
+        return value
 
     async def write_u16(self, address: int, value: int) -> None:
-        async with self._lock:
-            write_response = cast(
-                "WriteSingleRegisterResponse",
-                await self._modbus.write_register(address, value & 0xFFFF),
-            )
-        assert not write_response.isError()
+        await self._write_registers(address, (value & 0xFFFF,))
 
     async def read_u8_couple(self, address: int) -> tuple[int, int]:
         value = await self.read_u16(address)
@@ -78,48 +180,213 @@ class Client:
         await self.write_u16(address, value)
 
     async def read_u32(self, address: int) -> int:
-        async with self._lock:
-            read_response = cast(
-                "ReadHoldingRegistersResponse",
-                await self._modbus.read_holding_registers(address, count=2),
-            )
-        assert not read_response.isError()
-        return consume_u32(iter(read_response.registers))
+        registers = await self._read_cached(address, 2)
+        return consume_u32(iter(registers))
 
     async def write_u32(self, address: int, value: int) -> None:
         low_register = value & 0x0000FFFF
         high_register = (value & 0xFFFF0000) >> 16
-        async with self._lock:
-            write_response = cast(
-                "WriteMultipleRegistersResponse",
-                await self._modbus.write_registers(
-                    address,
-                    (high_register, low_register),  # type: ignore
-                ),
-            )
-        assert not write_response.isError()
+        await self._write_registers(address, (high_register, low_register))
+
+    async def read_field(self, field: Field, *, cached: bool = True) -> Any:
+        """Read a single field, `cached=False` always asks the device (to confirm a write for example)."""
+        if cached:
+            registers = await self._read_cached(field.address, field.count)
+        else:
+            registers = await self._read(field.address, field.count)
+            if self._cache is not None:
+                self._cache.store(field.address, registers)
+        return field.unpack(registers)
+
+    async def write_field(self, field: Field, value: Any) -> None:
+        await self._write_registers(field.address, field.encode(value))
+
+    @contextlib.asynccontextmanager
+    async def write_batch(self) -> AsyncIterator[None]:
+        """Collect all writes made in this context and send them when it exits.
+
+        Writes to adjacent registers are merged into a single 'write multiple registers' request and the last
+        write to a register wins. Write calls inside the context return immediately.
+        Nested batches are merged into the outermost one.
+        """
+        outer = _WRITE_BATCH.get()
+        if outer is not None and outer.client is self:
+            yield
+            return
+
+        batch = _WriteBatch(self)
+        token = _WRITE_BATCH.set(batch)
+        try:
+            yield
+        finally:
+            _WRITE_BATCH.reset(token)
+
+        for address, registers in batch.runs():
+            await self._send_registers(address, registers)
+
+    @contextlib.contextmanager
+    def debounce_writes(self) -> Iterator[None]:
+        """Route all writes made in this context through the write-behind queue.
+
+        Rapid writes to the same register are collapsed into a single write of the last value once the
+        debounce window has passed. Write calls still return only after the value has been committed.
+        This is a no-op if the client was created without a debounce window.
+        """
+        token = _DEBOUNCE_WRITES.set(True)
+        try:
+            yield
+        finally:
+            _DEBOUNCE_WRITES.reset(token)
+
+    @contextlib.contextmanager
+    def request_priority(self, priority: Priority) -> Iterator[None]:
+        """Send all requests made in this context with the given priority.
+
+        Outside of such a context writes are sent as interactive writes and reads as background polls.
+        """
+        with request_priority(priority):
+            yield
+
+    @contextlib.contextmanager
+    def record(self, file: BinaryIO) -> Iterator[None]:
+        """Record every request made in this context, and its response, to `file`.
+
+        Replay the recording with `ReplayTransport.from_file`.
+        """
+        transport = self._transport
+        self._transport = RecordingTransport(transport, file)
+        try:
+            yield
+        finally:
+            self._transport = transport
+
+    async def _write_registers(self, address: int, registers: Sequence[int]) -> None:
+        batch = _WRITE_BATCH.get()
+        if batch is not None and batch.client is self:
+            for offset, register in enumerate(registers):
+                batch.registers[address + offset] = register
+            return
+        if self._write_behind is not None and _DEBOUNCE_WRITES.get():
+            await self._write_behind.write(address, registers)
+            return
+        await self._send_registers(address, registers)
+
+    async def _send_registers(self, address: int, registers: Sequence[int]) -> None:
+        try:
+            if len(registers) == 1:
+                request = self._transport.write_register(
+                    address, registers[0], unit=self._unit
+                )
+            else:
+                request = self._transport.write_registers(
+                    address, registers, unit=self._unit
+                )
+            await self._transact("write", address, len(registers), request)
+        except Exception:
+            # we don't know whether the write made it
+            if self._cache is not None:
+                self._cache.invalidate(address, len(registers))
+            raise
+        if self._cache is not None:
+            self._cache.store(address, registers)
+
+    async def _read_cached(self, address: int, count: int) -> list[int]:
+        if self._cache is not None:
+            registers = self._cache.lookup(address, count)
+            if registers is not None:
+                return registers
+        registers = await self._read(address, count)
+        if self._cache is not None:
+            self._cache.store(address, registers)
+        return registers
+
+    async def _read(self, address: int, count: int) -> list[int]:
+        return await self._transact(
+            "read",
+            address,
+            count,
+            self._transport.read_holding_registers(address, count, unit=self._unit),
+        )
 
-    async def _read_batch(self, address: int, count: int) -> list[int]:
-        response = cast(
-            "ReadHoldingRegistersResponse",
-            await self._modbus.read_holding_registers(address, count=count),
+    async def _transact(
+        self, operation: str, address: int, count: int, request: Awaitable[_T]
+    ) -> _T:
+        default_priority = (
+            Priority.BACKGROUND_POLL
+            if operation == "read"
+            else Priority.INTERACTIVE_WRITE
         )
-        assert not response.isError()
-        return response.registers
+        with (
+            request_priority(current_priority(default_priority)),
+            track_queue_wait() as queue_wait,
+        ):
+            start = time.perf_counter()
+            outcome = TransactionOutcome.ERROR
+            try:
+                result = await request
+                outcome = TransactionOutcome.OK
+                return result
+            except TimeoutError:
+                outcome = TransactionOutcome.TIMEOUT
+                raise
+            finally:
+                self._record_transaction(
+                    Transaction(
+                        operation=operation,
+                        unit=self._unit,
+                        address=address,
+                        count=count,
+                        queue_wait=queue_wait(),
+                        duration=time.perf_counter() - start,
+                        outcome=outcome,
+                    )
+                )
+
+    def _record_transaction(self, transaction: Transaction) -> None:
+        self._stats.record(transaction)
+        for listener in self._transaction_listeners:
+            try:
+                listener(transaction)
+            except Exception:
+                _LOGGER.exception("transaction listener failed")
 
     async def read_many_u16(self, address: int, count: int) -> list[int]:
-        registers: list[int] = []
-        async with self._lock:
-            address_end = address + count
-            for batch_start in range(address, address_end, _MAX_REGISTERS_PER_READ):
-                batch_end = min(batch_start + _MAX_REGISTERS_PER_READ, address_end)
-                registers.extend(
-                    await self._read_batch(batch_start, count=batch_end - batch_start)
+        address_end = address + count
+        max_count = self._transport.max_read_count
+        # with a pipelined transport the batches are in flight at the same time
+        batches = await asyncio.gather(
+            *(
+                self._read(
+                    batch_start, min(batch_start + max_count, address_end) - batch_start
                 )
+                for batch_start in range(address, address_end, max_count)
+            )
+        )
+        registers = [register for batch in batches for register in batch]
+        if self._cache is not None:
+            self._cache.store(address, registers)
         return registers
 
+    async def read_ranges(self, ranges: Iterable[RegisterRange]) -> RegisterImage:
+        plan = plan_reads(
+            ranges,
+            max_gap=self._max_read_gap,
+            max_count=self._transport.max_read_count,
+        )
+        image = RegisterImage()
+        blocks = await asyncio.gather(
+            *(self.read_many_u16(rng.address, rng.count) for rng in plan)
+        )
+        for rng, registers in zip(plan, blocks, strict=True):
+            image.add(rng.address, registers)
+        return image
+
 
-_MAX_REGISTERS_PER_READ = 125
+_MAX_REGISTERS_PER_WRITE = 123
+# ahu on/off, available on every firmware version
+_HEARTBEAT_REGISTER = 0
+# start of the modes table, a full size read from here covers mostly documented registers
+_PROBE_REGISTER = 99
 
 
 def consume_u16(registers: Iterator[int]) -> int:
@@ -131,7 +398,7 @@ def consume_u16(registers: Iterator[int]) -> int:
 
 def consume_i16(registers: Iterator[int]) -> int:
     raw = consume_u16(registers)
-    return ctypes.c_int16(raw).value
+    return raw - 0x10000 if raw & 0x8000 else raw
 
 
 def consume_u8_couple_from_u16(register: int) -> tuple[int, int]:
@@ -151,11 +418,21 @@ def consume_u32(registers: Iterator[int]) -> int:
     return ((high_register << 16) & 0xFFFF0000) | low_register & 0x0000FFFF
 
 
+def consume_buffer(registers: Iterator[int], count: int) -> bytes:
+    """Consume `count` registers into a big-endian buffer for use with `struct`."""
+    raw = tuple(itertools.islice(registers, count))
+    if len(raw) < count:
+        raise ValueError(f"missing register(s) to consume {count} registers")
+    return struct.pack(f">{count}H", *raw)
+
+
+def decode_string(raw: bytes) -> str:
+    # every byte is a character, the string ends at the first NULL
+    return raw.split(b"\0", 1)[0].decode("latin-1")
+
+
 def consume_string(registers: Iterator[int], length: int) -> str:
-    # preemtively consume all bytes since we need to consume `length` registers
-    raw = [b for _ in range(length) for b in consume_u8_couple(registers)]
-    # create a string from the bytes until the first NULL
-    return "".join(map(chr, itertools.takewhile(lambda b: b != 0, raw)))
+    return decode_string(consume_buffer(registers, length))
 
 
 def consume_ip_address(
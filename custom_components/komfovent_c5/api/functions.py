@@ -1,46 +1,62 @@
 import dataclasses
 from collections.abc import Iterator
 
-from .client import Client, consume_u16
+from .client import Client, consume_buffer
+from .planner import RegisterImage, RegisterRange
+from .registers import Field, RegisterBlock
 
 __all__ = [
+    "FUNCTIONS_BLOCK",
     "Functions",
     "FunctionsState",
 ]
 
 
+FUNCTIONS_BLOCK = RegisterBlock(
+    Field(name="aqc_setpoint1", address=500),
+    Field(name="aqc_mode1", address=501),
+    Field(name="aqc_setpoint2", address=502),
+    Field(name="aqc_mode2", address=503),
+    Field(name="ocv_enabled", address=504, convert=bool),
+)
+
+
 @dataclasses.dataclass(slots=True, kw_only=True)
 class FunctionsState:
     ocv_enabled: bool
 
     @classmethod
     def consume_from_registers(cls, registers: Iterator[int]):
-        _aqc_setpoint1 = consume_u16(registers)
-        _aqc_mode1 = consume_u16(registers)
-        _aqc_setpoint2 = consume_u16(registers)
-        _aqc_mode2 = consume_u16(registers)
-        ocv_enabled = consume_u16(registers)
+        rng = FUNCTIONS_BLOCK.range(is_extended=False)
+        return cls.from_buffer(consume_buffer(registers, rng.count))
 
+    @classmethod
+    def from_buffer(cls, buffer: bytes | memoryview):
+        values = FUNCTIONS_BLOCK.unpack(buffer, is_extended=False)
         return cls(
-            ocv_enabled=bool(ocv_enabled),
+            ocv_enabled=values["ocv_enabled"],
         )
 
 
 class Functions:
-    REG_AQC_SETPOINT1 = 500
-    REG_OCV_STATE = 504
+    REG_AQC_SETPOINT1 = FUNCTIONS_BLOCK["aqc_setpoint1"].address
+    REG_OCV_STATE = FUNCTIONS_BLOCK["ocv_enabled"].address
 
     _client: Client
 
     def __init__(self, client: Client) -> None:
         self._client = client
 
+    def plan_all(self) -> list[RegisterRange]:
+        return FUNCTIONS_BLOCK.plan(is_extended=False)
+
+    def decode_all(self, image: RegisterImage) -> FunctionsState:
+        rng = FUNCTIONS_BLOCK.range(is_extended=False)
+        return FunctionsState.from_buffer(image.buffer(rng.address, rng.count))
+
     async def read_all(self) -> FunctionsState:
-        regs = await self._client.read_many_u16(
-            self.REG_AQC_SETPOINT1,
-            (self.REG_OCV_STATE - self.REG_AQC_SETPOINT1) + 1,
-        )
-        return FunctionsState.consume_from_registers(iter(regs))
+        image = await self._client.read_ranges(self.plan_all())
+        return self.decode_all(image)
 
     async def set_ocv_enabled(self, enabled: bool) -> None:
-        await self._client.write_u16(self.REG_OCV_STATE, int(enabled))
+        await self._client.write_field(FUNCTIONS_BLOCK["ocv_enabled"], enabled)
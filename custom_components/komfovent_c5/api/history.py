@@ -0,0 +1,127 @@
+import dataclasses
+import math
+import time
+from array import array
+from collections.abc import Callable, Iterator
+
+from .monitoring import MonitoringState
+
+__all__ = [
+    "MonitoringHistory",
+    "WindowStats",
+]
+
+# one hour at the default poll interval
+DEFAULT_CAPACITY = 720
+
+_NUMERIC_TYPES = (int, float, int | None, float | None)
+# numeric fields of the monitoring state, enums and flags are left out
+_NUMERIC_FIELDS = tuple(
+    field.name
+    for field in dataclasses.fields(MonitoringState)
+    if field.type in _NUMERIC_TYPES
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class WindowStats:
+    # samples with a value, missing values ('None') are skipped
+    count: int
+    min: float | None
+    max: float | None
+    mean: float | None
+
+
+class MonitoringHistory:
+    """Ring buffer with the most recent samples of every numeric field of the monitoring state.
+
+    Each field is stored in its own array of doubles and all fields share the timestamps, so recording a
+    sample doesn't allocate once the buffer is full. Missing values are stored as NaN.
+    """
+
+    _capacity: int
+    _clock: Callable[[], float]
+    _timestamps: array
+    _values: dict[str, array]
+    # index of the next sample to write
+    _next: int
+    _count: int
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        assert capacity >= 1
+        self._capacity = capacity
+        self._clock = clock
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = {
+            name: array("d", bytes(8 * capacity)) for name in _NUMERIC_FIELDS
+        }
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return _NUMERIC_FIELDS
+
+    def record(self, state: MonitoringState, timestamp: float | None = None) -> None:
+        index = self._next
+        self._timestamps[index] = self._clock() if timestamp is None else timestamp
+        for name, values in self._values.items():
+            value = getattr(state, name)
+            values[index] = math.nan if value is None else value
+        self._next = (index + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def clear(self) -> None:
+        self._next = 0
+        self._count = 0
+
+    def latest(self, name: str, count: int) -> list[tuple[float, float | None]]:
+        """Get the last `count` samples of a field as (timestamp, value), oldest first."""
+        values = self._values[name]
+        samples = [
+            (self._timestamps[index], _value(values[index]))
+            for index in self._indices(last=count)
+        ]
+        samples.reverse()
+        return samples
+
+    def window(
+        self, name: str, *, last: int | None = None, since: float | None = None
+    ) -> WindowStats:
+        """Aggregate the last `last` samples of a field, or all samples taken at or after `since`."""
+        values = self._values[name]
+        count = 0
+        total = 0.0
+        low = math.inf
+        high = -math.inf
+        for index in self._indices(last=last):
+            if since is not None and self._timestamps[index] < since:
+                break
+            value = values[index]
+            if math.isnan(value):
+                continue
+            count += 1
+            total += value
+            low = min(low, value)
+            high = max(high, value)
+        if count == 0:
+            return WindowStats(count=0, min=None, max=None, mean=None)
+        return WindowStats(count=count, min=low, max=high, mean=total / count)
+
+    def _indices(self, *, last: int | None = None) -> Iterator[int]:
+        # newest first
+        count = self._count if last is None else min(last, self._count)
+        for offset in range(1, count + 1):
+            yield (self._next - offset) % self._capacity
+
+
+def _value(value: float) -> float | None:
+    return None if math.isnan(value) else value
@@ -3,15 +3,21 @@ import enum
 from collections.abc import Iterator
 from typing import Literal, overload
 
-from .client import Client, consume_u16, consume_u32
+from .client import Client, consume_buffer, consume_u16
+from .planner import RegisterImage, RegisterRange
+from .registers import Field, RegisterBlock
 
 __all__ = [
+    "AHU_ON",
+    "MODE_BLOCKS",
+    "MODES_BLOCK",
     "ConfigurationFlags",
     "FlowControlMode",
     "Mode",
     "Modes",
     "ModesState",
     "ModeState",
+    "mode_block",
     "OperationMode",
     "SpecialMode",
     "TemperatureControlMode",
@@ -89,93 +95,125 @@ class ConfigurationFlags(enum.IntFlag):
         return cls(consume_u16(registers))
 
 
+def mode_block(reg_start: int, *, special: bool) -> RegisterBlock:
+    """Registers of the mode starting at `reg_start`, only the special mode has a configuration."""
+    fields = [
+        Field(name="supply_flow", address=reg_start, format="I"),
+        Field(name="extract_flow", address=reg_start + 2, format="I"),
+        Field(name="setpoint_temperature", address=reg_start + 4, scale=10),
+    ]
+    if special:
+        fields.append(
+            Field(
+                name="configuration", address=reg_start + 5, convert=ConfigurationFlags
+            )
+        )
+    return RegisterBlock(*fields)
+
+
+# addresses are zero-based, the comments use the register numbers from the manual
+AHU_ON = Field(name="ahu", address=0, convert=bool)
+MODE_BLOCKS = {
+    # reg: 101
+    OperationMode.COMFORT1: mode_block(100, special=False),
+    OperationMode.COMFORT2: mode_block(105, special=False),
+    OperationMode.ECONOMY1: mode_block(110, special=False),
+    OperationMode.ECONOMY2: mode_block(115, special=False),
+    OperationMode.SPECIAL: mode_block(120, special=True),
+}
+MODES_BLOCK = RegisterBlock(
+    # reg: 100, the mode table follows
+    Field(name="operation_mode", address=99, convert=OperationMode),
+    # reg: 127
+    Field(name="flow_control_mode", address=126, convert=FlowControlMode),
+    Field(name="temperature_control_mode", address=127, convert=TemperatureControlMode),
+    Field(name="vav_status", address=128, convert=VavStatus),
+    # reg: 130
+    Field(name="vav_sensors_range", address=129, extended=True),
+    Field(name="nominal_supply_pressure", address=130, extended=True),
+    Field(name="nominal_exhaust_pressure", address=131, extended=True),
+)
+
+
 @dataclasses.dataclass(slots=True, kw_only=True)
 class ModeState:
     supply_flow: int
     extract_flow: int
     setpoint_temperature: float
-    configuration: ConfigurationFlags | None
+    configuration: ConfigurationFlags | None = None
 
     @classmethod
     def consume_from_registers(cls, registers: Iterator[int], special: bool):
-        supply_flow = consume_u32(registers)
-        extract_flow = consume_u32(registers)
-        setpoint_temperature = consume_u16(registers) / 10.0
-        if special:
-            configuration = ConfigurationFlags.consume_from_registers(registers)
-        else:
-            configuration = None
-
-        return cls(
-            supply_flow=supply_flow,
-            extract_flow=extract_flow,
-            setpoint_temperature=setpoint_temperature,
-            configuration=configuration,
+        block = _mode_layout(special)
+        return cls.from_buffer(
+            consume_buffer(registers, block.range(is_extended=False).count), special
         )
 
+    @classmethod
+    def from_buffer(cls, buffer: bytes | memoryview, special: bool, offset: int = 0):
+        return cls(**_mode_layout(special).unpack(buffer, offset, is_extended=False))
+
+
+def _mode_layout(special: bool) -> RegisterBlock:
+    # all modes share the same layout
+    if special:
+        return MODE_BLOCKS[OperationMode.SPECIAL]
+    return MODE_BLOCKS[OperationMode.COMFORT1]
 
-class Mode:
-    REG_OFF_SUPPLY_FLOW = 0
-    REG_OFF_EXTRACT_FLOW = 2
-    REG_OFF_SETPOINT_TEMPERATURE = 4
 
+class Mode:
     _client: Client
-    _reg_start: int
+    _block: RegisterBlock
 
     def __init__(self, client: Client, reg_start: int) -> None:
         self._client = client
-        self._reg_start = reg_start
+        self._block = mode_block(reg_start, special=isinstance(self, SpecialMode))
 
     async def read_all(self) -> ModeState:
-        registers = await self._client.read_many_u16(
-            self._reg_start + self.REG_OFF_SUPPLY_FLOW, 5
-        )
-        return ModeState.consume_from_registers(iter(registers), False)
+        image = await self._client.read_ranges(self._block.plan(is_extended=False))
+        return ModeState(**self._block.decode(image, is_extended=False))
 
     async def supply_flow(self) -> int:
-        reg = self._reg_start + self.REG_OFF_SUPPLY_FLOW
-        return await self._client.read_u32(reg)
+        return await self._client.read_field(self._block["supply_flow"])
 
     async def set_supply_flow(self, value: int) -> None:
-        reg = self._reg_start + self.REG_OFF_SUPPLY_FLOW
-        await self._client.write_u32(reg, value)
+        await self._client.write_field(self._block["supply_flow"], value)
 
     async def extract_flow(self) -> int:
-        reg = self._reg_start + self.REG_OFF_EXTRACT_FLOW
-        return await self._client.read_u32(reg)
+        return await self._client.read_field(self._block["extract_flow"])
 
     async def set_extract_flow(self, value: int) -> None:
-        reg = self._reg_start + self.REG_OFF_EXTRACT_FLOW
-        await self._client.write_u32(reg, value)
+        await self._client.write_field(self._block["extract_flow"], value)
 
     async def setpoint_temperature(self) -> float:
-        reg = self._reg_start + self.REG_OFF_SETPOINT_TEMPERATURE
-        value = await self._client.read_u16(reg)
-        return value / 10.0
+        return await self._client.read_field(self._block["setpoint_temperature"])
 
     async def set_setpoint_temperature(self, value: float) -> None:
-        reg = self._reg_start + self.REG_OFF_SETPOINT_TEMPERATURE
-        await self._client.write_u16(reg, round(value * 10.0))
+        await self._client.write_field(self._block["setpoint_temperature"], value)
+
+    async def apply(
+        self,
+        *,
+        supply_flow: int | None = None,
+        extract_flow: int | None = None,
+        setpoint_temperature: float | None = None,
+    ) -> None:
+        """Set multiple values at once. The registers are adjacent so this is a single request."""
+        async with self._client.write_batch():
+            if supply_flow is not None:
+                await self.set_supply_flow(supply_flow)
+            if extract_flow is not None:
+                await self.set_extract_flow(extract_flow)
+            if setpoint_temperature is not None:
+                await self.set_setpoint_temperature(setpoint_temperature)
 
 
 class SpecialMode(Mode):
-    REG_OFF_CONFIGURATION = 5
-
-    async def read_all(self) -> ModeState:
-        registers = await self._client.read_many_u16(
-            self._reg_start + self.REG_OFF_SUPPLY_FLOW, 6
-        )
-        return ModeState.consume_from_registers(iter(registers), True)
-
     async def configuration(self) -> ConfigurationFlags:
-        return ConfigurationFlags(
-            await self._client.read_u16(self._reg_start + self.REG_OFF_CONFIGURATION)
-        )
+        return await self._client.read_field(self._block["configuration"])
 
     async def set_configuration(self, flags: ConfigurationFlags) -> None:
-        await self._client.write_u16(
-            self._reg_start + self.REG_OFF_CONFIGURATION, flags.value
-        )
+        await self._client.write_field(self._block["configuration"], flags)
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
@@ -197,40 +235,27 @@ class ModesState:
     def consume_from_registers(
         cls, ahu: bool, registers: Iterator[int], *, is_extended: bool
     ):
-        operation_mode = OperationMode.consume_from_registers(registers)
+        rng = MODES_BLOCK.range(is_extended=is_extended)
+        return cls.from_buffer(
+            ahu, consume_buffer(registers, rng.count), is_extended=is_extended
+        )
+
+    @classmethod
+    def from_buffer(cls, ahu: bool, buffer: bytes | memoryview, *, is_extended: bool):
+        """Decode the modes from a buffer that starts at the operation mode register."""
+        values = MODES_BLOCK.unpack(buffer, is_extended=is_extended)
+        start = MODES_BLOCK.range(is_extended=is_extended).address
         modes = {
-            OperationMode.COMFORT1: ModeState.consume_from_registers(registers, False),
-            OperationMode.COMFORT2: ModeState.consume_from_registers(registers, False),
-            OperationMode.ECONOMY1: ModeState.consume_from_registers(registers, False),
-            OperationMode.ECONOMY2: ModeState.consume_from_registers(registers, False),
-            OperationMode.SPECIAL: ModeState.consume_from_registers(registers, True),
+            mode: ModeState(
+                **block.unpack(
+                    buffer,
+                    2 * (block.range(is_extended=False).address - start),
+                    is_extended=False,
+                )
+            )
+            for mode, block in MODE_BLOCKS.items()
         }
-        flow_control_mode = FlowControlMode.consume_from_registers(registers)
-        temperature_control_mode = TemperatureControlMode.consume_from_registers(
-            registers
-        )
-        vav_status = VavStatus.consume_from_registers(registers)
-
-        if is_extended:
-            vav_sensors_range = consume_u16(registers)
-            nominal_supply_pressure = consume_u16(registers)
-            nominal_exhaust_pressure = consume_u16(registers)
-        else:
-            vav_sensors_range = None
-            nominal_supply_pressure = None
-            nominal_exhaust_pressure = None
-
-        return cls(
-            ahu=ahu,
-            operation_mode=operation_mode,
-            modes=modes,
-            flow_control_mode=flow_control_mode,
-            temperature_control_mode=temperature_control_mode,
-            vav_status=vav_status,
-            vav_sensors_range=vav_sensors_range,
-            nominal_supply_pressure=nominal_supply_pressure,
-            nominal_exhaust_pressure=nominal_exhaust_pressure,
-        )
+        return cls(ahu=ahu, modes=modes, **values)
 
     @property
     def active_mode(self) -> ModeState | None:
@@ -238,45 +263,49 @@ class ModesState:
 
 
 class Modes:
-    REG_AHU_ON = 0
-    REG_OPERATION_MODE = 99
-    REG_FLOW_CONTROL_MODE = 126
-    REG_TEMPERATURE_CONTROL_MODE = 127
-    REG_VAV_STATUS = 128
+    REG_AHU_ON = AHU_ON.address
+    REG_OPERATION_MODE = MODES_BLOCK["operation_mode"].address
+    REG_FLOW_CONTROL_MODE = MODES_BLOCK["flow_control_mode"].address
+    REG_TEMPERATURE_CONTROL_MODE = MODES_BLOCK["temperature_control_mode"].address
+    REG_VAV_STATUS = MODES_BLOCK["vav_status"].address
 
     # extended set
-    REG_VAV_SENSORS_RANGE = 129
-    REG_NOMINAL_SUPPLY_PRESSURE = 130
-    REG_NOMINAL_EXHAUST_PRESSURE = 131
+    REG_VAV_SENSORS_RANGE = MODES_BLOCK["vav_sensors_range"].address
+    REG_NOMINAL_SUPPLY_PRESSURE = MODES_BLOCK["nominal_supply_pressure"].address
+    REG_NOMINAL_EXHAUST_PRESSURE = MODES_BLOCK["nominal_exhaust_pressure"].address
 
     _client: Client
 
     def __init__(self, client: Client) -> None:
         self._client = client
 
-    async def read_all(self, *, is_extended: bool) -> ModesState:
-        ahu = await self.ahu_on()
-        end = self.REG_NOMINAL_EXHAUST_PRESSURE if is_extended else self.REG_VAV_STATUS
-        registers = await self._client.read_many_u16(
-            self.REG_OPERATION_MODE,
-            (end - self.REG_OPERATION_MODE) + 1,
-        )
-        return ModesState.consume_from_registers(
-            ahu, iter(registers), is_extended=is_extended
+    def plan_all(self, *, is_extended: bool) -> list[RegisterRange]:
+        return [AHU_ON.range, *MODES_BLOCK.plan(is_extended=is_extended)]
+
+    def decode_all(self, image: RegisterImage, *, is_extended: bool) -> ModesState:
+        rng = MODES_BLOCK.range(is_extended=is_extended)
+        return ModesState.from_buffer(
+            AHU_ON.decode(image.registers(AHU_ON.address, AHU_ON.count)),
+            image.buffer(rng.address, rng.count),
+            is_extended=is_extended,
         )
 
+    async def read_all(self, *, is_extended: bool) -> ModesState:
+        image = await self._client.read_ranges(self.plan_all(is_extended=is_extended))
+        return self.decode_all(image, is_extended=is_extended)
+
     async def ahu_on(self) -> bool:
-        return bool(await self._client.read_u16(self.REG_AHU_ON))
+        return await self._client.read_field(AHU_ON)
 
     async def set_ahu_on(self, ahu_on: bool) -> None:
-        await self._client.write_u16(self.REG_AHU_ON, int(ahu_on))
+        await self._client.write_field(AHU_ON, ahu_on)
 
     async def operation_mode(self) -> OperationMode:
-        return OperationMode(await self._client.read_u16(self.REG_OPERATION_MODE))
+        return await self._client.read_field(MODES_BLOCK["operation_mode"])
 
     async def set_operation_mode(self, mode: OperationMode) -> None:
         assert mode != OperationMode.UNKNOWN
-        await self._client.write_u16(self.REG_OPERATION_MODE, mode.value)
+        await self._client.write_field(MODES_BLOCK["operation_mode"], mode)
 
     @overload
     def mode_registers(self, mode: Literal[OperationMode.SPECIAL]) -> SpecialMode: ...
@@ -285,54 +314,43 @@ class Modes:
     def mode_registers(self, mode: OperationMode) -> Mode: ...
 
     def mode_registers(self, mode: OperationMode) -> Mode:
-        reg_start = _OP_MODE_OFFSET[mode]
+        reg_start = MODE_BLOCKS[mode].fields[0].address
         if mode == OperationMode.SPECIAL:
             return SpecialMode(self._client, reg_start)
         return Mode(self._client, reg_start)
 
     async def flow_control_mode(self) -> FlowControlMode:
-        return FlowControlMode(await self._client.read_u16(self.REG_FLOW_CONTROL_MODE))
+        return await self._client.read_field(MODES_BLOCK["flow_control_mode"])
 
     async def set_flow_control_mode(self, mode: FlowControlMode) -> None:
-        await self._client.write_u16(self.REG_FLOW_CONTROL_MODE, mode.value)
+        await self._client.write_field(MODES_BLOCK["flow_control_mode"], mode)
 
     async def temperature_control_mode(self) -> TemperatureControlMode:
-        return TemperatureControlMode(
-            await self._client.read_u16(self.REG_TEMPERATURE_CONTROL_MODE)
-        )
+        return await self._client.read_field(MODES_BLOCK["temperature_control_mode"])
 
     async def set_temperature_control_mode(self, mode: TemperatureControlMode) -> None:
-        await self._client.write_u16(self.REG_TEMPERATURE_CONTROL_MODE, mode.value)
+        await self._client.write_field(MODES_BLOCK["temperature_control_mode"], mode)
 
     async def vav_status(self) -> VavStatus:
-        return VavStatus(await self._client.read_u16(self.REG_VAV_STATUS))
+        return await self._client.read_field(MODES_BLOCK["vav_status"])
 
     async def start_vav_calibration(self) -> None:
         await self._client.write_u16(self.REG_VAV_STATUS, 0x99C5)
 
     async def vav_sensors_range(self) -> int:
-        return await self._client.read_u16(self.REG_VAV_SENSORS_RANGE)
+        return await self._client.read_field(MODES_BLOCK["vav_sensors_range"])
 
     async def set_vav_sensors_range(self, value: int) -> None:
-        await self._client.write_u16(self.REG_VAV_SENSORS_RANGE, value)
+        await self._client.write_field(MODES_BLOCK["vav_sensors_range"], value)
 
     async def nominal_supply_pressure(self) -> int:
-        return await self._client.read_u16(self.REG_NOMINAL_SUPPLY_PRESSURE)
+        return await self._client.read_field(MODES_BLOCK["nominal_supply_pressure"])
 
     async def set_nominal_supply_pressure(self, value: int) -> None:
-        await self._client.write_u16(self.REG_NOMINAL_SUPPLY_PRESSURE, value)
+        await self._client.write_field(MODES_BLOCK["nominal_supply_pressure"], value)
 
     async def nominal_exhaust_pressure(self) -> int:
-        return await self._client.read_u16(self.REG_VAV_SENSORS_RANGE)
+        return await self._client.read_field(MODES_BLOCK["nominal_exhaust_pressure"])
 
     async def set_nominal_exhaust_pressure(self, value: int) -> None:
-        await self._client.write_u16(self.REG_VAV_SENSORS_RANGE, value)
-
-
-_OP_MODE_OFFSET = {
-    OperationMode.COMFORT1: 100,
-    OperationMode.COMFORT2: 105,
-    OperationMode.ECONOMY1: 110,
-    OperationMode.ECONOMY2: 115,
-    OperationMode.SPECIAL: 120,
-}
+        await self._client.write_field(MODES_BLOCK["nominal_exhaust_pressure"], value)
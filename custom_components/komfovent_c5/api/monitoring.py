@@ -1,12 +1,17 @@
 import dataclasses
 import enum
 from collections.abc import Iterator
+from typing import Any
 
-from .client import Client, consume_i16, consume_u16, consume_u32
+from .client import Client, consume_buffer, consume_u16
 from .modes import OperationMode
+from .planner import RegisterImage, RegisterRange
+from .registers import Field, RegisterBlock
 from .settings import FlowUnits
 
 __all__ = [
+    "MONITORING_BLOCK1",
+    "MONITORING_BLOCK2",
     "C5Status",
     "Monitoring",
     "MonitoringState",
@@ -64,7 +69,116 @@ class ActiveFunctions(enum.IntFlag):
         return cls(consume_u16(registers))
 
 
-@dataclasses.dataclass(kw_only=True)
+# addresses are zero-based, the comments use the register numbers from the manual
+MONITORING_BLOCK1 = RegisterBlock(
+    # reg: 2000
+    Field(name="c5_status", address=1999, convert=C5Status),
+    Field(name="mode", address=2000, convert=OperationMode),
+    Field(name="supply_flow", address=2001, format="I"),
+    Field(name="exhaust_flow", address=2003, format="I"),
+    # reg: 2006
+    Field(name="supply_temp", address=2005, format="h", scale=10),
+    Field(name="extract_temp", address=2006, format="h", scale=10),
+    Field(name="outdoor_temp", address=2007, format="h", scale=10),
+    Field(name="exhaust_temp", address=2008, format="h", scale=10),
+    # reg: 2010
+    Field(name="return_water_temp", address=2009, format="h", scale=10),
+    Field(name="supply_air_pressure", address=2010),
+    Field(name="extract_air_pressure", address=2011),
+    Field(name="air_quality_sensor_type", address=2012, convert=AirQualitySensorType),
+    Field(name="air_quality_level", address=2013),
+    Field(name="supply_air_humidity", address=2014, scale=10),
+    Field(name="water_heater_level", address=2015, scale=10),
+    Field(name="water_cooler_level", address=2016, scale=10),
+    Field(name="humidity_control_level", address=2017, scale=10),
+    Field(name="heat_exchanger_level", address=2018, scale=10),
+    # reg: 2020
+    Field(name="recirculation_level", address=2019, scale=10),
+    Field(name="supply_fan_level", address=2020, scale=10),
+    Field(name="exhaust_fan_level", address=2021, scale=10),
+    Field(name="outdoor_air_damper_actuator_level", address=2022, scale=10),
+    Field(name="exhaust_air_damper_actuator_level", address=2023, scale=10),
+    Field(name="electric_heater_level", address=2024, scale=10),
+    Field(name="heat_pump_level", address=2025, format="h", scale=10),
+    Field(name="dx_level", address=2026, format="h", scale=10),
+    Field(name="ovr_input", address=2027, convert=bool),
+    Field(name="fire_system_input", address=2028, convert=bool),
+    # reg: 2030
+    Field(name="external_stop_input", address=2029, convert=bool),
+    Field(name="control_input", address=2030, convert=bool),
+    Field(name="temp_setpoint", address=2031, scale=10),
+    Field(name="supply_air_temp_setpoint", address=2032, scale=10),
+    Field(name="water_heater_pump", address=2033, convert=bool),
+    Field(name="water_cooler_pump", address=2034, convert=bool),
+    # reg: 2036
+    Field(name="supply_flow_setpoint", address=2035, format="I"),
+    Field(name="extract_flow_setpoint", address=2037, format="I"),
+    # reg: 2040
+    Field(
+        name="internal_supply_temp",
+        address=2039,
+        format="h",
+        scale=10,
+        sentinel=-0x8000,
+        extended=True,
+    ),
+)
+# flows are in the unit configured on the device
+_FLOW_FIELDS = (
+    "supply_flow",
+    "exhaust_flow",
+    "supply_flow_setpoint",
+    "extract_flow_setpoint",
+)
+
+MONITORING_BLOCK2 = RegisterBlock(
+    # reg: 2200
+    Field(
+        name="efficiencies_configuration",
+        address=2199,
+        convert=CountersEfficienciesConfiguration,
+    ),
+    Field(name="heat_exchanger_thermal_efficiency", address=2200, sentinel=0xFF),
+    Field(name="energy_saving", address=2201, sentinel=0xFF),
+    # reg: 2203
+    Field(
+        name="heat_exchanger_recovery", address=2202, format="I", sentinel=0xFFFF_FFFF
+    ),
+    # reg: 2205
+    Field(name="supply_sfp", address=2204, format="h", scale=100),
+    Field(name="exhaust_sfp", address=2205, format="h", scale=100),
+    Field(name="outdoor_air_filter_impurity_level", address=2206),
+    Field(name="exhaust_air_filter_impurity_level", address=2207),
+    # reg: 2209
+    Field(name="air_heater_operation_hours", address=2208, format="I"),
+    Field(name="supply_fan_operation_hours_or_kwh", address=2210, format="I"),
+    Field(name="exhaust_fan_operation_hours_or_kwh", address=2212, format="I"),
+    # reg: 2215
+    Field(name="supply_fan_power", address=2214),
+    Field(name="exhaust_fan_power", address=2215),
+    Field(name="active_functions", address=2216, convert=ActiveFunctions),
+    # reg: 2218
+    Field(name="air_cooler_operation_hours", address=2217, format="I"),
+    Field(name="heat_exchanger_operation_kwh", address=2219, format="I"),
+    Field(name="air_heater_operation_kwh", address=2221, format="I"),
+)
+
+
+def _unpack_block1(
+    buffer: bytes | memoryview,
+    *,
+    units: FlowUnits,
+    is_extended: bool,
+    into: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    values = MONITORING_BLOCK1.unpack(buffer, is_extended=is_extended, into=into)
+    flow_factor = units.common_factor()
+    for name in _FLOW_FIELDS:
+        values[name] *= flow_factor
+    return values
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
 class MonitoringStateBlock1:
     c5_status: C5Status
     mode: OperationMode
@@ -111,100 +225,21 @@ class MonitoringStateBlock1:
     def consume_from_registers(
         cls, registers: Iterator[int], *, units: FlowUnits, is_extended: bool
     ):
-        # reg: 2000
-        c5_status = C5Status.consume_from_registers(registers)
-        mode = OperationMode.consume_from_registers(registers)
-        # reg: 2002
-        supply_flow = consume_u32(registers) * units.common_factor()
-        exhaust_flow = consume_u32(registers) * units.common_factor()
-        # reg: 2006
-        supply_temp = consume_i16(registers) / 10.0
-        extract_temp = consume_i16(registers) / 10.0
-        outdoor_temp = consume_i16(registers) / 10.0
-        exhaust_temp = consume_i16(registers) / 10.0
-        # reg: 2010
-        return_water_temp = consume_i16(registers) / 10.0
-        supply_air_pressure = consume_u16(registers)
-        extract_air_pressure = consume_u16(registers)
-        air_quality_sensor_type = AirQualitySensorType.consume_from_registers(registers)
-        air_quality_level = consume_u16(registers)
-        supply_air_humidity = consume_u16(registers) / 10.0
-        water_heater_level = consume_u16(registers) / 10.0
-        water_cooler_level = consume_u16(registers) / 10.0
-        humidity_control_level = consume_u16(registers) / 10.0
-        heat_exchanger_level = consume_u16(registers) / 10.0
-        # reg: 2020
-        recirculation_level = consume_u16(registers) / 10.0
-        supply_fan_level = consume_u16(registers) / 10.0
-        exhaust_fan_level = consume_u16(registers) / 10.0
-        outdoor_air_damper_actuator_level = consume_u16(registers) / 10.0
-        exhaust_air_damper_actuator_level = consume_u16(registers) / 10.0
-        electric_heater_level = consume_u16(registers) / 10.0
-        heat_pump_level = consume_i16(registers) / 10.0
-        dx_level = consume_i16(registers) / 10.0
-        ovr_input = bool(consume_u16(registers))
-        fire_system_input = bool(consume_u16(registers))
-        # reg: 2030
-        external_stop_input = bool(consume_u16(registers))
-        control_input = bool(consume_u16(registers))
-        temp_setpoint = consume_u16(registers) / 10.0
-        supply_air_temp_setpoint = consume_u16(registers) / 10.0
-        water_heater_pump = bool(consume_u16(registers))
-        water_cooler_pump = bool(consume_u16(registers))
-        # reg: 2036
-        supply_flow_setpoint = consume_u32(registers) * units.common_factor()
-        extract_flow_setpoint = consume_u32(registers) * units.common_factor()
-
-        if is_extended:
-            # reg: 2040
-            raw = consume_i16(registers)
-            # use 'None' if register is 0xFFFF
-            internal_supply_temp = None if raw == -0x8000 else raw / 10.0
-        else:
-            internal_supply_temp = None
-
-        return cls(
-            c5_status=c5_status,
-            mode=mode,
-            supply_flow=supply_flow,
-            exhaust_flow=exhaust_flow,
-            supply_temp=supply_temp,
-            extract_temp=extract_temp,
-            outdoor_temp=outdoor_temp,
-            exhaust_temp=exhaust_temp,
-            return_water_temp=return_water_temp,
-            supply_air_pressure=supply_air_pressure,
-            extract_air_pressure=extract_air_pressure,
-            air_quality_sensor_type=air_quality_sensor_type,
-            air_quality_level=air_quality_level,
-            supply_air_humidity=supply_air_humidity,
-            water_heater_level=water_heater_level,
-            water_cooler_level=water_cooler_level,
-            humidity_control_level=humidity_control_level,
-            heat_exchanger_level=heat_exchanger_level,
-            recirculation_level=recirculation_level,
-            supply_fan_level=supply_fan_level,
-            exhaust_fan_level=exhaust_fan_level,
-            outdoor_air_damper_actuator_level=outdoor_air_damper_actuator_level,
-            exhaust_air_damper_actuator_level=exhaust_air_damper_actuator_level,
-            electric_heater_level=electric_heater_level,
-            heat_pump_level=heat_pump_level,
-            dx_level=dx_level,
-            ovr_input=ovr_input,
-            fire_system_input=fire_system_input,
-            external_stop_input=external_stop_input,
-            control_input=control_input,
-            temp_setpoint=temp_setpoint,
-            supply_air_temp_setpoint=supply_air_temp_setpoint,
-            water_heater_pump=water_heater_pump,
-            water_cooler_pump=water_cooler_pump,
-            supply_flow_setpoint=supply_flow_setpoint,
-            extract_flow_setpoint=extract_flow_setpoint,
-            internal_supply_temp=internal_supply_temp,
+        rng = MONITORING_BLOCK1.range(is_extended=is_extended)
+        return cls.from_buffer(
+            consume_buffer(registers, rng.count),
+            units=units,
+            is_extended=is_extended,
         )
 
+    @classmethod
+    def from_buffer(
+        cls, buffer: bytes | memoryview, *, units: FlowUnits, is_extended: bool
+    ):
+        return cls(**_unpack_block1(buffer, units=units, is_extended=is_extended))
+
 
-@dataclasses.dataclass(kw_only=True)
+@dataclasses.dataclass(slots=True, kw_only=True)
 class MonitoringStateBlock2:
     efficiencies_configuration: CountersEfficienciesConfiguration
     heat_exchanger_thermal_efficiency: int | None
@@ -226,112 +261,152 @@ class MonitoringStateBlock2:
 
     @classmethod
     def consume_from_registers(cls, registers: Iterator[int]):
-        # reg: 2200
-        efficiencies_configuration = (
-            CountersEfficienciesConfiguration.consume_from_registers(registers)
-        )
-        heat_exchanger_thermal_efficiency: int | None = consume_u16(registers)
-        if heat_exchanger_thermal_efficiency == 0xFF:
-            heat_exchanger_thermal_efficiency = None
-        energy_saving: int | None = consume_u16(registers)
-        if energy_saving == 0xFF:
-            energy_saving = None
-        # reg: 2203
-        heat_exchanger_recovery: int | None = consume_u32(registers)
-        if heat_exchanger_recovery == 0xFFFF_FFFF:
-            heat_exchanger_recovery = None
-        # reg: 2205
-        supply_sfp = consume_i16(registers) / 100.0
-        exhaust_sfp = consume_i16(registers) / 100.0
-        outdoor_air_filter_impurity_level = consume_u16(registers)
-        exhaust_air_filter_impurity_level = consume_u16(registers)
-        # reg: 2209
-        air_heater_operation_hours = consume_u32(registers)
-        supply_fan_operation_hours_or_kwh = consume_u32(registers)
-        exhaust_fan_operation_hours_or_kwh = consume_u32(registers)
-        # reg: 2215
-        supply_fan_power = consume_u16(registers)
-        exhaust_fan_power = consume_u16(registers)
-        active_functions = ActiveFunctions.consume_from_registers(registers)
-        # reg: 2218
-        air_cooler_operation_hours = consume_u32(registers)
-        heat_exchanger_operation_kwh = consume_u32(registers)
-        air_heater_operation_kwh = consume_u32(registers)
-
-        return cls(
-            efficiencies_configuration=efficiencies_configuration,
-            heat_exchanger_thermal_efficiency=heat_exchanger_thermal_efficiency,
-            energy_saving=energy_saving,
-            heat_exchanger_recovery=heat_exchanger_recovery,
-            supply_sfp=supply_sfp,
-            exhaust_sfp=exhaust_sfp,
-            outdoor_air_filter_impurity_level=outdoor_air_filter_impurity_level,
-            exhaust_air_filter_impurity_level=exhaust_air_filter_impurity_level,
-            air_heater_operation_hours=air_heater_operation_hours,
-            supply_fan_operation_hours_or_kwh=supply_fan_operation_hours_or_kwh,
-            exhaust_fan_operation_hours_or_kwh=exhaust_fan_operation_hours_or_kwh,
-            supply_fan_power=supply_fan_power,
-            exhaust_fan_power=exhaust_fan_power,
-            active_functions=active_functions,
-            air_cooler_operation_hours=air_cooler_operation_hours,
-            heat_exchanger_operation_kwh=heat_exchanger_operation_kwh,
-            air_heater_operation_kwh=air_heater_operation_kwh,
-        )
+        rng = MONITORING_BLOCK2.range(is_extended=False)
+        return cls.from_buffer(consume_buffer(registers, rng.count))
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes | memoryview):
+        return cls(**MONITORING_BLOCK2.unpack(buffer, is_extended=False))
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class MonitoringState(MonitoringStateBlock1):
+    """Both monitoring blocks in a single snapshot.
 
+    Slotted classes can't have multiple slotted bases, so the fields of block 2 are repeated here.
+    """
+
+    # block 2, see 'MonitoringStateBlock2'
+    efficiencies_configuration: CountersEfficienciesConfiguration
+    heat_exchanger_thermal_efficiency: int | None
+    energy_saving: int | None
+    heat_exchanger_recovery: int | None
+    supply_sfp: float
+    exhaust_sfp: float
+    outdoor_air_filter_impurity_level: int
+    exhaust_air_filter_impurity_level: int
+    air_heater_operation_hours: int
+    supply_fan_operation_hours_or_kwh: int
+    exhaust_fan_operation_hours_or_kwh: int
+    supply_fan_power: int
+    exhaust_fan_power: int
+    active_functions: ActiveFunctions
+    air_cooler_operation_hours: int
+    heat_exchanger_operation_kwh: int
+    air_heater_operation_kwh: int
 
-@dataclasses.dataclass(kw_only=True)
-class MonitoringState(MonitoringStateBlock1, MonitoringStateBlock2):  # type: ignore
     @classmethod
     def combine(cls, block1: MonitoringStateBlock1, block2: MonitoringStateBlock2):
-        return cls(**dataclasses.asdict(block1), **dataclasses.asdict(block2))
+        values = {name: getattr(block1, name) for name in _BLOCK1_NAMES}
+        for name in _BLOCK2_NAMES:
+            values[name] = getattr(block2, name)
+        return cls(**values)
+
+    @classmethod
+    def from_buffers(
+        cls,
+        buffer1: bytes | memoryview | None,
+        buffer2: bytes | memoryview | None,
+        *,
+        units: FlowUnits,
+        is_extended: bool,
+        previous: "MonitoringState | None" = None,
+    ) -> "MonitoringState":
+        """Decode the given blocks, a block without a buffer is taken from `previous`."""
+        if previous is None:
+            assert buffer1 is not None and buffer2 is not None
+            values: dict[str, Any] = {}
+        else:
+            values = {name: getattr(previous, name) for name in _STATE_NAMES}
+        if buffer1 is not None:
+            _unpack_block1(buffer1, units=units, is_extended=is_extended, into=values)
+        if buffer2 is not None:
+            MONITORING_BLOCK2.unpack(buffer2, is_extended=False, into=values)
+        return cls(**values)
+
+
+_BLOCK1_NAMES = tuple(field.name for field in dataclasses.fields(MonitoringStateBlock1))
+_BLOCK2_NAMES = tuple(field.name for field in dataclasses.fields(MonitoringStateBlock2))
+_STATE_NAMES = (*_BLOCK1_NAMES, *_BLOCK2_NAMES)
 
 
 class Monitoring:
     # block 1
-    REG_C5_STATUS = 1999
-    REG_EXTRACT_FLOW_SETPOINT = 2037
+    REG_C5_STATUS = MONITORING_BLOCK1["c5_status"].address
+    REG_EXTRACT_FLOW_SETPOINT = MONITORING_BLOCK1["extract_flow_setpoint"].address
     # extended set
-    REG_INTERNAL_SUPPLY_TEMP = 2039
+    REG_INTERNAL_SUPPLY_TEMP = MONITORING_BLOCK1["internal_supply_temp"].address
 
     # block 2
-    REG_COUNTERS_EFFICIENCIES_CONFIG = 2199
-    REG_AIR_HEATER_OPERATION_ENERGY = 2221
+    REG_COUNTERS_EFFICIENCIES_CONFIG = MONITORING_BLOCK2[
+        "efficiencies_configuration"
+    ].address
+    REG_AIR_HEATER_OPERATION_ENERGY = MONITORING_BLOCK2[
+        "air_heater_operation_kwh"
+    ].address
 
     _client: Client
 
     def __init__(self, client: Client) -> None:
         self._client = client
 
-    async def read_block1(
-        self, *, units: FlowUnits, is_extended: bool
+    def plan_block1(self, *, is_extended: bool) -> list[RegisterRange]:
+        return MONITORING_BLOCK1.plan(is_extended=is_extended)
+
+    def decode_block1(
+        self, image: RegisterImage, *, units: FlowUnits, is_extended: bool
     ) -> MonitoringStateBlock1:
-        end = (
-            self.REG_INTERNAL_SUPPLY_TEMP
-            if is_extended
-            else (self.REG_EXTRACT_FLOW_SETPOINT + 1)
-        )
-        registers = await self._client.read_many_u16(
-            self.REG_C5_STATUS,
-            (end - self.REG_C5_STATUS) + 1,
-        )
-        return MonitoringStateBlock1.consume_from_registers(
-            iter(registers),
+        rng = MONITORING_BLOCK1.range(is_extended=is_extended)
+        return MonitoringStateBlock1.from_buffer(
+            image.buffer(rng.address, rng.count),
             units=units,
             is_extended=is_extended,
         )
 
+    async def read_block1(
+        self, *, units: FlowUnits, is_extended: bool
+    ) -> MonitoringStateBlock1:
+        image = await self._client.read_ranges(
+            self.plan_block1(is_extended=is_extended)
+        )
+        return self.decode_block1(image, units=units, is_extended=is_extended)
+
+    def plan_block2(self) -> list[RegisterRange]:
+        return MONITORING_BLOCK2.plan(is_extended=False)
+
+    def decode_block2(self, image: RegisterImage) -> MonitoringStateBlock2:
+        rng = MONITORING_BLOCK2.range(is_extended=False)
+        return MonitoringStateBlock2.from_buffer(image.buffer(rng.address, rng.count))
+
     async def read_block2(self) -> MonitoringStateBlock2:
-        registers = await self._client.read_many_u16(
-            self.REG_COUNTERS_EFFICIENCIES_CONFIG,
-            (
-                (self.REG_AIR_HEATER_OPERATION_ENERGY + 1)
-                - self.REG_COUNTERS_EFFICIENCIES_CONFIG
-            )
-            + 1,
+        image = await self._client.read_ranges(self.plan_block2())
+        return self.decode_block2(image)
+
+    def plan_all(self, *, is_extended: bool) -> list[RegisterRange]:
+        return [*self.plan_block1(is_extended=is_extended), *self.plan_block2()]
+
+    def decode_all(
+        self,
+        image: RegisterImage,
+        *,
+        units: FlowUnits,
+        is_extended: bool,
+        previous: MonitoringState | None = None,
+        block1: bool = True,
+        block2: bool = True,
+    ) -> MonitoringState:
+        """Decode the monitoring state, blocks that weren't read (`block1`/`block2`) are taken from `previous`."""
+        buffer1 = buffer2 = None
+        if block1:
+            rng = MONITORING_BLOCK1.range(is_extended=is_extended)
+            buffer1 = image.buffer(rng.address, rng.count)
+        if block2:
+            rng = MONITORING_BLOCK2.range(is_extended=False)
+            buffer2 = image.buffer(rng.address, rng.count)
+        return MonitoringState.from_buffers(
+            buffer1, buffer2, units=units, is_extended=is_extended, previous=previous
         )
-        return MonitoringStateBlock2.consume_from_registers(iter(registers))
 
     async def read_all(self, *, units: FlowUnits, is_extended: bool) -> MonitoringState:
-        block1 = await self.read_block1(units=units, is_extended=is_extended)
-        block2 = await self.read_block2()
-        return MonitoringState.combine(block1, block2)
+        image = await self._client.read_ranges(self.plan_all(is_extended=is_extended))
+        return self.decode_all(image, units=units, is_extended=is_extended)
@@ -0,0 +1,75 @@
+import dataclasses
+import struct
+from collections.abc import Iterable, Iterator
+
+__all__ = [
+    "RegisterImage",
+    "RegisterRange",
+    "plan_reads",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class RegisterRange:
+    address: int
+    count: int
+
+    @property
+    def end(self) -> int:
+        return self.address + self.count
+
+
+def plan_reads(
+    ranges: Iterable[RegisterRange], *, max_gap: int, max_count: int
+) -> list[RegisterRange]:
+    """Merge the given ranges into as few reads as possible.
+
+    Ranges that overlap or are separated by at most `max_gap` registers are merged, as long as the merged
+    read doesn't exceed `max_count` registers. The registers in the gaps are read but never used.
+    """
+    plan: list[RegisterRange] = []
+    for rng in sorted(ranges, key=lambda rng: rng.address):
+        if plan:
+            last = plan[-1]
+            end = max(last.end, rng.end)
+            if rng.address - last.end <= max_gap and end - last.address <= max_count:
+                plan[-1] = RegisterRange(last.address, end - last.address)
+                continue
+        plan.append(rng)
+    return plan
+
+
+class RegisterImage:
+    """Registers returned by a planned read.
+
+    Every read block is also kept as one contiguous big-endian buffer, which decoders can slice without copying.
+    """
+
+    _blocks: list[tuple[int, list[int], bytes]]
+
+    def __init__(self) -> None:
+        self._blocks = []
+
+    def add(self, address: int, registers: list[int]) -> None:
+        buffer = struct.pack(f">{len(registers)}H", *registers)
+        self._blocks.append((address, registers, buffer))
+
+    def registers(self, address: int, count: int) -> list[int]:
+        start, registers, _ = self._find(address, count)
+        offset = address - start
+        return registers[offset : offset + count]
+
+    def iter(self, address: int, count: int) -> Iterator[int]:
+        return iter(self.registers(address, count))
+
+    def buffer(self, address: int, count: int) -> memoryview:
+        start, _, buffer = self._find(address, count)
+        offset = 2 * (address - start)
+        return memoryview(buffer)[offset : offset + 2 * count]
+
+    def _find(self, address: int, count: int) -> tuple[int, list[int], bytes]:
+        for block in self._blocks:
+            offset = address - block[0]
+            if offset >= 0 and offset + count <= len(block[1]):
+                return block
+        raise ValueError(f"registers {address}..{address + count} weren't read")
@@ -0,0 +1,146 @@
+import enum
+import time
+import zlib
+from collections.abc import Callable, Iterable, Mapping
+
+__all__ = [
+    "AdaptiveInterval",
+    "PollSchedule",
+    "PollTier",
+    "delay_until_slot",
+    "poll_phase",
+]
+
+
+class PollTier(enum.Enum):
+    # live values like temperatures, flows and fan levels
+    FAST = "fast"
+    # slowly changing values like counters and efficiencies
+    SLOW = "slow"
+    # configuration, only changes when someone changes it
+    CONFIG = "config"
+
+
+class PollSchedule:
+    """Keeps track of which tiers of a poll are due.
+
+    A tier is due once its interval has passed since it was last read, or if it was invalidated.
+    Tiers without an interval are only read when they're invalidated (and for the first poll).
+    """
+
+    _intervals: dict[PollTier, float | None]
+    _clock: Callable[[], float]
+    # tier -> start of the last successful read
+    _last_read: dict[PollTier, float]
+    # tier -> time it was invalidated
+    _stale: dict[PollTier, float]
+    _poll_started: float
+
+    def __init__(
+        self,
+        intervals: Mapping[PollTier, float | None],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._intervals = dict(intervals)
+        self._clock = clock
+        self._last_read = {}
+        self._stale = {}
+        self._poll_started = 0.0
+
+    def due(self) -> set[PollTier]:
+        """Get the tiers to read with the poll that starts now."""
+        now = self._poll_started = self._clock()
+        due = set(self._stale)
+        for tier, interval in self._intervals.items():
+            last_read = self._last_read.get(tier)
+            if last_read is None or (
+                interval is not None and now - last_read >= interval
+            ):
+                due.add(tier)
+        return due
+
+    def mark_read(self, tiers: Iterable[PollTier]) -> None:
+        """Record a successful read of the tiers returned by the last call to `due`."""
+        for tier in tiers:
+            self._last_read[tier] = self._poll_started
+            # an invalidation during the poll might not be reflected in what was read
+            if self._stale.get(tier, float("inf")) <= self._poll_started:
+                del self._stale[tier]
+
+    def invalidate(self, *tiers: PollTier) -> None:
+        """Read the given tiers with the next poll, regardless of their interval."""
+        now = self._clock()
+        for tier in tiers:
+            self._stale[tier] = now
+
+
+DEFAULT_STABLE_POLLS = 3
+
+
+class AdaptiveInterval:
+    """Poll interval that backs off while nothing is happening.
+
+    Once nothing has changed for `stable_polls` polls, or while the unit is idle, every further poll doubles
+    the interval up to `max_interval`. Any change snaps it back to `min_interval`.
+    """
+
+    _min_interval: float
+    _max_interval: float
+    _stable_polls: int
+    _interval: float
+    # polls since the last change
+    _unchanged: int
+
+    def __init__(
+        self,
+        *,
+        min_interval: float,
+        max_interval: float,
+        stable_polls: int = DEFAULT_STABLE_POLLS,
+    ) -> None:
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._stable_polls = stable_polls
+        self._interval = min_interval
+        self._unchanged = 0
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def update(self, *, changed: bool, idle: bool = False) -> float:
+        """Account for the result of a poll and get the interval until the next one."""
+        if changed:
+            self.reset()
+            return self._interval
+        self._unchanged += 1
+        if idle or self._unchanged >= self._stable_polls:
+            self._interval = min(self._max_interval, 2 * self._interval)
+        return self._interval
+
+    def reset(self) -> None:
+        """Go back to the shortest interval, for example because the user interacted with the unit."""
+        self._interval = self._min_interval
+        self._unchanged = 0
+
+
+def poll_phase(key: str) -> float:
+    """Deterministic phase in [0, 1) for `key`.
+
+    Unlike 'hash' this is stable across restarts, so a poller keeps its slot.
+    """
+    return zlib.crc32(key.encode()) / 2**32
+
+
+def delay_until_slot(interval: float, phase: float, *, now: float) -> float:
+    """Time from `now` until the next poll slot.
+
+    Slots are `interval` apart and shifted by `phase` (as a fraction of the interval) against the epoch.
+    Pollers with different phases are spread across the interval instead of polling in lockstep.
+    The delay is at least half an interval, so aligning to the slots never causes polls in quick succession.
+    """
+    delay = (phase * interval - now) % interval
+    if delay < interval / 2:
+        delay += interval
+    return delay
@@ -0,0 +1,348 @@
+import asyncio
+import collections
+import dataclasses
+import enum
+import struct
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import BinaryIO
+
+from .transport import DEFAULT_UNIT, MAX_READ_COUNT, ModbusError, Transport
+
+__all__ = [
+    "RecordedTransaction",
+    "RecordingTransport",
+    "ReplayError",
+    "ReplayTransport",
+    "read_recording",
+]
+
+MAGIC = b"KC5R"
+VERSION = 1
+# magic, version, max read count of the recorded transport
+_HEADER = struct.Struct("<4sHH")
+# start, duration, operation, outcome, exception code, unit, address, number of registers that follow
+_RECORD = struct.Struct("<dfBBBBHH")
+# stands in for a missing exception code
+_NO_EXCEPTION_CODE = 0xFF
+
+
+class RecordedOperation(enum.IntEnum):
+    READ = 1
+    WRITE_SINGLE = 2
+    WRITE_MULTIPLE = 3
+
+
+class RecordedOutcome(enum.IntEnum):
+    OK = 0
+    MODBUS_ERROR = 1
+    TIMEOUT = 2
+    CONNECTION_ERROR = 3
+    # any other exception, like an 'OSError' from the socket
+    FAILURE = 4
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class RecordedTransaction:
+    # seconds since the start of the recording
+    start: float
+    duration: float
+    operation: RecordedOperation
+    outcome: RecordedOutcome
+    exception_code: int | None
+    unit: int
+    address: int
+    # number of registers requested, also known for failed reads
+    count: int
+    # registers that were read, or written
+    registers: tuple[int, ...]
+
+
+class RecordingTransport(Transport):
+    """Writes every request and its response, with timing, to a file.
+
+    Every transaction takes a fixed-size header plus two bytes per register. The result can be fed back
+    with `ReplayTransport`.
+    """
+
+    _inner: Transport
+    _file: BinaryIO
+    _clock: Callable[[], float]
+    _started: float
+
+    def __init__(
+        self,
+        inner: Transport,
+        file: BinaryIO,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._inner = inner
+        self._file = file
+        self._clock = clock
+        self._started = clock()
+        file.write(_HEADER.pack(MAGIC, VERSION, inner.max_read_count))
+
+    @property
+    def connected(self) -> bool:
+        return self._inner.connected
+
+    @property
+    def max_read_count(self) -> int:
+        return self._inner.max_read_count
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        await self._inner.connect(connect_timeout)
+
+    async def close(self) -> None:
+        await self._inner.close()
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        start = self._clock()
+        try:
+            registers = await self._inner.read_holding_registers(
+                address, count, unit=unit
+            )
+        except Exception as exc:
+            self._write(
+                start, RecordedOperation.READ, unit, address, count, (), error=exc
+            )
+            raise
+        self._write(start, RecordedOperation.READ, unit, address, count, registers)
+        return registers
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        start = self._clock()
+        try:
+            await self._inner.write_register(address, value, unit=unit)
+        except Exception as exc:
+            self._write(
+                start,
+                RecordedOperation.WRITE_SINGLE,
+                unit,
+                address,
+                1,
+                (value,),
+                error=exc,
+            )
+            raise
+        self._write(start, RecordedOperation.WRITE_SINGLE, unit, address, 1, (value,))
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        start = self._clock()
+        try:
+            await self._inner.write_registers(address, values, unit=unit)
+        except Exception as exc:
+            self._write(
+                start,
+                RecordedOperation.WRITE_MULTIPLE,
+                unit,
+                address,
+                len(values),
+                values,
+                error=exc,
+            )
+            raise
+        self._write(
+            start, RecordedOperation.WRITE_MULTIPLE, unit, address, len(values), values
+        )
+
+    def _write(
+        self,
+        start: float,
+        operation: RecordedOperation,
+        unit: int,
+        address: int,
+        count: int,
+        registers: Sequence[int],
+        *,
+        error: Exception | None = None,
+    ) -> None:
+        duration = self._clock() - start
+        exception_code = None
+        if error is None:
+            outcome = RecordedOutcome.OK
+        elif isinstance(error, ModbusError):
+            outcome = RecordedOutcome.MODBUS_ERROR
+            exception_code = error.exception_code
+        elif isinstance(error, TimeoutError):
+            outcome = RecordedOutcome.TIMEOUT
+        elif isinstance(error, ConnectionError):
+            outcome = RecordedOutcome.CONNECTION_ERROR
+        else:
+            outcome = RecordedOutcome.FAILURE
+        self._file.write(
+            _RECORD.pack(
+                start - self._started,
+                duration,
+                operation,
+                outcome,
+                _NO_EXCEPTION_CODE if exception_code is None else exception_code,
+                unit,
+                address,
+                count,
+            )
+        )
+        if registers:
+            self._file.write(struct.pack(f">{len(registers)}H", *registers))
+
+
+def _read_header(file: BinaryIO) -> int:
+    header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("not a transaction recording")
+    magic, version, max_read_count = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a transaction recording")
+    return max_read_count
+
+
+def _read_records(file: BinaryIO) -> Iterator[RecordedTransaction]:
+    while record := file.read(_RECORD.size):
+        if len(record) < _RECORD.size:
+            # cut off while recording
+            return
+        start, duration, operation, outcome, exception_code, unit, address, count = (
+            _RECORD.unpack(record)
+        )
+        operation = RecordedOperation(operation)
+        outcome = RecordedOutcome(outcome)
+        registers: tuple[int, ...] = ()
+        if operation != RecordedOperation.READ or outcome == RecordedOutcome.OK:
+            payload = file.read(2 * count)
+            if len(payload) < 2 * count:
+                return
+            registers = struct.unpack(f">{count}H", payload)
+        yield RecordedTransaction(
+            start=start,
+            duration=duration,
+            operation=operation,
+            outcome=outcome,
+            exception_code=None
+            if exception_code == _NO_EXCEPTION_CODE
+            else exception_code,
+            unit=unit,
+            address=address,
+            count=count,
+            registers=registers,
+        )
+
+
+def read_recording(file: BinaryIO) -> Iterator[RecordedTransaction]:
+    """Transactions of a recording in the order they completed."""
+    _read_header(file)
+    return _read_records(file)
+
+
+class ReplayError(Exception):
+    """A request that isn't part of the recording."""
+
+
+class ReplayTransport(Transport):
+    """Answers requests from a recording made by `RecordingTransport`.
+
+    Requests are matched to recorded transactions with the same operation, unit, address and size, in the
+    order they were recorded. The recorded errors are raised again, failures other than error responses,
+    timeouts and connection errors are raised as `OSError`.
+    With `realtime` every response takes as long as it did originally, otherwise replies are immediate.
+    The pace of the polls is up to the caller.
+    Written values aren't checked, since they depend on whatever the caller decides to write.
+    """
+
+    _max_read_count: int
+    _realtime: bool
+    _connected: bool
+    _pending: dict[
+        tuple[RecordedOperation, int, int, int], collections.deque[RecordedTransaction]
+    ]
+
+    def __init__(
+        self,
+        transactions: Iterable[RecordedTransaction],
+        *,
+        max_read_count: int = MAX_READ_COUNT,
+        realtime: bool = False,
+    ) -> None:
+        self._max_read_count = max_read_count
+        self._realtime = realtime
+        self._connected = False
+        self._pending = collections.defaultdict(collections.deque)
+        for transaction in transactions:
+            key = (
+                transaction.operation,
+                transaction.unit,
+                transaction.address,
+                transaction.count,
+            )
+            self._pending[key].append(transaction)
+
+    @classmethod
+    def from_file(cls, file: BinaryIO, *, realtime: bool = False) -> "ReplayTransport":
+        max_read_count = _read_header(file)
+        return cls(
+            _read_records(file), max_read_count=max_read_count, realtime=realtime
+        )
+
+    @property
+    def remaining(self) -> int:
+        """Number of recorded transactions that haven't been replayed yet."""
+        return sum(len(pending) for pending in self._pending.values())
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def max_read_count(self) -> int:
+        return self._max_read_count
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        self._connected = True
+
+    async def close(self) -> None:
+        self._connected = False
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        transaction = await self._replay(RecordedOperation.READ, unit, address, count)
+        return list(transaction.registers)
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._replay(RecordedOperation.WRITE_SINGLE, unit, address, 1)
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._replay(RecordedOperation.WRITE_MULTIPLE, unit, address, len(values))
+
+    async def _replay(
+        self, operation: RecordedOperation, unit: int, address: int, count: int
+    ) -> RecordedTransaction:
+        pending = self._pending.get((operation, unit, address, count))
+        if not pending:
+            raise ReplayError(
+                f"no recorded {operation.name.lower()} of {count} registers at {address} for unit {unit}"
+            )
+        transaction = pending.popleft()
+        if self._realtime:
+            await asyncio.sleep(transaction.duration)
+        if transaction.outcome == RecordedOutcome.MODBUS_ERROR:
+            raise ModbusError(
+                "recorded error response", exception_code=transaction.exception_code
+            )
+        if transaction.outcome == RecordedOutcome.TIMEOUT:
+            raise TimeoutError("recorded timeout")
+        if transaction.outcome == RecordedOutcome.CONNECTION_ERROR:
+            raise ConnectionError("recorded connection error")
+        if transaction.outcome == RecordedOutcome.FAILURE:
+            raise OSError("recorded failure")
+        return transaction
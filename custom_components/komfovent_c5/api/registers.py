@@ -0,0 +1,157 @@
+import dataclasses
+import struct
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from .planner import RegisterImage, RegisterRange
+
+__all__ = [
+    "Field",
+    "RegisterBlock",
+]
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class Field:
+    """A single value in the register map.
+
+    `format` is a big-endian struct format (without the byte order) that covers whole registers.
+    Formats with more than one item (like a couple of u8 in one register) pass all items to `convert`.
+    """
+
+    name: str
+    address: int
+    format: str = "H"
+    # the raw value is the actual value times `scale`
+    scale: int = 1
+    # raw value the device uses for "not available", decoded as 'None'
+    sentinel: int | None = None
+    # only available with the extended register set
+    extended: bool = False
+    convert: Callable[..., Any] | None = None
+
+    @property
+    def count(self) -> int:
+        return struct.calcsize(">" + self.format) // 2
+
+    @property
+    def range(self) -> RegisterRange:
+        return RegisterRange(self.address, self.count)
+
+    def decode(self, raw: Sequence[Any]) -> Any:
+        if len(raw) > 1:
+            return raw if self.convert is None else self.convert(*raw)
+        (value,) = raw
+        if value == self.sentinel:
+            return None
+        if self.scale != 1:
+            value /= self.scale
+        if self.convert is not None:
+            value = self.convert(value)
+        return value
+
+    def encode(self, value: Any) -> list[int]:
+        if self.scale != 1:
+            value = round(value * self.scale)
+        try:
+            buffer = struct.pack(">" + self.format, int(value))
+        except struct.error as exc:
+            raise ValueError(f"{value!r} is out of range for {self.name}") from exc
+        return list(struct.unpack(f">{self.count}H", buffer))
+
+    def unpack(self, registers: Sequence[int]) -> Any:
+        buffer = struct.pack(f">{len(registers)}H", *registers)
+        return self.decode(struct.unpack(">" + self.format, buffer))
+
+
+class RegisterBlock:
+    """Fields that are always read together.
+
+    The read range and the struct layout are derived from the fields, registers between fields are skipped.
+    Fields of the extended register set are only read (and decoded) when the device supports them, otherwise
+    they decode as 'None'.
+    """
+
+    fields: tuple[Field, ...]
+    _layouts: dict[bool, "_Layout"]
+
+    def __init__(self, *fields: Field) -> None:
+        self.fields = tuple(sorted(fields, key=lambda field: field.address))
+        for previous, field in zip(self.fields, self.fields[1:], strict=False):
+            if previous.address + previous.count > field.address:
+                raise ValueError(f"field {field.name} overlaps {previous.name}")
+        self._layouts = {
+            is_extended: self._build_layout(is_extended=is_extended)
+            for is_extended in (False, True)
+        }
+
+    def __getitem__(self, name: str) -> Field:
+        for field in self.fields:
+            if field.name == name:
+                return field
+        raise KeyError(name)
+
+    def range(self, *, is_extended: bool) -> RegisterRange:
+        return self._layouts[is_extended].range
+
+    def plan(self, *, is_extended: bool) -> list[RegisterRange]:
+        return [self.range(is_extended=is_extended)]
+
+    def unpack(
+        self,
+        buffer: bytes | memoryview,
+        offset: int = 0,
+        *,
+        is_extended: bool,
+        into: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Decode the block from a buffer that starts at the block's first register.
+
+        The values are added to `into` if given, so multiple blocks can be collected in a single dict.
+        """
+        layout = self._layouts[is_extended]
+        raw = layout.struct.unpack_from(buffer, offset)
+        values: dict[str, Any] = {} if into is None else into
+        for name in layout.missing:
+            values[name] = None
+        for field, start, end in layout.slices:
+            values[field.name] = field.decode(raw[start:end])
+        return values
+
+    def decode(self, image: RegisterImage, *, is_extended: bool) -> dict[str, Any]:
+        rng = self.range(is_extended=is_extended)
+        return self.unpack(
+            image.buffer(rng.address, rng.count), is_extended=is_extended
+        )
+
+    def _build_layout(self, *, is_extended: bool) -> "_Layout":
+        fields = [field for field in self.fields if is_extended or not field.extended]
+        start = fields[0].address
+        fmt = ">"
+        address = start
+        slices: list[tuple[Field, int, int]] = []
+        items = 0
+        for field in fields:
+            if field.address > address:
+                fmt += f"{2 * (field.address - address)}x"
+            fmt += field.format
+            address = field.address + field.count
+            field_items = len(struct.unpack(">" + field.format, bytes(2 * field.count)))
+            slices.append((field, items, items + field_items))
+            items += field_items
+        return _Layout(
+            range=RegisterRange(start, address - start),
+            struct=struct.Struct(fmt),
+            slices=tuple(slices),
+            missing=tuple(field.name for field in self.fields if field not in fields),
+        )
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class _Layout:
+    range: RegisterRange
+    struct: struct.Struct
+    # field and the slice of the unpacked items that belongs to it
+    slices: tuple[tuple[Field, int, int], ...]
+    # fields that aren't part of the layout, they decode as 'None'
+    missing: tuple[str, ...]
@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+import contextvars
+import enum
+import heapq
+import itertools
+from collections.abc import Iterator
+from types import TracebackType
+
+__all__ = [
+    "Priority",
+    "PriorityScheduler",
+    "current_priority",
+    "request_priority",
+]
+
+
+class Priority(enum.IntEnum):
+    """Scheduling class of a request, lower values are sent first."""
+
+    INTERACTIVE_WRITE = 0
+    INTERACTIVE_READ = 1
+    BACKGROUND_POLL = 2
+    BULK = 3
+
+
+_PRIORITY: contextvars.ContextVar[Priority | None] = contextvars.ContextVar(
+    "request_priority", default=None
+)
+
+
+@contextlib.contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Send all requests made in this context with the given priority."""
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority(default: Priority = Priority.BACKGROUND_POLL) -> Priority:
+    priority = _PRIORITY.get()
+    return default if priority is None else priority
+
+
+class PriorityScheduler:
+    """Semaphore that hands free slots to the waiter with the highest priority.
+
+    Waiters with the same priority are served in FIFO order. The priority is taken from the context of the
+    waiting task (see `request_priority`). Requests that are already in flight are never interrupted, but a
+    batch of reads is made up of individual requests, so an interactive request only waits for the one that
+    is currently on the wire.
+    """
+
+    _free: int
+    # (priority, sequence, future), cancelled waiters are skipped when they're popped
+    _waiters: list[tuple[int, int, asyncio.Future[None]]]
+    _sequence: Iterator[int]
+
+    def __init__(self, slots: int = 1) -> None:
+        assert slots >= 1
+        self._free = slots
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    async def acquire(self, priority: Priority | None = None) -> None:
+        if priority is None:
+            priority = current_priority()
+        # slots are only freed when nobody is waiting, otherwise they're handed over directly
+        if self._free > 0:
+            self._free -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over right before the cancellation, pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.release()
@@ -1,8 +1,16 @@
 from .client import Client
+from .registers import Field
+
+__all__ = [
+    "CONTROLLER_FW_VERSION",
+    "Service",
+]
+
+CONTROLLER_FW_VERSION = Field(name="controller_fw_version", address=18003)
 
 
 class Service:
-    REG_CONTROLLER_FW_VERSION = 18003
+    REG_CONTROLLER_FW_VERSION = CONTROLLER_FW_VERSION.address
 
     _client: Client
 
@@ -10,4 +18,4 @@ class Service:
         self._client = client
 
     async def read_firmware_version(self) -> int:
-        return await self._client.read_u16(self.REG_CONTROLLER_FW_VERSION)
+        return await self._client.read_field(CONTROLLER_FW_VERSION)
@@ -1,20 +1,14 @@
 import dataclasses
 import enum
 from collections.abc import Iterator
-from datetime import datetime
+from datetime import date, datetime, time
 from ipaddress import IPv4Address
 
-from .client import (
-    Client,
-    consume_date,
-    consume_ip_address,
-    consume_string,
-    consume_time,
-    consume_u16,
-    consume_u32,
-)
+from .client import Client, consume_buffer, consume_u16, decode_string
+from .registers import Field, RegisterBlock
 
 __all__ = [
+    "SETTINGS_BLOCK",
     "FlowUnits",
     "Settings",
     "SettingsState",
@@ -59,7 +53,10 @@ class Rs485:
 
     @classmethod
     def consume_from_registers(cls, registers: Iterator[int]):
-        raw = consume_u16(registers)
+        return cls.from_u16(consume_u16(registers))
+
+    @classmethod
+    def from_u16(cls, raw: int):
         raw_stop_bits = raw & 0b0_0001
         raw_parity = (raw & 0b0_0010) >> 1
         raw_speed = (raw & 0b1_1000) >> 3
@@ -83,6 +80,32 @@ class Language(enum.IntEnum):
         return cls(consume_u16(registers))
 
 
+def _date(month: int, day: int, year: int) -> date:
+    return date(year=year, month=month, day=day)
+
+
+SETTINGS_BLOCK = RegisterBlock(
+    # hour and minute followed by the seconds
+    Field(name="time", address=449, format="BBH", convert=time),
+    # reg 451 is the day of week, which we don't need
+    # month and day followed by the year
+    Field(name="date", address=452, format="BBH", convert=_date),
+    Field(name="language", address=454, convert=Language),
+    Field(name="modbus_address", address=455),
+    Field(name="ip_address", address=456, format="I", convert=IPv4Address),
+    Field(name="flow_units", address=458, convert=FlowUnits),
+    Field(name="ahu_serial_number", address=459, format="16s", convert=decode_string),
+    Field(name="ahu_name", address=467, format="24s", convert=decode_string),
+    # extended set
+    Field(name="ip_mask", address=479, format="I", convert=IPv4Address, extended=True),
+    Field(name="rs_485", address=481, convert=Rs485.from_u16, extended=True),
+    Field(name="daylight_saving_time", address=482, convert=bool, extended=True),
+    # reg 483 isn't documented, skip
+    Field(name="bacnet_port", address=484, extended=True),
+    Field(name="bacnet_id", address=485, format="I", extended=True),
+)
+
+
 @dataclasses.dataclass(slots=True, kw_only=True)
 class SettingsState:
     datetime: datetime
@@ -102,67 +125,36 @@ class SettingsState:
 
     @classmethod
     def consume_from_registers(cls, registers: Iterator[int], *, is_extended: bool):
-        time = consume_time(registers, read_seconds=True)
-        # reg 451 is the day of week, which we don't need
-        _ = consume_u16(registers)
-        date = consume_date(registers)
-        language = Language.consume_from_registers(registers)
-        modbus_address = consume_u16(registers)
-        ip_address = consume_ip_address(registers)
-        flow_units = FlowUnits.consume_from_registers(registers)
-        ahu_serial_number = consume_string(registers, 8)
-        ahu_name = consume_string(registers, 12)
-
-        if is_extended:
-            ip_mask = consume_ip_address(registers)
-            rs_485 = Rs485.consume_from_registers(registers)
-            daylight_saving_time = bool(consume_u16(registers))
-            # reg 483 isn't documented, skip
-            _ = consume_u16(registers)
-            bacnet_port = consume_u16(registers)
-            bacnet_id = consume_u32(registers)
-        else:
-            ip_mask = None
-            rs_485 = None
-            daylight_saving_time = None
-            bacnet_port = None
-            bacnet_id = None
+        rng = SETTINGS_BLOCK.range(is_extended=is_extended)
+        return cls.from_buffer(
+            consume_buffer(registers, rng.count), is_extended=is_extended
+        )
 
+    @classmethod
+    def from_buffer(cls, buffer: bytes | memoryview, *, is_extended: bool):
+        values = SETTINGS_BLOCK.unpack(buffer, is_extended=is_extended)
         return cls(
-            datetime=datetime.combine(date, time),
-            language=language,
-            modbus_address=modbus_address,
-            ip_address=ip_address,
-            flow_units=flow_units,
-            ahu_serial_number=ahu_serial_number,
-            ahu_name=ahu_name,
-            ip_mask=ip_mask,
-            rs_485=rs_485,
-            daylight_saving_time=daylight_saving_time,
-            bacnet_port=bacnet_port,
-            bacnet_id=bacnet_id,
+            datetime=datetime.combine(values.pop("date"), values.pop("time")),
+            **values,
         )
 
 
 class Settings:
-    REG_TIME = 449
-    REG_SECONDS = 450
-    REG_DAY_OF_WEEK = 451
-    REG_DATE = 452
-    REG_YEAR = 453
-    REG_LANGUAGE = 454
-    REG_MODBUS_ADDRESS = 455
-    REG_IP_ADDRESS = 456
-    REG_FLOW_UNITS = 458
-    REG_AHU_SN = 459
-    REG_AHU_NAME = 467
+    REG_TIME = SETTINGS_BLOCK["time"].address
+    REG_DATE = SETTINGS_BLOCK["date"].address
+    REG_LANGUAGE = SETTINGS_BLOCK["language"].address
+    REG_MODBUS_ADDRESS = SETTINGS_BLOCK["modbus_address"].address
+    REG_IP_ADDRESS = SETTINGS_BLOCK["ip_address"].address
+    REG_FLOW_UNITS = SETTINGS_BLOCK["flow_units"].address
+    REG_AHU_SN = SETTINGS_BLOCK["ahu_serial_number"].address
+    REG_AHU_NAME = SETTINGS_BLOCK["ahu_name"].address
 
     # extended set
-    REG_IP_MASK = 479
-    REG_RS485 = 481
-    REG_DST = 482
-    REG_BACNET_PORT = 484
-    REG_BACNET_ID = 485
+    REG_IP_MASK = SETTINGS_BLOCK["ip_mask"].address
+    REG_RS485 = SETTINGS_BLOCK["rs_485"].address
+    REG_DST = SETTINGS_BLOCK["daylight_saving_time"].address
+    REG_BACNET_PORT = SETTINGS_BLOCK["bacnet_port"].address
+    REG_BACNET_ID = SETTINGS_BLOCK["bacnet_id"].address
 
     _client: Client
 
@@ -170,13 +162,12 @@ class Settings:
         self._client = client
 
     async def read_all(self, *, is_extended: bool) -> SettingsState:
-        end = (self.REG_BACNET_ID + 1) if is_extended else (self.REG_IP_MASK - 1)
-        registers = await self._client.read_many_u16(
-            self.REG_TIME,
-            (end - self.REG_TIME) + 1,
+        image = await self._client.read_ranges(
+            SETTINGS_BLOCK.plan(is_extended=is_extended)
         )
-        return SettingsState.consume_from_registers(
-            iter(registers), is_extended=is_extended
+        rng = SETTINGS_BLOCK.range(is_extended=is_extended)
+        return SettingsState.from_buffer(
+            image.buffer(rng.address, rng.count), is_extended=is_extended
         )
 
 
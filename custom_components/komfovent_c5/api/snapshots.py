@@ -0,0 +1,418 @@
+import bisect
+import dataclasses
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO
+
+from .planner import RegisterImage, RegisterRange
+
+__all__ = [
+    "Snapshot",
+    "SnapshotReader",
+    "SnapshotStore",
+]
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"KC5S"
+VERSION = 1
+SUFFIX = ".snap"
+# magic, version, number of ranges, capacity in frames, number of frames written
+_HEADER = struct.Struct("<4sHHII")
+_COUNT_OFFSET = 12
+# address, count
+_RANGE = struct.Struct("<HH")
+# timestamp, bit mask of the ranges that were read
+_FRAME_HEADER = struct.Struct("<dQ")
+MAX_RANGES = 64
+
+# one day of one second polls
+DEFAULT_SEGMENT_FRAMES = 86_400
+DEFAULT_SEGMENT_DURATION = 86_400.0
+
+
+class _Segment:
+    """One file of the store.
+
+    The header describes the ranges of the layout and is followed by fixed-size frames in chronological order.
+    A frame is the timestamp, a mask of the ranges that were read and the big-endian registers of all ranges.
+    The file is allocated for its full capacity up front, so frames are written straight into the mapping.
+    """
+
+    path: Path
+    start: float
+    ranges: tuple[RegisterRange, ...]
+    capacity: int
+    count: int
+    _offsets: tuple[int, ...]
+    _frame_size: int
+    _data_offset: int
+    _file: BinaryIO
+    _map: mmap.mmap
+
+    def __init__(
+        self,
+        path: Path,
+        file: BinaryIO,
+        *,
+        ranges: Sequence[RegisterRange],
+        capacity: int,
+        count: int,
+        writable: bool,
+    ) -> None:
+        self.path = path
+        self.start = _segment_start(path)
+        self.ranges = tuple(ranges)
+        self.capacity = capacity
+        self.count = count
+        offsets = []
+        offset = _FRAME_HEADER.size
+        for rng in self.ranges:
+            offsets.append(offset)
+            offset += 2 * rng.count
+        self._offsets = tuple(offsets)
+        self._frame_size = offset
+        self._data_offset = _HEADER.size + _RANGE.size * len(self.ranges)
+        self._file = file
+        self._map = mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        )
+
+    @classmethod
+    def create(
+        cls, path: Path, ranges: Sequence[RegisterRange], *, capacity: int
+    ) -> "_Segment":
+        assert 0 < len(ranges) <= MAX_RANGES
+        file = path.open("w+b")
+        header = _HEADER.pack(MAGIC, VERSION, len(ranges), capacity, 0) + b"".join(
+            _RANGE.pack(rng.address, rng.count) for rng in ranges
+        )
+        file.write(header)
+        frame_size = _FRAME_HEADER.size + sum(2 * rng.count for rng in ranges)
+        # sparse on most file systems, unused frames don't take up any space
+        file.truncate(len(header) + capacity * frame_size)
+        return cls(path, file, ranges=ranges, capacity=capacity, count=0, writable=True)
+
+    @classmethod
+    def open(cls, path: Path, *, writable: bool) -> "_Segment":
+        file = path.open("r+b" if writable else "rb")
+        try:
+            magic, version, range_count, capacity, count = _HEADER.unpack(
+                file.read(_HEADER.size)
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} isn't a snapshot segment")
+            ranges = [
+                RegisterRange(*_RANGE.unpack(file.read(_RANGE.size)))
+                for _ in range(range_count)
+            ]
+            return cls(
+                path,
+                file,
+                ranges=ranges,
+                capacity=capacity,
+                count=count,
+                writable=writable,
+            )
+        except Exception:
+            file.close()
+            raise
+
+    def refresh(self) -> None:
+        """Pick up frames that were appended by a writer since the segment was opened."""
+        self.count = struct.unpack_from("<I", self._map, _COUNT_OFFSET)[0]
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def timestamp(self, index: int) -> float:
+        return _FRAME_HEADER.unpack_from(self._map, self._frame(index))[0]
+
+    def mask(self, index: int) -> int:
+        return _FRAME_HEADER.unpack_from(self._map, self._frame(index))[1]
+
+    def append(self, timestamp: float, image: RegisterImage) -> None:
+        offset = self._frame(self.count)
+        mask = 0
+        for bit, (rng, range_offset) in enumerate(
+            zip(self.ranges, self._offsets, strict=True)
+        ):
+            try:
+                buffer = image.buffer(rng.address, rng.count)
+            except ValueError:
+                # not read with this poll
+                continue
+            mask |= 1 << bit
+            start = offset + range_offset
+            self._map[start : start + len(buffer)] = buffer
+        _FRAME_HEADER.pack_into(self._map, offset, timestamp, mask)
+        self.count += 1
+        # the count is written last, a frame only exists once it's complete
+        struct.pack_into("<I", self._map, _COUNT_OFFSET, self.count)
+
+    def read(self, index: int, address: int, count: int) -> bytes:
+        mask = self.mask(index)
+        for bit, (rng, range_offset) in enumerate(
+            zip(self.ranges, self._offsets, strict=True)
+        ):
+            offset = address - rng.address
+            if mask & (1 << bit) and offset >= 0 and offset + count <= rng.count:
+                start = self._frame(index) + range_offset + 2 * offset
+                return self._map[start : start + 2 * count]
+        raise ValueError(f"registers {address}..{address + count} weren't read")
+
+    def read_ranges(self, index: int) -> list[RegisterRange]:
+        mask = self.mask(index)
+        return [rng for bit, rng in enumerate(self.ranges) if mask & (1 << bit)]
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+        self._file.close()
+
+    def _frame(self, index: int) -> int:
+        assert 0 <= index < self.capacity
+        return self._data_offset + index * self._frame_size
+
+
+class _Timestamps(Sequence[float]):
+    # lets 'bisect' search the frames of a segment without reading them all
+    def __init__(self, segment: _Segment) -> None:
+        self._segment = segment
+
+    def __len__(self) -> int:
+        return self._segment.count
+
+    def __getitem__(self, index: int) -> float:  # type: ignore[override]
+        return self._segment.timestamp(index)
+
+
+def _segment_name(start: float) -> str:
+    # milliseconds with a fixed width, so the names sort chronologically
+    return f"{round(start * 1000):016d}{SUFFIX}"
+
+
+def _segment_start(path: Path) -> float:
+    return int(path.stem) / 1000
+
+
+def _segment_paths(directory: Path) -> list[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(path for path in directory.glob(f"*{SUFFIX}") if path.stem.isdigit())
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Raw registers of one poll.
+
+    Nothing is decoded until it's asked for. The snapshot is only valid until its reader is closed.
+    """
+
+    timestamp: float
+    _segment: _Segment
+    _index: int
+
+    @property
+    def ranges(self) -> list[RegisterRange]:
+        """Ranges that were read with this poll."""
+        return self._segment.read_ranges(self._index)
+
+    def buffer(self, address: int, count: int) -> bytes:
+        """Big-endian registers, like `RegisterImage.buffer`."""
+        return self._segment.read(self._index, address, count)
+
+    def registers(self, address: int, count: int) -> list[int]:
+        return list(struct.unpack(f">{count}H", self.buffer(address, count)))
+
+    def image(self) -> RegisterImage:
+        """All registers of the poll, for the regular decoders."""
+        image = RegisterImage()
+        for rng in self.ranges:
+            image.add(rng.address, self.registers(rng.address, rng.count))
+        return image
+
+
+class SnapshotStore:
+    """Append-only store of the raw registers of every poll.
+
+    Frames are written to memory-mapped segment files named after the timestamp of their first frame.
+    A new segment is started once the current one is full, spans `segment_duration` seconds or the layout
+    changes. Whole segments are deleted once all of their frames are older than `retention` seconds.
+    The methods block on file IO and should be run in an executor.
+    """
+
+    _directory: Path
+    _ranges: tuple[RegisterRange, ...]
+    _retention: float
+    _segment_frames: int
+    _segment_duration: float
+    _segment: _Segment | None
+    _last_timestamp: float
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        ranges: Sequence[RegisterRange],
+        *,
+        retention: float,
+        segment_frames: int = DEFAULT_SEGMENT_FRAMES,
+        segment_duration: float = DEFAULT_SEGMENT_DURATION,
+    ) -> None:
+        assert 0 < len(ranges) <= MAX_RANGES
+        self._directory = Path(directory)
+        self._ranges = tuple(ranges)
+        self._retention = retention
+        self._segment_frames = segment_frames
+        self._segment_duration = segment_duration
+        self._segment = None
+        self._last_timestamp = float("-inf")
+
+    def append(self, timestamp: float, image: RegisterImage) -> None:
+        """Store the ranges of the layout that are in `image`."""
+        # a clock that jumps backwards would break the order the reader relies on
+        timestamp = max(timestamp, self._last_timestamp)
+        segment = self._writable_segment(timestamp)
+        segment.append(timestamp, image)
+        self._last_timestamp = timestamp
+
+    def prune(self, now: float) -> None:
+        """Delete segments whose frames are all older than the retention period."""
+        cutoff = now - self._retention
+        paths = _segment_paths(self._directory)
+        # the start of the next segment is an upper bound for the frames of the one before
+        for path, following in zip(paths, paths[1:], strict=False):
+            if _segment_start(following) > cutoff:
+                break
+            if self._segment is not None and self._segment.path == path:
+                break
+            _LOGGER.debug("deleting snapshot segment %s", path)
+            path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _writable_segment(self, timestamp: float) -> _Segment:
+        segment = self._segment
+        if segment is None:
+            segment = self._segment = self._resume()
+        if segment is not None and not (
+            segment.is_full or timestamp - segment.start >= self._segment_duration
+        ):
+            return segment
+
+        if segment is not None:
+            segment.close()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / _segment_name(timestamp)
+        _LOGGER.debug("starting snapshot segment %s", path)
+        segment = self._segment = _Segment.create(
+            path, self._ranges, capacity=self._segment_frames
+        )
+        self.prune(timestamp)
+        return segment
+
+    def _resume(self) -> _Segment | None:
+        # continue with the latest segment after a restart, as long as the layout is the same
+        paths = _segment_paths(self._directory)
+        if not paths:
+            return None
+        try:
+            segment = _Segment.open(paths[-1], writable=True)
+        except (OSError, ValueError):
+            _LOGGER.warning(
+                "can't resume snapshot segment %s", paths[-1], exc_info=True
+            )
+            return None
+        if segment.ranges != self._ranges:
+            segment.close()
+            return None
+        if segment.count:
+            self._last_timestamp = segment.timestamp(segment.count - 1)
+        return segment
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class SnapshotReader:
+    """Reads the snapshots of a store, possibly while it's still being written to."""
+
+    _directory: Path
+    _segments: dict[Path, _Segment]
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self._directory = Path(directory)
+        self._segments = {}
+
+    def snapshots(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[Snapshot]:
+        """Snapshots taken in [start, end) in chronological order."""
+        paths = _segment_paths(self._directory)
+        if start is not None:
+            # skip segments that end before 'start', i.e. the ones followed by a segment that starts before it
+            starts = [_segment_start(path) for path in paths]
+            paths = paths[max(0, bisect.bisect_right(starts, start) - 1) :]
+        for path in paths:
+            if end is not None and _segment_start(path) >= end:
+                return
+            segment = self._open(path)
+            if segment is None:
+                continue
+            timestamps = _Timestamps(segment)
+            index = 0 if start is None else bisect.bisect_left(timestamps, start)
+            stop = (
+                len(timestamps)
+                if end is None
+                else bisect.bisect_left(timestamps, end, lo=index)
+            )
+            for index in range(index, stop):
+                yield Snapshot(segment.timestamp(index), segment, index)
+
+    def close(self) -> None:
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+    def _open(self, path: Path) -> _Segment | None:
+        segment = self._segments.get(path)
+        if segment is not None:
+            segment.refresh()
+            return segment
+        try:
+            segment = _Segment.open(path, writable=False)
+        except (OSError, ValueError):
+            # pruned in the meantime or not a segment
+            _LOGGER.debug("skipping snapshot segment %s", path, exc_info=True)
+            return None
+        self._segments[path] = segment
+        return segment
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,189 @@
+import bisect
+import contextlib
+import contextvars
+import dataclasses
+import enum
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from typing import Any
+
+__all__ = [
+    "Histogram",
+    "OperationStats",
+    "Transaction",
+    "TransactionOutcome",
+    "TransactionStats",
+    "acquire_timed",
+    "track_queue_wait",
+]
+
+# upper bounds of the histogram buckets in seconds, everything above the last bound goes into an overflow bucket
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# MBAP header (7 bytes) plus function code
+_FRAME_OVERHEAD = 8
+
+_QUEUE_WAIT: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "queue_wait", default=0.0
+)
+
+
+@contextlib.asynccontextmanager
+async def acquire_timed(
+    lock: contextlib.AbstractAsyncContextManager[Any],
+) -> AsyncIterator[None]:
+    """Acquire the lock and attribute the time spent waiting for it to the current transaction."""
+    start = time.perf_counter()
+    async with lock:
+        _QUEUE_WAIT.set(_QUEUE_WAIT.get() + (time.perf_counter() - start))
+        yield
+
+
+@contextlib.contextmanager
+def track_queue_wait() -> Iterator[Callable[[], float]]:
+    """Collect the queue wait of the transaction in this context, the yielded function returns it."""
+    token = _QUEUE_WAIT.set(0.0)
+    try:
+        yield _QUEUE_WAIT.get
+    finally:
+        _QUEUE_WAIT.reset(token)
+
+
+class TransactionOutcome(enum.Enum):
+    OK = "ok"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class Transaction:
+    """A single request and its response as seen by the client."""
+
+    operation: str
+    unit: int
+    address: int
+    count: int
+    # time spent waiting for the transport before the request was sent
+    queue_wait: float
+    # total time including the queue wait
+    duration: float
+    outcome: TransactionOutcome
+
+    @property
+    def wire_bytes(self) -> int:
+        """Size of the request and response frames, assuming the request succeeded."""
+        payload = 2 * self.count
+        if self.operation == "read":
+            # address and count, byte count and registers
+            return (_FRAME_OVERHEAD + 4) + (_FRAME_OVERHEAD + 1 + payload)
+        if self.count == 1:
+            # FC6 echoes the request
+            return 2 * (_FRAME_OVERHEAD + 4)
+        # address, count, byte count and registers; the response echoes address and count
+        return (_FRAME_OVERHEAD + 5 + payload) + (_FRAME_OVERHEAD + 4)
+
+
+class Histogram:
+    bounds: Sequence[float]
+    buckets: list[int]
+    count: int
+    total: float
+    max: float
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict[str, Any]:
+        buckets = {
+            f"le_{bound}": count
+            for bound, count in zip(self.bounds, self.buckets, strict=False)
+        }
+        buckets["overflow"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class OperationStats:
+    transactions: int
+    errors: int
+    timeouts: int
+    registers: int
+    wire_bytes: int
+    duration: Histogram
+    queue_wait: Histogram
+
+    def __init__(self) -> None:
+        self.transactions = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.registers = 0
+        self.wire_bytes = 0
+        self.duration = Histogram()
+        self.queue_wait = Histogram()
+
+    def record(self, transaction: Transaction) -> None:
+        self.transactions += 1
+        if transaction.outcome == TransactionOutcome.ERROR:
+            self.errors += 1
+        elif transaction.outcome == TransactionOutcome.TIMEOUT:
+            self.timeouts += 1
+        else:
+            self.registers += transaction.count
+            self.wire_bytes += transaction.wire_bytes
+        self.duration.observe(transaction.duration)
+        self.queue_wait.observe(transaction.queue_wait)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "transactions": self.transactions,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "registers": self.registers,
+            "wire_bytes": self.wire_bytes,
+            "duration": self.duration.as_dict(),
+            "queue_wait": self.queue_wait.as_dict(),
+        }
+
+
+class TransactionStats:
+    """Counters and timing histograms for all transactions of a client, per operation."""
+
+    _operations: dict[str, OperationStats]
+
+    def __init__(self) -> None:
+        self._operations = {}
+
+    def __getitem__(self, operation: str) -> OperationStats:
+        stats = self._operations.get(operation)
+        if stats is None:
+            stats = self._operations[operation] = OperationStats()
+        return stats
+
+    def record(self, transaction: Transaction) -> None:
+        self[transaction.operation].record(transaction)
+
+    def reset(self) -> None:
+        self._operations.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            operation: stats.as_dict() for operation, stats in self._operations.items()
+        }
@@ -0,0 +1,189 @@
+import contextlib
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+
+from .transport import DEFAULT_UNIT, ModbusError, Transport
+
+__all__ = [
+    "CircuitOpenError",
+    "SupervisedTransport",
+]
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 300.0
+DEFAULT_HEARTBEAT_INTERVAL = 60.0
+
+
+class CircuitOpenError(ConnectionError):
+    """The device recently failed and the next attempt hasn't been scheduled yet."""
+
+
+class SupervisedTransport(Transport):
+    """Wraps a transport with reconnect backoff, a circuit breaker and dead-peer detection.
+
+    A failed connect, or a transaction that fails with anything other than an error response or a timeout,
+    closes the connection and opens the circuit for an exponentially growing, jittered backoff. While the
+    circuit is open all requests fail immediately with `CircuitOpenError` instead of waiting for a timeout.
+    Requests that were already in flight when the circuit opened fail with it without adding to the backoff.
+
+    Behind a gateway a timeout usually means that just one unit doesn't answer, so it doesn't open the
+    circuit. Instead the connection is checked with a heartbeat before it's used again. The heartbeat is a
+    single register read from the unit that answered last. The same check catches half-open TCP sessions
+    after the connection has been idle for `heartbeat_interval` seconds.
+    """
+
+    _inner: Transport
+    _heartbeat_address: int
+    _initial_backoff: float
+    _max_backoff: float
+    _heartbeat_interval: float
+    _clock: Callable[[], float]
+
+    _failures: int
+    _retry_at: float
+    _last_activity: float
+    _last_unit: int
+    _suspect: bool
+
+    def __init__(
+        self,
+        inner: Transport,
+        *,
+        heartbeat_address: int,
+        initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._inner = inner
+        self._heartbeat_address = heartbeat_address
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._heartbeat_interval = heartbeat_interval
+        self._clock = clock
+        self._failures = 0
+        self._retry_at = 0.0
+        self._last_activity = 0.0
+        self._last_unit = DEFAULT_UNIT
+        self._suspect = False
+
+    @property
+    def connected(self) -> bool:
+        return self._inner.connected
+
+    @property
+    def max_read_count(self) -> int:
+        return self._inner.max_read_count
+
+    @property
+    def circuit_open(self) -> bool:
+        return self._clock() < self._retry_at
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        self._check_circuit()
+        if self._inner.connected:
+            idle = self._clock() - self._last_activity >= self._heartbeat_interval
+            if not (idle or self._suspect) or await self._heartbeat():
+                return
+            _LOGGER.debug("heartbeat failed, reconnecting")
+            await self._record_failure()
+            if self._failures > 1:
+                # the connection didn't come back after the last reconnect either
+                self._check_circuit()
+            # the circuit was opened by the failed heartbeat, but we want to reconnect right away
+            self._retry_at = 0.0
+
+        try:
+            await self._inner.connect(connect_timeout)
+        except Exception:
+            await self._record_failure()
+            raise
+        self._suspect = False
+        self._last_activity = self._clock()
+
+    async def close(self) -> None:
+        await self._inner.close()
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        async with self._transaction(unit):
+            registers = await self._inner.read_holding_registers(
+                address, count, unit=unit
+            )
+        return registers
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        async with self._transaction(unit):
+            await self._inner.write_register(address, value, unit=unit)
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        async with self._transaction(unit):
+            await self._inner.write_registers(address, values, unit=unit)
+
+    @contextlib.asynccontextmanager
+    async def _transaction(self, unit: int) -> AsyncIterator[None]:
+        self._check_circuit()
+        try:
+            yield
+        except ModbusError:
+            # the device answered, so the connection is alive
+            self._record_success()
+            raise
+        except TimeoutError:
+            # might just be this unit, the heartbeat tells whether the connection is still alive
+            self._suspect = True
+            raise
+        except Exception:
+            await self._record_failure()
+            raise
+        self._last_unit = unit
+        self._record_success()
+
+    async def _heartbeat(self) -> bool:
+        try:
+            # a gateway might not have the default unit, so use one we know exists
+            await self._inner.read_holding_registers(
+                self._heartbeat_address, 1, unit=self._last_unit
+            )
+        except ModbusError:
+            pass
+        except Exception:
+            return False
+        self._record_success()
+        return True
+
+    def _check_circuit(self) -> None:
+        remaining = self._retry_at - self._clock()
+        if remaining > 0.0:
+            raise CircuitOpenError(
+                f"device unavailable after {self._failures} failure(s), next attempt in {remaining:.1f}s"
+            )
+
+    def _record_success(self) -> None:
+        self._failures = 0
+        self._retry_at = 0.0
+        self._suspect = False
+        self._last_activity = self._clock()
+
+    async def _record_failure(self) -> None:
+        if self.circuit_open:
+            # already counted, like the other requests of a batch that fail together
+            return
+        self._failures += 1
+        backoff = min(
+            self._max_backoff, self._initial_backoff * 2 ** min(self._failures - 1, 16)
+        )
+        # equal jitter: spread retries of many clients while keeping at least half the backoff
+        backoff *= random.uniform(0.5, 1.0)
+        self._retry_at = self._clock() + backoff
+        _LOGGER.debug("failure %s, backing off for %.1fs", self._failures, backoff)
+        await self._inner.close()
@@ -0,0 +1,432 @@
+import abc
+import asyncio
+import contextlib
+import logging
+import struct
+from collections.abc import Callable, Iterator, Sequence
+from typing import TYPE_CHECKING, cast
+
+from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.exceptions import ModbusIOException
+
+from .scheduler import PriorityScheduler
+from .stats import acquire_timed
+
+if TYPE_CHECKING:
+    from pymodbus.pdu.register_message import (
+        ReadHoldingRegistersResponse,
+        WriteMultipleRegistersResponse,
+        WriteSingleRegisterResponse,
+    )
+
+__all__ = [
+    "DEFAULT_UNIT",
+    "MAX_READ_COUNT",
+    "ModbusError",
+    "PipelinedTransport",
+    "PymodbusTransport",
+    "Transport",
+    "TransportRegistry",
+]
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_UNIT = 1
+
+
+# largest read allowed by the Modbus specification
+MAX_READ_COUNT = 125
+
+
+class ModbusError(Exception):
+    """The device answered with an error (or an unexpected) response."""
+
+    exception_code: int | None
+
+    def __init__(self, message: str, *, exception_code: int | None = None) -> None:
+        super().__init__(message)
+        self.exception_code = exception_code
+
+
+class Transport(abc.ABC):
+    """Moves Modbus requests to a device and back."""
+
+    @property
+    @abc.abstractmethod
+    def connected(self) -> bool: ...
+
+    @property
+    def max_read_count(self) -> int:
+        """Largest number of registers to read in a single request."""
+        return MAX_READ_COUNT
+
+    @abc.abstractmethod
+    async def connect(self, connect_timeout: float | None = None) -> None: ...
+
+    @abc.abstractmethod
+    async def close(self) -> None: ...
+
+    @abc.abstractmethod
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]: ...
+
+    @abc.abstractmethod
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None: ...
+
+    @abc.abstractmethod
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None: ...
+
+
+class PymodbusTransport(Transport):
+    """Serialized transport using pymodbus, only one request is in flight at any time.
+
+    Waiting requests are sent in order of their priority.
+    """
+
+    _modbus: AsyncModbusTcpClient
+    _lock: PriorityScheduler
+
+    def __init__(self, *, host: str, port: int) -> None:
+        # reconnecting is left to the owner of the transport
+        self._modbus = AsyncModbusTcpClient(host, port=port, reconnect_delay=0)
+        self._lock = PriorityScheduler()
+
+    @property
+    def connected(self) -> bool:
+        return self._modbus.connected
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        async with self._lock:
+            if connect_timeout is not None:
+                self._modbus.comm_params.timeout_connect = connect_timeout
+            await self._modbus.connect()
+            # the 'connect' function doesn't bubble the exception unfortunately
+            if not self._modbus.connected:
+                raise ConnectionError("failed to connect")
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._modbus.close()
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        async with acquire_timed(self._lock):
+            with _translate_timeout():
+                response = cast(
+                    "ReadHoldingRegistersResponse",
+                    await self._modbus.read_holding_registers(
+                        address, count=count, slave=unit
+                    ),
+                )
+        if response.isError():
+            raise ModbusError(
+                f"failed to read {count} registers at {address}: {response}",
+                exception_code=getattr(response, "exception_code", None),
+            )
+        return response.registers
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        async with acquire_timed(self._lock):
+            with _translate_timeout():
+                response = cast(
+                    "WriteSingleRegisterResponse",
+                    await self._modbus.write_register(address, value, slave=unit),
+                )
+        if response.isError():
+            raise ModbusError(
+                f"failed to write register {address}: {response}",
+                exception_code=getattr(response, "exception_code", None),
+            )
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        async with acquire_timed(self._lock):
+            with _translate_timeout():
+                response = cast(
+                    "WriteMultipleRegistersResponse",
+                    await self._modbus.write_registers(
+                        address, list(values), slave=unit
+                    ),
+                )
+        if response.isError():
+            raise ModbusError(
+                f"failed to write registers at {address}: {response}",
+                exception_code=getattr(response, "exception_code", None),
+            )
+
+
+@contextlib.contextmanager
+def _translate_timeout() -> Iterator[None]:
+    # pymodbus reports a missing response as a generic IO error
+    try:
+        yield
+    except ModbusIOException as exc:
+        raise TimeoutError(str(exc)) from exc
+
+
+_FC_READ_HOLDING_REGISTERS = 0x03
+_FC_WRITE_REGISTER = 0x06
+_FC_WRITE_REGISTERS = 0x10
+
+_MBAP_HEADER = struct.Struct(">HHHB")
+_DEFAULT_TIMEOUT = 3.0
+
+
+class PipelinedTransport(Transport):
+    """Modbus TCP transport that keeps up to `depth` requests in flight on one connection.
+
+    Responses are matched to their requests using the MBAP transaction id, so the device is free to answer
+    in any order. Once all slots are taken, waiting requests are sent in order of their priority.
+    Only the function codes used by this integration are implemented.
+    """
+
+    _host: str
+    _port: int
+    _timeout: float
+    _slots: PriorityScheduler
+    _connect_lock: asyncio.Lock
+    # unit and PDU of the response, by transaction id
+    _pending: dict[int, asyncio.Future[tuple[int, bytes]]]
+    _next_transaction_id: int
+    _writer: asyncio.StreamWriter | None
+    _receive_task: asyncio.Task[None] | None
+
+    def __init__(
+        self, *, host: str, port: int, depth: int, timeout: float = _DEFAULT_TIMEOUT
+    ) -> None:
+        assert depth >= 1
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._slots = PriorityScheduler(depth)
+        # a shared transport is connected by every unit behind the gateway, only one of them opens the connection
+        self._connect_lock = asyncio.Lock()
+        self._pending = {}
+        self._next_transaction_id = 0
+        self._writer = None
+        self._receive_task = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host, self._port),
+                    connect_timeout or _DEFAULT_TIMEOUT,
+                )
+            except (TimeoutError, OSError) as exc:
+                raise ConnectionError("failed to connect") from exc
+            self._writer = writer
+            self._receive_task = asyncio.create_task(self._receive_loop(reader, writer))
+
+    async def close(self) -> None:
+        async with self._connect_lock:
+            if self._receive_task is not None:
+                self._receive_task.cancel()
+                self._receive_task = None
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._fail_pending(ConnectionError("connection closed"))
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        data = await self._request(
+            unit, struct.pack(">BHH", _FC_READ_HOLDING_REGISTERS, address, count)
+        )
+        (byte_count,) = struct.unpack_from(">B", data)
+        if byte_count != 2 * count:
+            raise ModbusError(f"expected {count} registers, got {byte_count} bytes")
+        return list(struct.unpack_from(f">{count}H", data, 1))
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._request(
+            unit, struct.pack(">BHH", _FC_WRITE_REGISTER, address, value)
+        )
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        count = len(values)
+        await self._request(
+            unit,
+            struct.pack(
+                f">BHHB{count}H",
+                _FC_WRITE_REGISTERS,
+                address,
+                count,
+                2 * count,
+                *values,
+            ),
+        )
+
+    async def _request(self, unit: int, pdu: bytes) -> bytes:
+        async with acquire_timed(self._slots):
+            writer = self._writer
+            if writer is None or writer.is_closing():
+                raise ConnectionError("not connected")
+
+            transaction_id = self._allocate_transaction_id()
+            future = asyncio.get_running_loop().create_future()
+            self._pending[transaction_id] = future
+            try:
+                writer.write(
+                    _MBAP_HEADER.pack(transaction_id, 0, len(pdu) + 1, unit) + pdu
+                )
+                response_unit, response = await asyncio.wait_for(future, self._timeout)
+            finally:
+                self._pending.pop(transaction_id, None)
+
+        if response_unit != unit:
+            # a gateway mixing up the answers of its units
+            raise ModbusError(
+                f"response from unit {response_unit} to a request for unit {unit}"
+            )
+
+        function_code = response[0]
+        if function_code == pdu[0] | 0x80:
+            raise ModbusError(
+                f"function {pdu[0]:#04x} failed with exception code {response[1]}",
+                exception_code=response[1],
+            )
+        if function_code != pdu[0]:
+            raise ModbusError(f"unexpected function code {function_code:#04x}")
+        return response[1:]
+
+    def _allocate_transaction_id(self) -> int:
+        while True:
+            self._next_transaction_id = (self._next_transaction_id + 1) & 0xFFFF
+            if self._next_transaction_id not in self._pending:
+                return self._next_transaction_id
+
+    async def _receive_loop(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP_HEADER.size)
+                transaction_id, _protocol_id, length, unit = _MBAP_HEADER.unpack(header)
+                pdu = await reader.readexactly(length - 1)
+                future = self._pending.get(transaction_id)
+                if future is None:
+                    _LOGGER.debug("dropping late response %s", transaction_id)
+                elif not future.done():
+                    future.set_result((unit, pdu))
+        except (asyncio.IncompleteReadError, OSError):
+            _LOGGER.debug("connection to %s:%s lost", self._host, self._port)
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+            self._fail_pending(ConnectionError("connection lost"))
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self._pending.clear()
+
+
+class TransportRegistry:
+    """Shares one transport between all clients that talk to the same host and port.
+
+    A Modbus gateway in front of a RS485 bus usually only accepts one or two TCP sessions, so all units behind
+    it have to use the same connection. Each client selects its unit per request.
+    """
+
+    _transports: dict[tuple[str, int], Transport]
+    _users: dict[tuple[str, int], int]
+
+    def __init__(self) -> None:
+        self._transports = {}
+        self._users = {}
+
+    def acquire(
+        self, *, host: str, port: int, factory: Callable[[], Transport]
+    ) -> Transport:
+        """Get a lease on the transport for the given address, creating it with `factory` if necessary.
+
+        Closing the lease releases it, the shared transport is only closed once the last lease is closed.
+        """
+        key = (host, port)
+        transport = self._transports.get(key)
+        if transport is None:
+            transport = self._transports[key] = factory()
+            self._users[key] = 0
+        self._users[key] += 1
+        return _TransportLease(self, key, transport)
+
+    async def _release(self, key: tuple[str, int]) -> None:
+        self._users[key] -= 1
+        if self._users[key] > 0:
+            return
+        del self._users[key]
+        transport = self._transports.pop(key)
+        _LOGGER.debug("closing shared transport for %s:%s", *key)
+        await transport.close()
+
+
+class _TransportLease(Transport):
+    _registry: TransportRegistry
+    _key: tuple[str, int]
+    _inner: Transport
+    _released: bool
+
+    def __init__(
+        self, registry: TransportRegistry, key: tuple[str, int], inner: Transport
+    ) -> None:
+        self._registry = registry
+        self._key = key
+        self._inner = inner
+        self._released = False
+
+    @property
+    def connected(self) -> bool:
+        return not self._released and self._inner.connected
+
+    @property
+    def max_read_count(self) -> int:
+        return self._inner.max_read_count
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        if self._released:
+            raise ConnectionError("transport lease was released")
+        await self._inner.connect(connect_timeout)
+
+    async def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        await self._registry._release(self._key)
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = DEFAULT_UNIT
+    ) -> list[int]:
+        return await self._inner.read_holding_registers(address, count, unit=unit)
+
+    async def write_register(
+        self, address: int, value: int, *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._inner.write_register(address, value, unit=unit)
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = DEFAULT_UNIT
+    ) -> None:
+        await self._inner.write_registers(address, values, unit=unit)
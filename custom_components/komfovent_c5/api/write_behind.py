@@ -0,0 +1,81 @@
+import asyncio
+import dataclasses
+from collections.abc import Awaitable, Callable, Sequence
+
+__all__ = [
+    "WriteBehindQueue",
+]
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class _PendingWrite:
+    registers: Sequence[int]
+    waiters: list[asyncio.Future[None]]
+    timer: asyncio.TimerHandle
+
+
+class WriteBehindQueue:
+    """Debounces writes per register.
+
+    A write is only sent once no further write to the same address happened for `delay` seconds.
+    Only the last value is written, but every caller waits until that value has been committed.
+    """
+
+    _send: Callable[[int, Sequence[int]], Awaitable[None]]
+    _delay: float
+    _pending: dict[int, _PendingWrite]
+    _tasks: set[asyncio.Task[None]]
+
+    def __init__(
+        self, send: Callable[[int, Sequence[int]], Awaitable[None]], *, delay: float
+    ) -> None:
+        self._send = send
+        self._delay = delay
+        self._pending = {}
+        self._tasks = set()
+
+    @property
+    def delay(self) -> float:
+        return self._delay
+
+    async def write(self, address: int, registers: Sequence[int]) -> None:
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self._delay, self._commit, address)
+        pending = self._pending.get(address)
+        if pending is None:
+            pending = _PendingWrite(registers=registers, waiters=[], timer=timer)
+            self._pending[address] = pending
+        else:
+            pending.timer.cancel()
+            pending.registers = registers
+            pending.timer = timer
+
+        waiter = loop.create_future()
+        pending.waiters.append(waiter)
+        await waiter
+
+    async def flush(self) -> None:
+        """Commit all pending writes immediately."""
+        for address in list(self._pending):
+            self._pending[address].timer.cancel()
+            self._commit(address)
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    def _commit(self, address: int) -> None:
+        pending = self._pending.pop(address)
+        task = asyncio.create_task(self._send_pending(address, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_pending(self, address: int, pending: _PendingWrite) -> None:
+        try:
+            await self._send(address, pending.registers)
+        except Exception as exc:
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+        else:
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
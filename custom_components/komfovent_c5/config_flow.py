@@ -4,10 +4,30 @@ from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_BASE, CONF_HOST, CONF_PORT
+from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 
 from . import api
-from .const import DOMAIN
+from .const import (
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_PIPELINE_DEPTH,
+    CONF_SNAPSHOT_RETENTION,
+    CONF_UNIT_ID,
+    CONF_WRITE_DEBOUNCE,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_PIPELINE_DEPTH,
+    DEFAULT_SNAPSHOT_RETENTION,
+    DEFAULT_UNIT_ID,
+    DEFAULT_WRITE_DEBOUNCE,
+    DOMAIN,
+    MAX_PIPELINE_DEPTH,
+    MAX_POLL_INTERVAL,
+    MAX_SNAPSHOT_RETENTION,
+    MAX_WRITE_DEBOUNCE,
+    MIN_POLL_INTERVAL,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +35,13 @@ ERR_CONNECT_FAILED = "connect_failed"
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        return OptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -32,7 +59,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await client.disconnect()
 
             if not errors:
-                return self.async_create_entry(title=host, data=user_input)
+                unit: int = user_input[CONF_UNIT_ID]
+                title = host if unit == DEFAULT_UNIT_ID else f"{host} ({unit})"
+                return self.async_create_entry(title=title, data=user_input)
 
         return self.async_show_form(
             step_id="user",
@@ -40,7 +69,70 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 {
                     vol.Required(CONF_HOST): str,
                     vol.Required(CONF_PORT, default=502): cv.port,
+                    vol.Required(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=247)
+                    ),
                 }
             ),
             errors=errors,
         )
+
+
+class OptionsFlow(config_entries.OptionsFlow):
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PIPELINE_DEPTH,
+                        default=options.get(
+                            CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_PIPELINE_DEPTH)
+                    ),
+                    vol.Required(
+                        CONF_WRITE_DEBOUNCE,
+                        default=options.get(
+                            CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE
+                        ),
+                    ): vol.All(
+                        vol.Coerce(float), vol.Range(min=0.0, max=MAX_WRITE_DEBOUNCE)
+                    ),
+                    vol.Required(
+                        CONF_MIN_POLL_INTERVAL,
+                        default=options.get(
+                            CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL
+                        ),
+                    ): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_MAX_POLL_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL
+                        ),
+                    ): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_SNAPSHOT_RETENTION,
+                        default=options.get(
+                            CONF_SNAPSHOT_RETENTION, DEFAULT_SNAPSHOT_RETENTION
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=0, max=MAX_SNAPSHOT_RETENTION),
+                    ),
+                }
+            ),
+        )
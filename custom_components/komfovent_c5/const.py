@@ -1,7 +1,35 @@
 DOMAIN = "komfovent_c5"
+# shared transports, keyed by host and port
+DATA_TRANSPORTS = f"{DOMAIN}_transports"
 PLATFORMS = (
     "select",
     "sensor",
     "switch",
 )
 EVENT_ALARM = "alarm"
+
+CONF_PIPELINE_DEPTH = "pipeline_depth"
+# a depth of 1 uses the plain (non-pipelined) pymodbus client
+DEFAULT_PIPELINE_DEPTH = 1
+MAX_PIPELINE_DEPTH = 16
+
+CONF_WRITE_DEBOUNCE = "write_debounce"
+# seconds, 0 disables debouncing
+DEFAULT_WRITE_DEBOUNCE = 0.5
+MAX_WRITE_DEBOUNCE = 10.0
+
+CONF_UNIT_ID = "unit_id"
+DEFAULT_UNIT_ID = 1
+
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+# seconds, the poll interval backs off towards the maximum while the unit is stopped or nothing changes
+DEFAULT_MIN_POLL_INTERVAL = 5.0
+DEFAULT_MAX_POLL_INTERVAL = 60.0
+MIN_POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 600.0
+
+CONF_SNAPSHOT_RETENTION = "snapshot_retention"
+# days of raw register snapshots to keep, 0 disables the snapshot store
+DEFAULT_SNAPSHOT_RETENTION = 0
+MAX_SNAPSHOT_RETENTION = 90
@@ -0,0 +1,37 @@
+import dataclasses
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import KomfoventCoordinator, api
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    coordinator: KomfoventCoordinator = hass.data[DOMAIN][entry.entry_id]
+    try:
+        alarm_history = [
+            {
+                "code": entry.alarm.code_str,
+                "message": entry.alarm.message,
+                "timestamp": entry.timestamp.isoformat(),
+            }
+            for entry in await coordinator.alarm_history.read()
+        ]
+    except (ConnectionError, TimeoutError, api.ModbusError):
+        # the rest is still worth having while the unit is unreachable
+        alarm_history = None
+    return {
+        "alarm_history": alarm_history,
+        "history": {
+            name: dataclasses.asdict(coordinator.history.window(name))
+            for name in coordinator.history.fields
+        },
+        "host_id": coordinator.host_id,
+        "identity": coordinator.identity.as_dict(),
+        "options": dict(entry.options),
+        "transactions": coordinator.client.stats.as_dict(),
+    }
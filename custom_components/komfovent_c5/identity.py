@@ -0,0 +1,105 @@
+import dataclasses
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from . import api
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class DeviceIdentity:
+    """Everything about the device that has to be known before entities can be set up."""
+
+    serial_number: str
+    name: str
+    firmware_version: int | None
+    is_extended: bool
+    flow_units: api.FlowUnits
+
+    @classmethod
+    async def read(cls, client: api.Client) -> "DeviceIdentity":
+        settings = await api.Settings(client).read_all(is_extended=False)
+
+        try:
+            firmware_version = await api.Service(client).read_firmware_version()
+        except Exception:
+            # up to the caller whether that's worth a warning
+            _LOGGER.debug("failed to read firmware version", exc_info=True)
+            firmware_version = None
+            is_extended = False
+        else:
+            is_extended = api.determine_is_extended(version=firmware_version)
+        _LOGGER.info("ahu extended: %s", is_extended)
+
+        return cls(
+            serial_number=settings.ahu_serial_number,
+            name=settings.ahu_name,
+            firmware_version=firmware_version,
+            is_extended=is_extended,
+            flow_units=settings.flow_units,
+        )
+
+    def is_same_device(self, other: "DeviceIdentity") -> bool:
+        """Whether `other` describes the same device, leaving out what depends on the firmware version."""
+        return (self.serial_number, self.name, self.flow_units) == (
+            other.serial_number,
+            other.name,
+            other.flow_units,
+        )
+
+    @property
+    def sw_version(self) -> str | None:
+        if self.firmware_version is None:
+            return None
+        return f"{self.firmware_version / 1000.0:.3f}"
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "serial_number": self.serial_number,
+            "name": self.name,
+            "firmware_version": self.firmware_version,
+            "is_extended": self.is_extended,
+            "flow_units": int(self.flow_units),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DeviceIdentity":
+        return cls(
+            serial_number=data["serial_number"],
+            name=data["name"],
+            firmware_version=data["firmware_version"],
+            is_extended=data["is_extended"],
+            flow_units=api.FlowUnits(data["flow_units"]),
+        )
+
+
+class IdentityStore:
+    """Persists the identity of the device of a config entry across restarts."""
+
+    _store: Store[dict[str, Any]]
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.identity.{entry_id}")
+
+    async def async_load(self) -> DeviceIdentity | None:
+        data = await self._store.async_load()
+        if data is None:
+            return None
+        try:
+            return DeviceIdentity.from_dict(data)
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("ignoring invalid cached device identity: %s", data)
+            return None
+
+    async def async_save(self, identity: DeviceIdentity) -> None:
+        await self._store.async_save(identity.as_dict())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
@@ -23,6 +23,7 @@ async def async_setup_entry(
 
 class OpModeSelect(KomfoventEntity, SelectEntity):
     _attr_translation_key = "op_mode"
+    _state_fields = ("modes.operation_mode",)
     _attr_options = [mode.name for mode in api.OperationMode.selectable_modes()]
 
     @property
@@ -32,11 +33,12 @@ class OpModeSelect(KomfoventEntity, SelectEntity):
     async def async_select_option(self, option: str) -> None:
         mode = api.OperationMode[option.upper()]
         await self._modes_client.set_operation_mode(mode)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("modes.operation_mode", mode)
 
 
 class FlowControlModeSelect(KomfoventEntity, SelectEntity):
     _attr_translation_key = "flow_control_mode"
+    _state_fields = ("modes.flow_control_mode",)
     _attr_options = [mode.name for mode in api.FlowControlMode.__members__.values()]
 
     @property
@@ -46,11 +48,12 @@ class FlowControlModeSelect(KomfoventEntity, SelectEntity):
     async def async_select_option(self, option: str) -> None:
         mode = api.FlowControlMode[option.upper()]
         await self._modes_client.set_flow_control_mode(mode)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("modes.flow_control_mode", mode)
 
 
 class TempControlModeSelect(KomfoventEntity, SelectEntity):
     _attr_translation_key = "temperature_control_mode"
+    _state_fields = ("modes.temperature_control_mode",)
     _attr_options = [
         mode.name for mode in api.TemperatureControlMode.__members__.values()
     ]
@@ -62,4 +65,4 @@ class TempControlModeSelect(KomfoventEntity, SelectEntity):
     async def async_select_option(self, option: str) -> None:
         mode = api.TemperatureControlMode[option.upper()]
         await self._modes_client.set_temperature_control_mode(mode)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("modes.temperature_control_mode", mode)
@@ -81,6 +81,7 @@ async def async_setup_entry(
 class AlarmActiveSensor(KomfoventEntity, SensorEntity):
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = "active_alarm"
+    _state_fields = ("active_alarms",)
 
     def __init__(self, coordinator: KomfoventCoordinator, number: int) -> None:
         super().__init__(coordinator)
@@ -134,6 +135,7 @@ class AlarmActiveCountSensor(KomfoventEntity, SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_suggested_display_precision = 0
     _attr_translation_key = "active_alarms"
+    _state_fields = ("active_alarms",)
 
     @property
     def native_value(self) -> StateType:
@@ -145,6 +147,7 @@ class AlarmHistoryCountSensor(KomfoventEntity, SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_suggested_display_precision = 0
     _attr_translation_key = "alarms_in_history"
+    _state_fields = ("alarm_history_count",)
 
     @property
     def native_value(self) -> StateType:
@@ -157,7 +160,7 @@ class FlowMetaSensor(KomfoventEntity, SensorEntity):
 
     @property
     def native_unit_of_measurement(self) -> str:
-        return self.coordinator.settings_state.flow_units.unit_symbol()
+        return self.coordinator.identity.flow_units.unit_symbol()
 
 
 class PercentageMetaSensor(KomfoventEntity, SensorEntity):
@@ -176,6 +179,7 @@ class VavSensorsRange(KomfoventEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.PRESSURE
     _attr_native_unit_of_measurement = UnitOfPressure.PA
     _attr_translation_key = "vav_sensors_range"
+    _state_fields = ("modes.vav_sensors_range",)
 
     @property
     def native_value(self) -> StateType:
@@ -187,6 +191,7 @@ class NominalSupplyPressure(KomfoventEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.PRESSURE
     _attr_native_unit_of_measurement = UnitOfPressure.PA
     _attr_translation_key = "nominal_supply_pressure"
+    _state_fields = ("modes.nominal_supply_pressure",)
 
     @property
     def native_value(self) -> StateType:
@@ -198,6 +203,7 @@ class NominalExhaustPressure(KomfoventEntity, SensorEntity):
     _attr_native_unit_of_measurement = UnitOfPressure.PA
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_translation_key = "nominal_exhaust_pressure"
+    _state_fields = ("modes.nominal_exhaust_pressure",)
 
     @property
     def native_value(self) -> StateType:
@@ -206,6 +212,7 @@ class NominalExhaustPressure(KomfoventEntity, SensorEntity):
 
 class ActiveModeSupplyFlow(FlowMetaSensor):
     _attr_translation_key = "active_mode_supply_flow"
+    _state_fields = ("modes.operation_mode", "modes.modes")
 
     @property
     def native_value(self) -> StateType:
@@ -216,6 +223,7 @@ class ActiveModeSupplyFlow(FlowMetaSensor):
 
 class ActiveModeExtractFlow(FlowMetaSensor):
     _attr_translation_key = "active_mode_extract_flow"
+    _state_fields = ("modes.operation_mode", "modes.modes")
 
     @property
     def native_value(self) -> StateType:
@@ -226,6 +234,7 @@ class ActiveModeExtractFlow(FlowMetaSensor):
 
 class ActiveModeTemperatureSetpoint(TemperatureMetaSensor):
     _attr_translation_key = "active_mode_temperature_setpoint"
+    _state_fields = ("modes.operation_mode", "modes.modes")
 
     @property
     def native_value(self) -> StateType:
@@ -240,6 +249,7 @@ class ActiveModeTemperatureSetpoint(TemperatureMetaSensor):
 # Extract airflow
 class ExtractAirflowSetpoint(FlowMetaSensor):
     _attr_translation_key = "extract_airflow_setpoint"
+    _state_fields = ("monitoring.extract_flow_setpoint",)
 
     @property
     def native_value(self) -> StateType:
@@ -248,6 +258,7 @@ class ExtractAirflowSetpoint(FlowMetaSensor):
 
 class ExtractAirflowActual(FlowMetaSensor):
     _attr_translation_key = "extract_airflow_actual"
+    _state_fields = ("monitoring.exhaust_flow",)
 
     @property
     def native_value(self) -> StateType:
@@ -256,6 +267,7 @@ class ExtractAirflowActual(FlowMetaSensor):
 
 class ExtractAirflowFanLevel(PercentageMetaSensor):
     _attr_translation_key = "extract_airflow_fan_level"
+    _state_fields = ("monitoring.exhaust_fan_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -265,6 +277,7 @@ class ExtractAirflowFanLevel(PercentageMetaSensor):
 # Exhaust temperature
 class ExhaustTemperature(TemperatureMetaSensor):
     _attr_translation_key = "exhaust_temperature"
+    _state_fields = ("monitoring.exhaust_temp",)
 
     @property
     def native_value(self) -> StateType:
@@ -274,6 +287,7 @@ class ExhaustTemperature(TemperatureMetaSensor):
 # Extract temperature
 class ExtractTemperatureSetpoint(TemperatureMetaSensor):
     _attr_translation_key = "extract_temperature_setpoint"
+    _state_fields = ("monitoring.temp_setpoint",)
 
     @property
     def native_value(self) -> StateType:
@@ -282,6 +296,7 @@ class ExtractTemperatureSetpoint(TemperatureMetaSensor):
 
 class ExtractTemperatureActual(TemperatureMetaSensor):
     _attr_translation_key = "extract_temperature_actual"
+    _state_fields = ("monitoring.extract_temp",)
 
     @property
     def native_value(self) -> StateType:
@@ -293,6 +308,7 @@ class ExtractTemperatureActual(TemperatureMetaSensor):
 
 class SupplyTemperatureSetpoint(TemperatureMetaSensor):
     _attr_translation_key = "supply_temperature_setpoint"
+    _state_fields = ("monitoring.supply_air_temp_setpoint",)
 
     @property
     def native_value(self) -> StateType:
@@ -301,6 +317,7 @@ class SupplyTemperatureSetpoint(TemperatureMetaSensor):
 
 class SupplyTemperatureActual(TemperatureMetaSensor):
     _attr_translation_key = "supply_temperature_actual"
+    _state_fields = ("monitoring.supply_temp",)
 
     @property
     def native_value(self) -> StateType:
@@ -310,6 +327,7 @@ class SupplyTemperatureActual(TemperatureMetaSensor):
 # Outdoot temperature
 class OutdoorTemperature(TemperatureMetaSensor):
     _attr_translation_key = "outdoor_temperature"
+    _state_fields = ("monitoring.outdoor_temp",)
 
     @property
     def native_value(self) -> StateType:
@@ -319,6 +337,7 @@ class OutdoorTemperature(TemperatureMetaSensor):
 # Heat exchanger
 class HeatExchangerLevel(PercentageMetaSensor):
     _attr_translation_key = "heat_exchanger_level"
+    _state_fields = ("monitoring.heat_exchanger_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -327,6 +346,7 @@ class HeatExchangerLevel(PercentageMetaSensor):
 
 class HeatExchangerEfficiency(PercentageMetaSensor):
     _attr_translation_key = "heat_exchanger_efficiency"
+    _state_fields = ("monitoring.heat_exchanger_thermal_efficiency",)
 
     @property
     def native_value(self) -> StateType:
@@ -336,6 +356,7 @@ class HeatExchangerEfficiency(PercentageMetaSensor):
 # Internal supply temperature
 class InternalSupplyTemperature(TemperatureMetaSensor):
     _attr_translation_key = "internal_supply_temperature"
+    _state_fields = ("monitoring.internal_supply_temp",)
 
     @property
     def native_value(self) -> StateType:
@@ -345,6 +366,7 @@ class InternalSupplyTemperature(TemperatureMetaSensor):
 # Supply airflow
 class SupplyAirflowSetpoint(FlowMetaSensor):
     _attr_translation_key = "supply_airflow_setpoint"
+    _state_fields = ("monitoring.supply_flow_setpoint",)
 
     @property
     def native_value(self) -> StateType:
@@ -353,6 +375,7 @@ class SupplyAirflowSetpoint(FlowMetaSensor):
 
 class SupplyAirflowActual(FlowMetaSensor):
     _attr_translation_key = "supply_airflow_actual"
+    _state_fields = ("monitoring.supply_flow",)
 
     @property
     def native_value(self) -> StateType:
@@ -361,6 +384,7 @@ class SupplyAirflowActual(FlowMetaSensor):
 
 class SupplyAirflowFanLevel(PercentageMetaSensor):
     _attr_translation_key = "supply_airflow_fan_level"
+    _state_fields = ("monitoring.supply_fan_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -370,6 +394,7 @@ class SupplyAirflowFanLevel(PercentageMetaSensor):
 # Return water temperature
 class ReturnWaterTemperature(TemperatureMetaSensor):
     _attr_translation_key = "return_water_temperature"
+    _state_fields = ("monitoring.return_water_temp",)
 
     @property
     def native_value(self) -> StateType:
@@ -379,6 +404,7 @@ class ReturnWaterTemperature(TemperatureMetaSensor):
 # Air heaters/coolers
 class ElectricalHeaterLevel(PercentageMetaSensor):
     _attr_translation_key = "electrical_heater_level"
+    _state_fields = ("monitoring.electric_heater_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -387,6 +413,7 @@ class ElectricalHeaterLevel(PercentageMetaSensor):
 
 class WaterHeaterLevel(PercentageMetaSensor):
     _attr_translation_key = "water_heater_level"
+    _state_fields = ("monitoring.water_heater_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -395,6 +422,7 @@ class WaterHeaterLevel(PercentageMetaSensor):
 
 class DxLevel(PercentageMetaSensor):
     _attr_translation_key = "dx_level"
+    _state_fields = ("monitoring.dx_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -403,6 +431,7 @@ class DxLevel(PercentageMetaSensor):
 
 class HeatpumpLevel(PercentageMetaSensor):
     _attr_translation_key = "heatpump_level"
+    _state_fields = ("monitoring.heat_pump_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -411,6 +440,7 @@ class HeatpumpLevel(PercentageMetaSensor):
 
 class WaterCoolerLevel(PercentageMetaSensor):
     _attr_translation_key = "water_cooler_level"
+    _state_fields = ("monitoring.water_cooler_level",)
 
     @property
     def native_value(self) -> StateType:
@@ -418,6 +448,7 @@ class WaterCoolerLevel(PercentageMetaSensor):
 
 class AirQualitySensorType(KomfoventEntity, SensorEntity):
     _attr_translation_key = "air_quality_sensor_type"
+    _state_fields = ("monitoring.air_quality_sensor_type",)
 
     @property
     def native_value(self) -> StateType:
@@ -426,6 +457,7 @@ class AirQualitySensorType(KomfoventEntity, SensorEntity):
 
 class AirQualityLevel(KomfoventEntity, SensorEntity):
     _attr_translation_key = "air_quality_level"
+    _state_fields = ("monitoring.air_quality_level",)
     _attr_state_class = SensorStateClass.MEASUREMENT
 
     @property
@@ -18,7 +18,9 @@ if TYPE_CHECKING:
 _LOGGER = logging.getLogger(__name__)
 
 ATTR_DEVICE = "device"
+ATTR_EXTRACT_FLOW = "extract_flow"
 ATTR_MODE = "mode"
+ATTR_SUPPLY_FLOW = "supply_flow"
 ATTR_TEMPERATURE = "temperature"
 ATTR_VALUE = "value"
 
@@ -62,7 +64,8 @@ async def set_setpoint_temperature(hass: HomeAssistant, call: ServiceCall) -> No
     for device_id, coordinator in coordinators_in_call(hass, device_ids):
         try:
             mode_regs = api.Modes(coordinator.client).mode_registers(mode)
-            await mode_regs.set_setpoint_temperature(temperature)
+            with coordinator.client.debounce_writes():
+                await mode_regs.set_setpoint_temperature(temperature)
         except Exception:
             _LOGGER.exception(
                 "failed to set setpoint temperature for device id %s", device_id
@@ -86,7 +89,8 @@ async def set_supply_flow(hass: HomeAssistant, call: ServiceCall) -> None:
     for device_id, coordinator in coordinators_in_call(hass, device_ids):
         try:
             mode_regs = api.Modes(coordinator.client).mode_registers(mode)
-            await mode_regs.set_supply_flow(value)
+            with coordinator.client.debounce_writes():
+                await mode_regs.set_supply_flow(value)
         except Exception:
             _LOGGER.exception("failed to set supply flow for device id %s", device_id)
 
@@ -102,11 +106,42 @@ async def set_extract_flow(hass: HomeAssistant, call: ServiceCall) -> None:
     for device_id, coordinator in coordinators_in_call(hass, device_ids):
         try:
             mode_regs = api.Modes(coordinator.client).mode_registers(mode)
-            await mode_regs.set_extract_flow(value)
+            with coordinator.client.debounce_writes():
+                await mode_regs.set_extract_flow(value)
         except Exception:
             _LOGGER.exception("failed to set extract flow for device id %s", device_id)
 
 
+SET_MODE_PRESET_SCHEMA = vol.Schema(
+    {
+        ATTR_DEVICE: DEVICE_SCHEMA,
+        vol.Optional(ATTR_MODE, default=None): MODE_SCHEMA,
+        vol.Optional(ATTR_SUPPLY_FLOW, default=None): vol.Any(cv.positive_int, None),
+        vol.Optional(ATTR_EXTRACT_FLOW, default=None): vol.Any(cv.positive_int, None),
+        vol.Optional(ATTR_TEMPERATURE, default=None): vol.Any(cv.positive_float, None),
+    }
+)
+
+
+async def set_mode_preset(hass: HomeAssistant, call: ServiceCall) -> None:
+    device_ids = set(call.data[ATTR_DEVICE])
+    mode: api.OperationMode = call.data[ATTR_MODE] or api.OperationMode.SPECIAL
+    supply_flow: int | None = call.data[ATTR_SUPPLY_FLOW]
+    extract_flow: int | None = call.data[ATTR_EXTRACT_FLOW]
+    temperature: float | None = call.data[ATTR_TEMPERATURE]
+
+    for device_id, coordinator in coordinators_in_call(hass, device_ids):
+        try:
+            mode_regs = api.Modes(coordinator.client).mode_registers(mode)
+            await mode_regs.apply(
+                supply_flow=supply_flow,
+                extract_flow=extract_flow,
+                setpoint_temperature=temperature,
+            )
+        except Exception:
+            _LOGGER.exception("failed to set mode preset for device id %s", device_id)
+
+
 SET_SPECIAL_MODE_CONFIG_SCHEMA = vol.Schema(
     {
         ATTR_DEVICE: DEVICE_SCHEMA,
@@ -144,7 +179,8 @@ async def set_special_mode_config(hass: HomeAssistant, call: ServiceCall) -> Non
             mode_regs = api.Modes(coordinator.client).mode_registers(
                 api.OperationMode.SPECIAL
             )
-            flags = await mode_regs.configuration()
+            with coordinator.client.request_priority(api.Priority.INTERACTIVE_READ):
+                flags = await mode_regs.configuration()
             flags = maybe_set_bit(
                 flags, api.ConfigurationFlags.DEHUMIDIFYING, dehumidifying
             )
@@ -199,6 +235,12 @@ async def register(hass: HomeAssistant) -> None:
         functools.partial(set_extract_flow, hass),
         SET_EXTRACT_FLOW_SCHEMA,
     )
+    hass.services.async_register(
+        DOMAIN,
+        "set_mode_preset",
+        functools.partial(set_mode_preset, hass),
+        SET_MODE_PRESET_SCHEMA,
+    )
     hass.services.async_register(
         DOMAIN,
         "set_special_mode_config",
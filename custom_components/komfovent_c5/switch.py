@@ -25,6 +25,7 @@ async def async_setup_entry(
 
 class AhuControl(KomfoventEntity, SwitchEntity):
     _attr_translation_key = "ahu_control"
+    _state_fields = ("modes.ahu",)
 
     @property
     def is_on(self) -> bool:
@@ -32,15 +33,16 @@ class AhuControl(KomfoventEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self._modes_client.set_ahu_on(True)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("modes.ahu", True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         await self._modes_client.set_ahu_on(False)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("modes.ahu", False)
 
 
 class OcvControl(KomfoventEntity, SwitchEntity):
     _attr_translation_key = "ocv_control"
+    _state_fields = ("functions.ocv_enabled",)
 
     @property
     def entity_category(self) -> EntityCategory:
@@ -52,8 +54,8 @@ class OcvControl(KomfoventEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self._functions_client.set_ocv_enabled(True)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("functions.ocv_enabled", True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         await self._functions_client.set_ocv_enabled(False)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_written("functions.ocv_enabled", False)
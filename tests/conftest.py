@@ -1,6 +1,7 @@
 import asyncio
 import os
 import sys
+from collections.abc import AsyncIterator
 from pathlib import Path
 
 import pytest
@@ -9,15 +10,33 @@ CUSTOM_COMPONENTS_PATH = (Path(__file__) / "../../custom_components").resolve()
 sys.path.append(str(CUSTOM_COMPONENTS_PATH))
 
 
-from komfovent_c5.api import Client  # noqa: E402
+from komfovent_c5.api import Client, Service, determine_is_extended  # noqa: E402
+
+from tests.simulator import Simulator  # noqa: E402
 
 _global_client_lock = asyncio.Lock()
 
 
 @pytest.fixture
-async def client() -> Client:
+async def client() -> AsyncIterator[Client]:
+    """Client connected to the device at `TEST_DEVICE_HOSTNAME`, or to a simulator if it isn't set."""
+    hostname = os.getenv("TEST_DEVICE_HOSTNAME")
+    if not hostname:
+        async with Simulator() as simulator:
+            client = Client(host=simulator.host, port=simulator.port)
+            await client.connect()
+            yield client
+            await client.disconnect()
+        return
+
     async with _global_client_lock:
-        yield await Client.connect(
-            os.getenv("TEST_DEVICE_HOSTNAME"),
-            int(os.getenv("TEST_DEVICE_PORT", 502)),
-        )
+        client = Client(host=hostname, port=int(os.getenv("TEST_DEVICE_PORT", 502)))
+        await client.connect()
+        yield client
+        await client.disconnect()
+
+
+@pytest.fixture
+async def is_extended(client: Client) -> bool:
+    version = await Service(client).read_firmware_version()
+    return determine_is_extended(version=version)
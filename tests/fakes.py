@@ -0,0 +1,38 @@
+from collections.abc import Sequence
+
+from komfovent_c5.api import Transport
+
+
+class FakeTransport(Transport):
+    """Keeps the registers in memory and remembers every request."""
+
+    def __init__(self) -> None:
+        self.registers: dict[int, int] = {}
+        self.requests: list[tuple[str, int, int]] = []
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = 1
+    ) -> list[int]:
+        self.requests.append(("read", address, count))
+        return [self.registers.get(address + i, 0) for i in range(count)]
+
+    async def write_register(self, address: int, value: int, *, unit: int = 1) -> None:
+        self.requests.append(("write", address, 1))
+        self.registers[address] = value
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], *, unit: int = 1
+    ) -> None:
+        self.requests.append(("write", address, len(values)))
+        for offset, value in enumerate(values):
+            self.registers[address + offset] = value
@@ -0,0 +1,96 @@
+import pytest
+from komfovent_c5.api import AdaptiveReadTransport, Client, ModbusError
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+class LimitedTransport(FakeTransport):
+    def __init__(self, max_count: int) -> None:
+        super().__init__()
+        self.max_count = max_count
+        # raised by the next reads, whatever their size
+        self.failures: list[Exception] = []
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = 1
+    ) -> list[int]:
+        if self.failures:
+            self.requests.append(("failed", address, count))
+            raise self.failures.pop(0)
+        if count > self.max_count:
+            self.requests.append(("rejected", address, count))
+            raise ModbusError("too many registers", exception_code=0x03)
+        return await super().read_holding_registers(address, count, unit=unit)
+
+
+async def test_adaptive_read_size():
+    inner = LimitedTransport(50)
+    transport = AdaptiveReadTransport(inner, probe_address=99)
+    client = Client(host="localhost", port=502, transport=transport)
+
+    await client.read_many_u16(0, 100)
+
+    assert transport.max_read_count == 32
+    assert inner.requests[:3] == [
+        ("rejected", 99, 125),
+        ("rejected", 99, 64),
+        ("read", 99, 32),
+    ]
+    assert [request[2] for request in inner.requests[3:]] == [32, 32, 32, 4]
+
+    # a device that gets stricter later on is handled by splitting the read
+    inner.max_count = 20
+    inner.requests.clear()
+    assert len(await client.read_many_u16(0, 32)) == 32
+    assert transport.max_read_count == 16
+    assert inner.requests == [
+        ("rejected", 0, 32),
+        ("read", 0, 16),
+        ("read", 16, 16),
+    ]
+
+
+async def test_adaptive_read_size_is_probed_again_after_reconnecting():
+    inner = LimitedTransport(20)
+    transport = AdaptiveReadTransport(inner, probe_address=99)
+    await transport.connect()
+    await transport.read_holding_registers(0, 1)
+    assert transport.max_read_count == 16
+
+    # e.g. the gateway was replaced with one that handles full reads
+    await transport.close()
+    inner.max_count = 125
+    await transport.connect()
+    inner.requests.clear()
+    assert len(await transport.read_holding_registers(0, 100)) == 100
+    assert transport.max_read_count == 125
+    assert inner.requests == [("read", 99, 125), ("read", 0, 100)]
+
+
+async def test_adaptive_read_size_ignores_unanswered_reads():
+    inner = LimitedTransport(125)
+    transport = AdaptiveReadTransport(inner, probe_address=99)
+
+    # the unit is offline, so the probe is tried again with the next read
+    for failure in (TimeoutError(), ModbusError("target failed", exception_code=0x0B)):
+        inner.failures.append(failure)
+        inner.requests.clear()
+        with pytest.raises(type(failure)):
+            await transport.read_holding_registers(0, 100)
+        assert inner.requests == [("failed", 99, 125)]
+
+    await transport.read_holding_registers(0, 100)
+    assert transport.max_read_count == 125
+
+    # and once it's back, a couple of failed reads don't shrink the size
+    inner.failures += [
+        TimeoutError(),
+        ModbusError("target failed", exception_code=0x0B),
+    ]
+    with pytest.raises(TimeoutError):
+        await transport.read_holding_registers(0, 100)
+    with pytest.raises(ModbusError):
+        await transport.read_holding_registers(0, 100)
+    assert transport.max_read_count == 125
@@ -0,0 +1,51 @@
+import pytest
+from komfovent_c5.api import HISTORY_COUNT, AlarmHistory, Alarms, Client, Transaction
+
+from tests.simulator import Simulator
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_alarm_history_reads_only_new_entries():
+    async with Simulator(latency=0.0) as simulator:
+        client = Client(host=simulator.host, port=simulator.port)
+        await client.connect()
+        transactions: list[Transaction] = []
+        client.add_transaction_listener(transactions.append)
+        history = AlarmHistory(client)
+
+        for code in range(1, 4):
+            simulator.raise_alarm(code)
+        assert [entry.alarm.code for entry in await history.read()] == [3, 2, 1]
+
+        # nothing changed, the count and the newest entry are enough
+        transactions.clear()
+        assert len(await history.read()) == 3
+        assert [(t.address, t.count) for t in transactions] == [(1099, 6)]
+
+        simulator.raise_alarm(4)
+        simulator.raise_alarm(5)
+        transactions.clear()
+        assert [entry.alarm.code for entry in await history.read()] == [5, 4, 3, 2, 1]
+        assert [(t.address, t.count) for t in transactions] == [(1099, 6), (1105, 10)]
+
+        # a full history drops the oldest entries
+        for code in range(6, 6 + Alarms.MAX_HISTORY_ALERTS):
+            simulator.raise_alarm(code % 256)
+        assert [entry.alarm.code for entry in await history.read()] == [
+            code % 256 for code in reversed(range(6, 6 + Alarms.MAX_HISTORY_ALERTS))
+        ]
+        previous = history.entries
+        simulator.raise_alarm(1)
+        transactions.clear()
+        entries = await history.read()
+        assert entries[0].alarm.code == 1
+        assert entries[1:] == previous[:-1]
+        assert [(t.address, t.count) for t in transactions] == [(1099, 6), (1105, 5)]
+        assert entries == await history.read()
+
+        # cleared in the meantime
+        simulator.set_field(HISTORY_COUNT, 0)
+        simulator.raise_alarm(7)
+        assert [entry.alarm.code for entry in await history.read()] == [7]
+        await client.disconnect()
@@ -0,0 +1,19 @@
+from komfovent_c5.api import RegisterCache, RegisterRange
+
+
+def test_register_cache_ttl():
+    now = 0.0
+    cache = RegisterCache(
+        [(RegisterRange(99, 5), 10.0), (RegisterRange(500, 5), 60.0)],
+        clock=lambda: now,
+    )
+    cache.store(97, [1, 2, 3, 4, 5])
+    cache.store(500, [6, 7])
+
+    assert cache.lookup(97, 1) is None
+    assert cache.lookup(99, 3) == [3, 4, 5]
+    assert cache.lookup(99, 4) is None
+
+    now = 30.0
+    assert cache.lookup(99, 1) is None
+    assert cache.lookup(500, 2) == [6, 7]
@@ -0,0 +1,41 @@
+import pytest
+from komfovent_c5.api import Client, Field, Modes, OperationMode, RegisterRange
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_write_batch_merges_adjacent_registers():
+    transport = FakeTransport()
+    client = Client(host="localhost", port=502, transport=transport)
+    mode = Modes(client).mode_registers(OperationMode.COMFORT1)
+
+    await mode.apply(supply_flow=300, extract_flow=250, setpoint_temperature=21.5)
+
+    assert transport.requests == [("write", 100, 5)]
+    state = await mode.read_all()
+    assert state.supply_flow == 300
+    assert state.extract_flow == 250
+    assert state.setpoint_temperature == 21.5
+
+
+async def test_read_field_bypasses_cache():
+    transport = FakeTransport()
+    client = Client(
+        host="localhost",
+        port=502,
+        transport=transport,
+        cache_ttl=[(RegisterRange(0, 1), 60.0)],
+    )
+    field = Field(name="ahu", address=0, convert=bool)
+
+    await client.write_field(field, True)
+    assert await client.read_field(field) is True
+    assert transport.requests == [("write", 0, 1)]
+
+    # changed behind our back, e.g. on the control panel
+    transport.registers[0] = 0
+    assert await client.read_field(field, cached=False) is False
+    assert await client.read_field(field) is False
+    assert transport.requests == [("write", 0, 1), ("read", 0, 1)]
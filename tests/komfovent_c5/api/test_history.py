@@ -0,0 +1,38 @@
+import pytest
+from komfovent_c5.api import (
+    Client,
+    FlowUnits,
+    Monitoring,
+    MonitoringHistory,
+    RegisterImage,
+)
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_monitoring_history():
+    monitoring = Monitoring(
+        Client(host="localhost", port=502, transport=FakeTransport())
+    )
+    history = MonitoringHistory(capacity=3)
+    assert "supply_temp" in history.fields
+    assert "c5_status" not in history.fields
+    for timestamp, supply_temp in enumerate([100, 215, 220, 230]):
+        image = RegisterImage()
+        image.add(1999, [2, 1, 0, 300, 0, 250, supply_temp, *([0] * 34)])
+        image.add(2199, [0, 80, *([0] * 22)])
+        state = monitoring.decode_all(
+            image, units=FlowUnits.CUBIC_METER_PER_HOUR, is_extended=True
+        )
+        history.record(state, timestamp=timestamp)
+
+    # the first sample was overwritten
+    assert len(history) == 3
+    assert history.latest("supply_temp", 2) == [(2.0, 22.0), (3.0, 23.0)]
+    stats = history.window("supply_temp")
+    assert (stats.count, stats.min, stats.max) == (3, 21.5, 23.0)
+    assert stats.mean == pytest.approx(22.1666, abs=1e-3)
+    assert history.window("supply_temp", since=2).count == 2
+    assert history.window("supply_temp", last=1).mean == 23.0
@@ -51,8 +51,8 @@ async def test_individual_mode_registers(client: Client):
     )
 
 
-async def test_read_all(client: Client):
+async def test_read_all(client: Client, is_extended: bool):
     modes = Modes(client)
 
-    state = await modes.read_all()
+    state = await modes.read_all(is_extended=is_extended)
     assert state.modes[OperationMode.SPECIAL].configuration is not None
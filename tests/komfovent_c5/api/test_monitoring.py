@@ -0,0 +1,33 @@
+import pytest
+from komfovent_c5.api import Client, FlowUnits, Monitoring, RegisterImage
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_monitoring_snapshot_keeps_blocks_that_werent_read():
+    image = RegisterImage()
+    image.add(1999, [2, 1, 0, 300, 0, 250, 215, *([0] * 34)])
+    image.add(2199, [0, 80, *([0] * 22)])
+    monitoring = Monitoring(
+        Client(host="localhost", port=502, transport=FakeTransport())
+    )
+    state = monitoring.decode_all(
+        image, units=FlowUnits.CUBIC_METER_PER_HOUR, is_extended=True
+    )
+    assert not hasattr(state, "__dict__")
+    assert (state.supply_flow, state.supply_temp) == (300, 21.5)
+    assert state.heat_exchanger_thermal_efficiency == 80
+
+    fast = RegisterImage()
+    fast.add(1999, [2, 1, 0, 310, *([0] * 37)])
+    state = monitoring.decode_all(
+        fast,
+        units=FlowUnits.CUBIC_METER_PER_HOUR,
+        is_extended=True,
+        previous=state,
+        block2=False,
+    )
+    assert state.supply_flow == 310
+    assert state.heat_exchanger_thermal_efficiency == 80
@@ -0,0 +1,67 @@
+import pytest
+from komfovent_c5.api import (
+    ModesState,
+    OperationMode,
+    RegisterImage,
+    RegisterRange,
+    plan_reads,
+)
+
+
+def test_plan_reads_merges_small_gaps():
+    plan = plan_reads(
+        [
+            RegisterRange(2199, 24),
+            RegisterRange(999, 11),
+            RegisterRange(1999, 41),
+            RegisterRange(1010, 1),
+            RegisterRange(1099, 1),
+        ],
+        max_gap=8,
+        max_count=125,
+    )
+    assert plan == [
+        RegisterRange(999, 12),
+        RegisterRange(1099, 1),
+        RegisterRange(1999, 41),
+        RegisterRange(2199, 24),
+    ]
+
+
+def test_plan_reads_respects_max_count():
+    plan = plan_reads(
+        [RegisterRange(0, 1), RegisterRange(99, 33)],
+        max_gap=200,
+        max_count=125,
+    )
+    assert plan == [RegisterRange(0, 1), RegisterRange(99, 33)]
+
+
+def test_register_image():
+    image = RegisterImage()
+    image.add(99, list(range(10)))
+    assert image.registers(101, 3) == [2, 3, 4]
+    with pytest.raises(ValueError):
+        image.registers(105, 10)
+
+
+def test_register_image_buffer_decodes_like_iterator():
+    # op mode, 4 * (supply, extract, setpoint), special mode, 3 control registers
+    registers = [2]
+    registers += [0, 300, 1, 4, 215] * 4
+    registers += [0xFFFF, 0xFFFF, 0, 0, 180, 0b1010]
+    registers += [1, 2, 0]
+    image = RegisterImage()
+    image.add(99, registers)
+
+    state = ModesState.from_buffer(
+        True, image.buffer(99, len(registers)), is_extended=False
+    )
+    assert state == ModesState.consume_from_registers(
+        True, iter(registers), is_extended=False
+    )
+    assert state.operation_mode == OperationMode.COMFORT2
+    assert state.modes[OperationMode.COMFORT1].extract_flow == 65540
+    assert state.modes[OperationMode.ECONOMY2].setpoint_temperature == 21.5
+    assert state.modes[OperationMode.SPECIAL].supply_flow == 0xFFFF_FFFF
+    assert state.modes[OperationMode.SPECIAL].configuration == 0b1010
@@ -0,0 +1,57 @@
+import pytest
+from komfovent_c5.api import (
+    AdaptiveInterval,
+    PollSchedule,
+    PollTier,
+    delay_until_slot,
+    poll_phase,
+)
+
+
+def test_poll_schedule():
+    now = 0.0
+    schedule = PollSchedule(
+        {PollTier.FAST: 5.0, PollTier.SLOW: 300.0, PollTier.CONFIG: None},
+        clock=lambda: now,
+    )
+    assert schedule.due() == set(PollTier)
+    schedule.mark_read(PollTier)
+
+    now = 5.0
+    assert schedule.due() == {PollTier.FAST}
+    schedule.mark_read({PollTier.FAST})
+
+    now = 300.0
+    assert schedule.due() == {PollTier.FAST, PollTier.SLOW}
+    # a write that happens while the poll is in flight
+    now = 301.0
+    schedule.invalidate(PollTier.CONFIG)
+    schedule.mark_read({PollTier.FAST, PollTier.SLOW, PollTier.CONFIG})
+
+    now = 302.0
+    assert schedule.due() == {PollTier.CONFIG}
+    schedule.mark_read({PollTier.CONFIG})
+    assert schedule.due() == set()
+
+
+def test_adaptive_interval():
+    interval = AdaptiveInterval(min_interval=5.0, max_interval=60.0, stable_polls=2)
+
+    assert interval.update(changed=False) == 5.0
+    assert [interval.update(changed=False) for _ in range(4)] == [10, 20, 40, 60]
+    assert interval.update(changed=True) == 5.0
+    # a stopped unit backs off right away
+    assert interval.update(changed=False, idle=True) == 10.0
+    interval.reset()
+    assert interval.interval == 5.0
+
+
+def test_poll_slots():
+    assert poll_phase("10.0.0.1:502/1") == poll_phase("10.0.0.1:502/1")
+    assert 0.0 <= poll_phase("10.0.0.2:502/1") < 1.0
+
+    # slots at 2.5 + k * 10
+    assert delay_until_slot(10.0, 0.25, now=1000.0) == 12.5
+    assert delay_until_slot(10.0, 0.25, now=1006.0) == 6.5
+    # polls in a steady rhythm keep their interval
+    assert delay_until_slot(10.0, 0.25, now=1002.6) == pytest.approx(9.9)
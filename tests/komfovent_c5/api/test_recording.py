@@ -0,0 +1,68 @@
+import io
+
+import pytest
+from komfovent_c5.api import (
+    Client,
+    FlowUnits,
+    Modes,
+    Monitoring,
+    OperationMode,
+    ReplayError,
+    ReplayTransport,
+)
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_record_and_replay():
+    transport = FakeTransport()
+    transport.registers.update({1999: 2, 2002: 300, 2005: 215})
+    client = Client(host="localhost", port=502, transport=transport)
+    recording = io.BytesIO()
+    with client.record(recording):
+        state = await Monitoring(client).read_all(
+            units=FlowUnits.CUBIC_METER_PER_HOUR, is_extended=True
+        )
+        await Modes(client).set_operation_mode(OperationMode.COMFORT1)
+
+    recording.seek(0)
+    replay = ReplayTransport.from_file(recording)
+    client = Client(host="localhost", port=502, transport=replay)
+    replayed = await Monitoring(client).read_all(
+        units=FlowUnits.CUBIC_METER_PER_HOUR, is_extended=True
+    )
+    assert replayed == state
+    await Modes(client).set_operation_mode(OperationMode.COMFORT1)
+    assert replay.remaining == 0
+    # everything was replayed already
+    with pytest.raises(ReplayError):
+        await client.read_u16(1999)
+
+
+class BrokenTransport(FakeTransport):
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = 1
+    ) -> list[int]:
+        if address == 0:
+            raise OSError("no route to host")
+        return await super().read_holding_registers(address, count, unit=unit)
+
+
+async def test_record_and_replay_other_failures():
+    client = Client(host="localhost", port=502, transport=BrokenTransport())
+    recording = io.BytesIO()
+    with client.record(recording):
+        with pytest.raises(OSError):
+            await client.read_u16(0)
+        await client.read_u16(1)
+
+    recording.seek(0)
+    replay = ReplayTransport.from_file(recording)
+    client = Client(host="localhost", port=502, transport=replay)
+    with pytest.raises(OSError) as exc_info:
+        await client.read_u16(0)
+    assert not isinstance(exc_info.value, ReplayError)
+    assert await client.read_u16(1) == 0
+    assert replay.remaining == 0
@@ -0,0 +1,36 @@
+import pytest
+from komfovent_c5.api import Field, RegisterBlock, RegisterImage, RegisterRange
+
+
+def test_register_block_layout():
+    block = RegisterBlock(
+        Field(name="flow", address=10, format="I"),
+        Field(name="temp", address=13, format="h", scale=10, sentinel=-0x8000),
+        Field(name="extra", address=20, extended=True),
+    )
+    assert block.range(is_extended=False) == RegisterRange(10, 4)
+    assert block.range(is_extended=True) == RegisterRange(10, 11)
+
+    image = RegisterImage()
+    image.add(10, [1, 2, 0xFFFF, 0xFF38, *range(7)])
+    assert block.decode(image, is_extended=False) == {
+        "flow": 0x1_0002,
+        "temp": -20.0,
+        "extra": None,
+    }
+    assert block.decode(image, is_extended=True)["extra"] == 6
+
+    image = RegisterImage()
+    image.add(10, [0, 0, 0, 0x8000])
+    assert block.decode(image, is_extended=False)["temp"] is None
+
+    assert block["flow"].encode(0x1_0002) == [1, 2]
+    assert block["temp"].encode(-2.0) == [0xFFEC]
+
+
+def test_field_encode_out_of_range():
+    field = Field(name="temp", address=13, format="h", scale=10)
+    with pytest.raises(ValueError, match="temp"):
+        field.encode(4000)
+    with pytest.raises(ValueError, match="ahu"):
+        Field(name="ahu", address=1).encode(-1)
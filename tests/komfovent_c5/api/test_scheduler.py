@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from komfovent_c5.api import Client, PriorityScheduler
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+class SerialTransport(FakeTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.scheduler = PriorityScheduler()
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = 1
+    ) -> list[int]:
+        async with self.scheduler:
+            await asyncio.sleep(0.01)
+            return await super().read_holding_registers(address, count, unit=unit)
+
+    async def write_register(self, address: int, value: int, *, unit: int = 1) -> None:
+        async with self.scheduler:
+            await super().write_register(address, value, unit=unit)
+
+
+async def test_interactive_write_preempts_background_reads():
+    transport = SerialTransport()
+    client = Client(host="localhost", port=502, transport=transport)
+
+    poll = asyncio.create_task(client.read_many_u16(0, 500))
+    # let the first read go on the wire
+    await asyncio.sleep(0.005)
+    await client.write_u16(0, 1)
+    await poll
+
+    assert transport.requests == [
+        ("read", 0, 125),
+        ("write", 0, 1),
+        ("read", 125, 125),
+        ("read", 250, 125),
+        ("read", 375, 125),
+    ]
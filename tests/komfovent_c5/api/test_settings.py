@@ -4,8 +4,9 @@ from komfovent_c5.api import Client, Settings
 pytestmark = pytest.mark.asyncio
 
 
-async def test_read_all(client: Client):
+async def test_read_all(client: Client, is_extended: bool):
     settings = Settings(client)
 
-    state = await settings.read_all()
-    assert state
+    state = await settings.read_all(is_extended=is_extended)
+    assert state.ahu_serial_number
+    assert (state.bacnet_port is not None) == is_extended
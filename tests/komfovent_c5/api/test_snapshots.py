@@ -0,0 +1,41 @@
+import pytest
+from komfovent_c5.api import RegisterImage, RegisterRange, SnapshotReader, SnapshotStore
+
+
+def test_snapshot_store(tmp_path):
+    ranges = [RegisterRange(999, 2), RegisterRange(1999, 3)]
+    with SnapshotStore(
+        tmp_path, ranges, retention=10.0, segment_frames=4, segment_duration=100.0
+    ) as store:
+        for timestamp in range(6):
+            image = RegisterImage()
+            image.add(999, [timestamp, 1])
+            if timestamp % 2 == 0:
+                image.add(1999, [7, 8, 9])
+            store.append(float(timestamp), image)
+
+    # continues the latest segment after a restart
+    with SnapshotStore(
+        tmp_path, ranges, retention=10.0, segment_frames=4, segment_duration=100.0
+    ) as store:
+        image = RegisterImage()
+        image.add(999, [6, 1])
+        store.append(6.0, image)
+        assert len(list(tmp_path.iterdir())) == 2
+        # the first segment ends before the cutoff
+        store.prune(15.0)
+        assert len(list(tmp_path.iterdir())) == 1
+        store.prune(100.0)
+        assert len(list(tmp_path.iterdir())) == 1
+
+    with SnapshotReader(tmp_path) as reader:
+        snapshots = list(reader.snapshots(start=4.5))
+        assert [snapshot.timestamp for snapshot in snapshots] == [5.0, 6.0]
+        assert [snapshot.timestamp for snapshot in reader.snapshots(end=5.0)] == [4.0]
+        assert snapshots[0].registers(999, 2) == [5, 1]
+        assert snapshots[0].ranges == [RegisterRange(999, 2)]
+        with pytest.raises(ValueError):
+            snapshots[0].buffer(1999, 3)
+
+        (snapshot,) = reader.snapshots(start=4.0, end=5.0)
+        assert snapshot.image().registers(2000, 2) == [8, 9]
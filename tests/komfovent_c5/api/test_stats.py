@@ -0,0 +1,31 @@
+import pytest
+from komfovent_c5.api import Client, Transaction, TransactionOutcome
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_transaction_stats():
+    transport = FakeTransport()
+    client = Client(host="localhost", port=502, transport=transport)
+    transactions: list[Transaction] = []
+    remove_listener = client.add_transaction_listener(transactions.append)
+
+    await client.read_many_u16(0, 200)
+    await client.write_u16(10, 1)
+    remove_listener()
+    await client.write_u16(11, 1)
+
+    assert [(t.operation, t.address, t.count) for t in transactions] == [
+        ("read", 0, 125),
+        ("read", 125, 75),
+        ("write", 10, 1),
+    ]
+    assert all(t.outcome == TransactionOutcome.OK for t in transactions)
+    reads = client.stats["read"]
+    assert reads.transactions == 2
+    assert reads.registers == 200
+    assert reads.wire_bytes == 2 * (12 + 9) + 2 * 200
+    assert reads.duration.count == 2
+    assert client.stats["write"].transactions == 2
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from komfovent_c5.api import CircuitOpenError, SupervisedTransport
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+class FlakyTransport(FakeTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.is_connected = False
+        self.connects = 0
+        self.refuse_connect = False
+        # raised by the reads of these units
+        self.errors: dict[int, Exception] = {}
+        self.units: list[int] = []
+
+    @property
+    def connected(self) -> bool:
+        return self.is_connected
+
+    async def connect(self, connect_timeout: float | None = None) -> None:
+        self.connects += 1
+        if self.refuse_connect:
+            raise ConnectionError("refused")
+        self.is_connected = True
+
+    async def close(self) -> None:
+        self.is_connected = False
+
+    async def read_holding_registers(
+        self, address: int, count: int, *, unit: int = 1
+    ) -> list[int]:
+        self.units.append(unit)
+        registers = await super().read_holding_registers(address, count, unit=unit)
+        # give the other requests of a batch a chance to go out
+        await asyncio.sleep(0)
+        if unit in self.errors:
+            raise self.errors[unit]
+        return registers
+
+
+def _supervise(inner: FlakyTransport, clock: list[float]) -> SupervisedTransport:
+    return SupervisedTransport(
+        inner,
+        heartbeat_address=0,
+        initial_backoff=1.0,
+        heartbeat_interval=60.0,
+        clock=lambda: clock[0],
+    )
+
+
+async def test_supervisor_backoff_grows_until_success():
+    clock = [0.0]
+    inner = FlakyTransport()
+    inner.refuse_connect = True
+    transport = _supervise(inner, clock)
+
+    # the jittered backoff is between half and all of 1s, 2s and 4s
+    for backoff in (1.0, 2.0, 4.0):
+        start = clock[0]
+        with pytest.raises(ConnectionError):
+            await transport.connect()
+        clock[0] = start + backoff / 2 - 0.01
+        assert transport.circuit_open
+        with pytest.raises(CircuitOpenError):
+            await transport.read_holding_registers(0, 1)
+        clock[0] = start + backoff
+        assert not transport.circuit_open
+    assert inner.connects == 3
+
+    inner.refuse_connect = False
+    await transport.connect()
+    await transport.read_holding_registers(0, 1)
+    # an answer resets the backoff
+    inner.errors[1] = ConnectionResetError()
+    start = clock[0]
+    with pytest.raises(ConnectionError):
+        await transport.read_holding_registers(0, 1)
+    clock[0] = start + 1.0
+    assert not transport.circuit_open
+
+
+async def test_supervisor_counts_a_failed_batch_once():
+    clock = [0.0]
+    inner = FlakyTransport()
+    transport = _supervise(inner, clock)
+    await transport.connect()
+
+    inner.errors[1] = ConnectionResetError()
+    results = await asyncio.gather(
+        *(transport.read_holding_registers(address, 1) for address in range(5)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert not inner.connected
+    # a single failure, so the circuit closes again within the first backoff
+    clock[0] = 1.0
+    assert not transport.circuit_open
+
+
+async def test_supervisor_unit_timeout_keeps_circuit_closed():
+    clock = [0.0]
+    inner = FlakyTransport()
+    transport = _supervise(inner, clock)
+    await transport.connect()
+    await transport.read_holding_registers(0, 1, unit=1)
+
+    inner.errors[2] = TimeoutError()
+    with pytest.raises(TimeoutError):
+        await transport.read_holding_registers(0, 1, unit=2)
+    assert not transport.circuit_open
+    assert inner.connected
+
+    # the connection is checked with the unit that answered last before it's used again
+    inner.units.clear()
+    await transport.connect()
+    assert inner.units == [1]
+    assert inner.connects == 1
+    # and not again while it's in use
+    await transport.connect()
+    assert inner.units == [1]
+
+
+async def test_supervisor_heartbeat():
+    clock = [0.0]
+    inner = FlakyTransport()
+    transport = _supervise(inner, clock)
+    await transport.connect()
+    await transport.read_holding_registers(0, 1)
+
+    # an idle connection is checked before it's reused
+    clock[0] = 61.0
+    inner.units.clear()
+    await transport.connect()
+    assert inner.units == [1]
+    assert inner.connects == 1
+
+    # a half-open session is replaced right away
+    clock[0] = 122.0
+    inner.errors[1] = TimeoutError()
+    await transport.connect()
+    assert inner.connects == 2
+
+    # but a connection that doesn't answer after reconnecting either opens the circuit
+    with pytest.raises(TimeoutError):
+        await transport.read_holding_registers(0, 1)
+    with pytest.raises(CircuitOpenError):
+        await transport.connect()
+    assert not inner.connected
+    assert inner.connects == 2
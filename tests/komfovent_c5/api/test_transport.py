@@ -0,0 +1,173 @@
+import asyncio
+import struct
+
+import pytest
+from komfovent_c5.api import ModbusError, PipelinedTransport
+
+pytestmark = pytest.mark.asyncio
+
+# transaction id, protocol id, length, unit
+_MBAP = struct.Struct(">HHHB")
+
+
+class ScriptedServer:
+    """Modbus TCP server that leaves it up to the test when and how to answer."""
+
+    def __init__(self) -> None:
+        self.requests: asyncio.Queue[tuple[int, bytes]] = asyncio.Queue()
+        self.connections = 0
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def __aenter__(self) -> "ScriptedServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.drop()
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def next_request(self) -> tuple[int, bytes]:
+        """Transaction id and PDU of the next request."""
+        return await asyncio.wait_for(self.requests.get(), 1.0)
+
+    def respond(self, transaction_id: int, pdu: bytes, *, unit: int = 1) -> None:
+        assert self._writer is not None
+        self._writer.write(_MBAP.pack(transaction_id, 0, len(pdu) + 1, unit) + pdu)
+
+    def respond_registers(
+        self, transaction_id: int, registers: list[int], *, unit: int = 1
+    ) -> None:
+        count = len(registers)
+        self.respond(
+            transaction_id,
+            struct.pack(f">BB{count}H", 3, 2 * count, *registers),
+            unit=unit,
+        )
+
+    def drop(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._writer = writer
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP.size)
+                transaction_id, _protocol_id, length, _unit = _MBAP.unpack(header)
+                pdu = await reader.readexactly(length - 1)
+                self.requests.put_nowait((transaction_id, pdu))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+
+async def test_pipelined_out_of_order_responses():
+    async with ScriptedServer() as server:
+        transport = PipelinedTransport(host="127.0.0.1", port=server.port, depth=2)
+        await transport.connect()
+        first = asyncio.create_task(transport.read_holding_registers(100, 2))
+        second = asyncio.create_task(transport.read_holding_registers(200, 1))
+
+        requests = dict([await server.next_request(), await server.next_request()])
+        by_address = {
+            struct.unpack_from(">H", pdu, 1)[0]: transaction_id
+            for transaction_id, pdu in requests.items()
+        }
+        server.respond_registers(by_address[200], [3])
+        server.respond_registers(by_address[100], [1, 2])
+
+        assert await second == [3]
+        assert await first == [1, 2]
+        await transport.close()
+
+
+async def test_pipelined_exception_response():
+    async with ScriptedServer() as server:
+        transport = PipelinedTransport(host="127.0.0.1", port=server.port, depth=2)
+        await transport.connect()
+        read = asyncio.create_task(transport.read_holding_registers(5000, 1))
+
+        transaction_id, _pdu = await server.next_request()
+        server.respond(transaction_id, bytes((0x83, 0x02)))
+
+        with pytest.raises(ModbusError) as exc_info:
+            await read
+        assert exc_info.value.exception_code == 0x02
+        await transport.close()
+
+
+async def test_pipelined_timeout_releases_the_slot():
+    async with ScriptedServer() as server:
+        transport = PipelinedTransport(
+            host="127.0.0.1", port=server.port, depth=1, timeout=0.05
+        )
+        await transport.connect()
+
+        with pytest.raises(TimeoutError):
+            await transport.read_holding_registers(100, 1)
+        assert not transport._pending
+
+        # the only slot is free again and the late response doesn't get in the way
+        read = asyncio.create_task(transport.read_holding_registers(100, 1))
+        late_id, _pdu = await server.next_request()
+        transaction_id, _pdu = await server.next_request()
+        server.respond_registers(late_id, [1])
+        server.respond_registers(transaction_id, [2])
+        assert await read == [2]
+        assert transport.connected
+        await transport.close()
+
+
+async def test_pipelined_connection_lost_fails_requests_in_flight():
+    async with ScriptedServer() as server:
+        transport = PipelinedTransport(host="127.0.0.1", port=server.port, depth=2)
+        await transport.connect()
+        reads = [
+            asyncio.create_task(transport.read_holding_registers(address, 1))
+            for address in range(3)
+        ]
+        # two on the wire, the third waits for a slot
+        await server.next_request()
+        await server.next_request()
+        server.drop()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*reads, return_exceptions=True), 1.0
+        )
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert not transport.connected
+        await transport.close()
+
+
+async def test_pipelined_concurrent_connects_share_one_connection():
+    async with ScriptedServer() as server:
+        transport = PipelinedTransport(host="127.0.0.1", port=server.port, depth=2)
+        await asyncio.gather(transport.connect(), transport.connect())
+        read = asyncio.create_task(transport.read_holding_registers(100, 1))
+
+        transaction_id, _pdu = await server.next_request()
+        server.respond_registers(transaction_id, [1])
+        assert await read == [1]
+        assert server.connections == 1
+        await transport.close()
+
+
+async def test_pipelined_rejects_response_from_another_unit():
+    async with ScriptedServer() as server:
+        transport = PipelinedTransport(host="127.0.0.1", port=server.port, depth=2)
+        await transport.connect()
+        read = asyncio.create_task(transport.read_holding_registers(100, 1, unit=2))
+
+        transaction_id, _pdu = await server.next_request()
+        server.respond_registers(transaction_id, [1], unit=3)
+        with pytest.raises(ModbusError):
+            await read
+        await transport.close()
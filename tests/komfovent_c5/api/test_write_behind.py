@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+from komfovent_c5.api import Client, Modes, OperationMode
+
+from tests.fakes import FakeTransport
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_debounced_writes_keep_last_value():
+    transport = FakeTransport()
+    client = Client(
+        host="localhost", port=502, transport=transport, write_debounce=0.05
+    )
+    mode = Modes(client).mode_registers(OperationMode.SPECIAL)
+
+    async def set_temperature(value: float) -> None:
+        with client.debounce_writes():
+            await mode.set_setpoint_temperature(value)
+
+    await asyncio.gather(*(set_temperature(20.0 + i) for i in range(5)))
+
+    assert transport.requests == [("write", 124, 1)]
+    assert transport.registers[124] == 240
@@ -0,0 +1,404 @@
+import asyncio
+import dataclasses
+import time
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from komfovent_c5 import (
+    KomfoventCoordinator,
+    KomfoventState,
+    _changed_fields,
+    api,
+    async_setup,
+    async_setup_entry,
+)
+from komfovent_c5.const import DATA_TRANSPORTS, DOMAIN
+from komfovent_c5.identity import DeviceIdentity, IdentityStore
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from tests.fakes import FakeTransport
+from tests.simulator import Simulator
+
+
+async def test_failed_setup_releases_the_transport(hass: HomeAssistant):
+    await async_setup(hass, {})
+    async with Simulator() as simulator:
+        host, port = simulator.host, simulator.port
+    # nothing listens on the port anymore
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_HOST: host, CONF_PORT: port})
+    entry.add_to_hass(hass)
+
+    with pytest.raises(ConfigEntryNotReady):
+        await async_setup_entry(hass, entry)
+
+    # the next attempt starts with a transport of its own
+    registry: api.TransportRegistry = hass.data[DATA_TRANSPORTS]
+    created: list[api.Transport] = []
+
+    def factory() -> api.Transport:
+        created.append(FakeTransport())
+        return created[-1]
+
+    registry.acquire(host=host, port=port, factory=factory)
+    assert created
+
+
+def _cached_identity(simulator: Simulator) -> DeviceIdentity:
+    return DeviceIdentity(
+        serial_number="SIM00000001",
+        name="C5 simulator",
+        firmware_version=simulator.firmware_version,
+        is_extended=True,
+        flow_units=api.FlowUnits.CUBIC_METER_PER_HOUR,
+    )
+
+
+def _fail_firmware_reads(monkeypatch: pytest.MonkeyPatch) -> list[None]:
+    """Make the firmware version unreadable, returns the attempts at reading it."""
+    attempts: list[None] = []
+
+    async def read_firmware_version(_service: api.Service) -> int:
+        attempts.append(None)
+        raise TimeoutError
+
+    monkeypatch.setattr(api.Service, "read_firmware_version", read_firmware_version)
+    return attempts
+
+
+def _reloads(hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    reloads: list[str] = []
+    monkeypatch.setattr(hass.config_entries, "async_schedule_reload", reloads.append)
+    return reloads
+
+
+async def _poll(hass: HomeAssistant, coordinator: KomfoventCoordinator) -> None:
+    await coordinator.async_refresh()
+    # the identity is revalidated in the background
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_incomplete_identity_matching_the_cache_is_verified(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    store = IdentityStore(hass, coordinator.config_entry.entry_id)
+    await store.async_save(_cached_identity(simulator))
+    reloads = _reloads(hass, monkeypatch)
+    attempts = _fail_firmware_reads(monkeypatch)
+
+    await coordinator.async_config_entry_first_refresh()
+    for _ in range(3):
+        await _poll(hass, coordinator)
+    assert coordinator.last_update_success
+    assert len(attempts) == 1
+    assert await store.async_load() == _cached_identity(simulator)
+    assert not reloads
+    await coordinator.async_shutdown()
+
+
+async def test_incomplete_identity_is_not_persisted(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    store = IdentityStore(hass, coordinator.config_entry.entry_id)
+    await store.async_save(_cached_identity(simulator))
+    reloads = _reloads(hass, monkeypatch)
+    simulator.set_field(api.SETTINGS_BLOCK["ahu_name"], (b"renamed",))
+
+    # the rename alone is no reason to trust a guess of the register set
+    with monkeypatch.context() as patch:
+        attempts = _fail_firmware_reads(patch)
+        await coordinator.async_config_entry_first_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(attempts) == 1
+    assert await store.async_load() == _cached_identity(simulator)
+    assert not reloads
+
+    # but a complete read on the next poll is
+    await _poll(hass, coordinator)
+    assert (await store.async_load()).name == "renamed"
+    assert reloads == [coordinator.config_entry.entry_id]
+    await coordinator.async_shutdown()
+
+
+async def test_incomplete_identity_retries_are_limited(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    store = IdentityStore(hass, coordinator.config_entry.entry_id)
+    await store.async_save(_cached_identity(simulator))
+    reloads = _reloads(hass, monkeypatch)
+    simulator.set_field(api.SETTINGS_BLOCK["ahu_name"], (b"renamed",))
+    attempts = _fail_firmware_reads(monkeypatch)
+
+    await coordinator.async_config_entry_first_refresh()
+    for _ in range(5):
+        await _poll(hass, coordinator)
+    assert len(attempts) == 3
+    assert await store.async_load() == _cached_identity(simulator)
+    assert not reloads
+    await coordinator.async_shutdown()
+
+
+async def test_incomplete_identity_at_setup_is_not_persisted(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    store = IdentityStore(hass, coordinator.config_entry.entry_id)
+    reloads = _reloads(hass, monkeypatch)
+
+    with monkeypatch.context() as patch:
+        _fail_firmware_reads(patch)
+        await coordinator.async_config_entry_first_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+    assert coordinator.last_update_success
+    assert not coordinator.identity.is_extended
+    assert await store.async_load() is None
+    assert not reloads
+
+    await _poll(hass, coordinator)
+    assert await store.async_load() == _cached_identity(simulator)
+    assert reloads == [coordinator.config_entry.entry_id]
+    await coordinator.async_shutdown()
+
+
+async def test_write_shortens_the_next_poll(hass: HomeAssistant, simulator: Simulator):
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: simulator.host, CONF_PORT: simulator.port}
+    )
+    entry.add_to_hass(hass)
+    client = api.Client(host=simulator.host, port=simulator.port)
+    coordinator = KomfoventCoordinator(
+        hass,
+        entry,
+        client,
+        min_interval=timedelta(seconds=5),
+        max_interval=timedelta(minutes=10),
+    )
+    simulator.set_field(api.AHU_ON, False)
+    await coordinator.async_config_entry_first_refresh()
+    updates: list[None] = []
+    remove_listener = coordinator.async_add_listener(lambda: updates.append(None))
+    # backs off all the way while the unit is stopped
+    while coordinator.update_interval < timedelta(minutes=10):
+        await coordinator.async_refresh()
+    updates.clear()
+
+    await api.Modes(client).set_operation_mode(api.OperationMode.COMFORT2)
+    # at most one and a half of the minimum interval until the next slot
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert updates
+    assert coordinator.data.modes.operation_mode == api.OperationMode.COMFORT2
+
+    remove_listener()
+    await coordinator.async_shutdown()
+
+
+async def test_changed_fields(simulator: Simulator):
+    client = api.Client(host=simulator.host, port=simulator.port)
+    await client.connect()
+    previous = await KomfoventState.read(
+        client,
+        units=api.FlowUnits.CUBIC_METER_PER_HOUR,
+        is_extended=True,
+        tiers=set(api.PollTier),
+    )
+    await client.disconnect()
+
+    monitoring = dataclasses.replace(
+        previous.monitoring, supply_temp=previous.monitoring.supply_temp + 1.0
+    )
+    state = dataclasses.replace(previous, monitoring=monitoring, alarm_history_count=3)
+    assert _changed_fields(previous, state) == {
+        "monitoring",
+        "monitoring.supply_temp",
+        "alarm_history_count",
+    }
+    # a tier that was read again without changes
+    state = dataclasses.replace(previous, modes=dataclasses.replace(previous.modes))
+    assert _changed_fields(previous, state) == set()
+    assert _changed_fields(previous, previous) == set()
+
+
+def _coordinator(
+    hass: HomeAssistant,
+    simulator: Simulator,
+    monkeypatch: pytest.MonkeyPatch,
+    **kwargs: Any,
+) -> tuple[KomfoventCoordinator, list[None]]:
+    """Coordinator for the simulator, and the refreshes that are requested from it."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: simulator.host, CONF_PORT: simulator.port}
+    )
+    entry.add_to_hass(hass)
+    client = api.Client(host=simulator.host, port=simulator.port)
+    coordinator = KomfoventCoordinator(hass, entry, client, **kwargs)
+    refreshes: list[None] = []
+
+    async def request_refresh() -> None:
+        refreshes.append(None)
+
+    monkeypatch.setattr(coordinator, "async_request_refresh", request_refresh)
+    return coordinator, refreshes
+
+
+async def _polls_config(coordinator: KomfoventCoordinator) -> bool:
+    """Poll once, tell whether the poll read the configuration tier."""
+    address = api.FUNCTIONS_BLOCK["ocv_enabled"].address
+    reads: list[api.Transaction] = []
+    remove = coordinator.client.add_transaction_listener(reads.append)
+    try:
+        await coordinator.async_refresh()
+    finally:
+        remove()
+    return any(
+        read.operation == "read" and read.address <= address < read.address + read.count
+        for read in reads
+    )
+
+
+async def test_written_value_is_confirmed(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_config_entry_first_refresh()
+    await api.Modes(coordinator.client).set_operation_mode(api.OperationMode.COMFORT2)
+    await coordinator.async_written("modes.operation_mode", api.OperationMode.COMFORT2)
+
+    assert coordinator.data.modes.operation_mode == api.OperationMode.COMFORT2
+    assert coordinator.changed_fields == {"modes", "modes.operation_mode"}
+    assert not refreshes
+    await coordinator.async_shutdown()
+
+
+async def test_confirmed_write_keeps_the_config(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_config_entry_first_refresh()
+    await api.Functions(coordinator.client).set_ocv_enabled(True)
+    await coordinator.async_written("functions.ocv_enabled", True)
+
+    assert not await _polls_config(coordinator)
+    assert coordinator.data.functions.ocv_enabled is True
+    await coordinator.async_shutdown()
+
+
+async def test_unconfirmed_write_reads_the_config(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_config_entry_first_refresh()
+    # e.g. by a service call that doesn't go through an entity
+    await api.Functions(coordinator.client).set_ocv_enabled(True)
+
+    assert await _polls_config(coordinator)
+    assert coordinator.data.functions.ocv_enabled is True
+    await coordinator.async_shutdown()
+
+
+async def test_written_value_mismatch_refreshes(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_config_entry_first_refresh()
+    # e.g. the unit rejected the value
+    await coordinator.async_written("modes.operation_mode", api.OperationMode.COMFORT2)
+
+    # shown right away, the refresh corrects it
+    assert coordinator.data.modes.operation_mode == api.OperationMode.COMFORT2
+    assert refreshes
+    assert await _polls_config(coordinator)
+    assert coordinator.data.modes.operation_mode != api.OperationMode.COMFORT2
+    await coordinator.async_shutdown()
+
+
+async def test_written_value_read_failure_refreshes(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_config_entry_first_refresh()
+
+    async def fail_read(_field: api.Field, *, cached: bool = True) -> object:
+        raise TimeoutError
+
+    monkeypatch.setattr(coordinator.client, "read_field", fail_read)
+    await coordinator.async_written("functions.ocv_enabled", True)
+
+    assert coordinator.data.functions.ocv_enabled is True
+    assert refreshes
+    await coordinator.async_shutdown()
+
+
+async def test_written_before_first_state_refreshes(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_written("modes.ahu", True)
+
+    assert coordinator.data is None
+    assert refreshes
+    await coordinator.async_shutdown()
+
+
+async def test_failed_read_fails_the_update(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    coordinator, _refreshes = _coordinator(hass, simulator, monkeypatch)
+    await coordinator.async_config_entry_first_refresh()
+
+    for error in (
+        # opened by another unit behind the same gateway
+        api.CircuitOpenError("device unavailable"),
+        api.ModbusError("gateway target failed", exception_code=0x0B),
+        OSError("no route to host"),
+    ):
+
+        async def fail_read(
+            _ranges: list[api.RegisterRange], error: Exception = error
+        ) -> api.RegisterImage:
+            raise error
+
+        monkeypatch.setattr(coordinator.client, "read_ranges", fail_read)
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+        assert isinstance(coordinator.last_exception, UpdateFailed)
+    await coordinator.async_shutdown()
+
+
+async def test_polls_start_in_the_slot(
+    hass: HomeAssistant, simulator: Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    interval = 0.2
+    coordinator, _refreshes = _coordinator(
+        hass,
+        simulator,
+        monkeypatch,
+        min_interval=timedelta(seconds=interval),
+        max_interval=timedelta(seconds=interval),
+    )
+    await coordinator.async_config_entry_first_refresh()
+    phase = api.poll_phase(coordinator.host_id)
+    updated: list[float] = []
+    remove_listener = coordinator.async_add_listener(
+        lambda: updated.append(time.time())
+    )
+    await asyncio.sleep(6 * interval)
+
+    assert len(updated) >= 3
+    for update in updated:
+        # how long after the start of its slot the poll finished
+        lag = (update - phase * interval) % interval
+        assert lag < 0.02
+    remove_listener()
+    await coordinator.async_shutdown()
@@ -0,0 +1,546 @@
+"""Modbus TCP server that behaves like a C5 controller, for tests and measurements without a unit."""
+
+import asyncio
+import contextlib
+import datetime
+import logging
+import math
+import random
+import struct
+import time
+from collections.abc import Callable, Iterable
+from types import TracebackType
+from typing import Any
+
+from komfovent_c5.api import determine_is_extended
+from komfovent_c5.api.alarms import (
+    ACTIVE_ALARMS_BLOCK,
+    HISTORY_COUNT,
+    HISTORY_ENTRY_BLOCK,
+    Alarms,
+)
+from komfovent_c5.api.functions import FUNCTIONS_BLOCK
+from komfovent_c5.api.modes import AHU_ON, MODE_BLOCKS, MODES_BLOCK, OperationMode
+from komfovent_c5.api.monitoring import (
+    MONITORING_BLOCK1,
+    MONITORING_BLOCK2,
+    C5Status,
+    CountersEfficienciesConfiguration,
+)
+from komfovent_c5.api.registers import Field, RegisterBlock
+from komfovent_c5.api.service import CONTROLLER_FW_VERSION
+from komfovent_c5.api.settings import SETTINGS_BLOCK, FlowUnits
+from komfovent_c5.api.transport import DEFAULT_UNIT, MAX_READ_COUNT
+
+__all__ = [
+    "Simulator",
+]
+
+_LOGGER = logging.getLogger(__name__)
+
+# firmware that supports the extended register set
+DEFAULT_FIRMWARE_VERSION = 2116
+
+_READ_HOLDING_REGISTERS = 0x03
+_WRITE_SINGLE_REGISTER = 0x06
+_WRITE_MULTIPLE_REGISTERS = 0x10
+
+_ILLEGAL_FUNCTION = 0x01
+_ILLEGAL_DATA_ADDRESS = 0x02
+_ILLEGAL_DATA_VALUE = 0x03
+_GATEWAY_TARGET_FAILED = 0x0B
+
+# transaction id, protocol id, length, unit
+_MBAP = struct.Struct(">HHHB")
+
+# magic value that resets the active alarms when written to the alarm count
+_ALARM_RESET = 0x99C5
+
+# time constants of the simulated unit, in seconds
+_FLOW_RESPONSE = 20.0
+_TEMP_RESPONSE = 120.0
+# flow that corresponds to a fan level of 100%
+_NOMINAL_FLOW = 600
+
+
+def _encode(field: Field, value: Any) -> list[int]:
+    if not isinstance(value, tuple):
+        return field.encode(value)
+    buffer = struct.pack(">" + field.format, *value)
+    return list(struct.unpack(f">{field.count}H", buffer))
+
+
+def _block_addresses(block: RegisterBlock, *, is_extended: bool) -> set[int]:
+    return {
+        field.address + offset
+        for field in block.fields
+        if is_extended or not field.extended
+        for offset in range(field.count)
+    }
+
+
+class Simulator:
+    """Emulates the holding registers of a C5 controller.
+
+    The register map follows the blocks defined by the API, so everything the API reads can be served.
+    Registers of the extended set only exist if the firmware version supports them, reading or writing
+    them otherwise fails with an "illegal data address" exception, like on an older unit.
+    Undocumented registers between documented ones read as zero.
+
+    The monitoring values follow the configuration: flows and temperatures approach the setpoints of the
+    active mode with some noise, the outdoor temperature follows the time of day and the counters keep
+    counting while the unit is running. Writes to the configuration take effect immediately.
+
+    Every request is answered after `latency` plus up to `jitter` seconds. Requests are handled
+    concurrently, so pipelined clients work as well.
+    """
+
+    firmware_version: int
+    is_extended: bool
+    unit: int
+    latency: float
+    jitter: float
+    max_read_count: int
+
+    _registers: dict[int, int]
+    # fractional part of the counters, they only move in whole units
+    _fractions: dict[int, float]
+    _readable: set[int]
+    _writable: set[int]
+    _rng: random.Random
+    _clock: Callable[[], float]
+    _updated: float
+    _server: asyncio.Server | None
+    _connections: dict[asyncio.Task[None], asyncio.StreamWriter]
+
+    def __init__(
+        self,
+        *,
+        firmware_version: int = DEFAULT_FIRMWARE_VERSION,
+        is_extended: bool | None = None,
+        unit: int = DEFAULT_UNIT,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        max_read_count: int = MAX_READ_COUNT,
+        flow_units: FlowUnits = FlowUnits.CUBIC_METER_PER_HOUR,
+        serial_number: str = "SIM00000001",
+        name: str = "C5 simulator",
+        seed: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.firmware_version = firmware_version
+        self.is_extended = (
+            determine_is_extended(version=firmware_version)
+            if is_extended is None
+            else is_extended
+        )
+        self.unit = unit
+        self.latency = latency
+        self.jitter = jitter
+        self.max_read_count = max_read_count
+        self._rng = random.Random(seed)
+        self._clock = clock
+        self._updated = clock()
+        self._server = None
+        self._connections = {}
+
+        self._registers = {}
+        self._fractions = {}
+        self._readable = set()
+        self._writable = set()
+        self._init_registers(
+            flow_units=flow_units, serial_number=serial_number, name=name
+        )
+
+    # -- register map
+
+    def _init_registers(
+        self, *, flow_units: FlowUnits, serial_number: str, name: str
+    ) -> None:
+        is_extended = self.is_extended
+        for block in (MODES_BLOCK, *MODE_BLOCKS.values(), FUNCTIONS_BLOCK):
+            self._writable |= _block_addresses(block, is_extended=is_extended)
+        self._writable |= {AHU_ON.address, ACTIVE_ALARMS_BLOCK["count"].address}
+        for block in (
+            MODES_BLOCK,
+            *MODE_BLOCKS.values(),
+            FUNCTIONS_BLOCK,
+            SETTINGS_BLOCK,
+            ACTIVE_ALARMS_BLOCK,
+            MONITORING_BLOCK1,
+            MONITORING_BLOCK2,
+        ):
+            self._readable |= _block_addresses(block, is_extended=is_extended)
+        history_range = HISTORY_ENTRY_BLOCK.range(is_extended=False)
+        self._readable |= {
+            AHU_ON.address,
+            HISTORY_COUNT.address,
+            CONTROLLER_FW_VERSION.address,
+            *range(
+                history_range.address,
+                history_range.address + Alarms.MAX_HISTORY_ALERTS * history_range.count,
+            ),
+        }
+
+        self.set_field(AHU_ON, True)
+        self.set_field(MODES_BLOCK["operation_mode"], OperationMode.COMFORT1)
+        for block in (MODES_BLOCK, FUNCTIONS_BLOCK):
+            for field in block.fields:
+                if field.name == "operation_mode":
+                    continue
+                self.set_field(field, 0)
+        if is_extended:
+            self.set_field(MODES_BLOCK["vav_sensors_range"], 1000)
+            self.set_field(MODES_BLOCK["nominal_supply_pressure"], 200)
+            self.set_field(MODES_BLOCK["nominal_exhaust_pressure"], 200)
+        for mode, (supply, extract, temp) in {
+            OperationMode.COMFORT1: (400, 400, 21.0),
+            OperationMode.COMFORT2: (500, 500, 22.0),
+            OperationMode.ECONOMY1: (250, 250, 19.0),
+            OperationMode.ECONOMY2: (150, 150, 18.0),
+            OperationMode.SPECIAL: (550, 450, 20.0),
+        }.items():
+            block = MODE_BLOCKS[mode]
+            self.set_field(block["supply_flow"], supply)
+            self.set_field(block["extract_flow"], extract)
+            self.set_field(block["setpoint_temperature"], temp)
+        self.set_field(MODE_BLOCKS[OperationMode.SPECIAL]["configuration"], 0b11)
+
+        now = datetime.datetime.now()
+        self.set_field(SETTINGS_BLOCK["time"], (now.hour, now.minute, now.second))
+        self.set_field(SETTINGS_BLOCK["date"], (now.month, now.day, now.year))
+        self.set_field(SETTINGS_BLOCK["language"], 0)
+        self.set_field(SETTINGS_BLOCK["modbus_address"], self.unit)
+        self.set_field(SETTINGS_BLOCK["ip_address"], 0xC0A8_0032)
+        self.set_field(SETTINGS_BLOCK["flow_units"], flow_units)
+        self.set_field(
+            SETTINGS_BLOCK["ahu_serial_number"], (serial_number.encode("latin-1"),)
+        )
+        self.set_field(SETTINGS_BLOCK["ahu_name"], (name.encode("latin-1"),))
+        if is_extended:
+            self.set_field(SETTINGS_BLOCK["ip_mask"], 0xFFFF_FF00)
+            self.set_field(SETTINGS_BLOCK["rs_485"], 0b1_0000)
+            self.set_field(SETTINGS_BLOCK["daylight_saving_time"], 1)
+            self.set_field(SETTINGS_BLOCK["bacnet_port"], 47808)
+            self.set_field(SETTINGS_BLOCK["bacnet_id"], 1)
+        self.set_field(CONTROLLER_FW_VERSION, self.firmware_version)
+        self.set_field(HISTORY_COUNT, 0)
+        self.set_field(ACTIVE_ALARMS_BLOCK["count"], 0)
+
+        for field in MONITORING_BLOCK2.fields:
+            self.set_field(field, 0)
+        self.set_field(
+            MONITORING_BLOCK2["efficiencies_configuration"],
+            ~CountersEfficienciesConfiguration(0),
+        )
+        self.set_field(MONITORING_BLOCK1["extract_temp"], 21.5)
+        self.set_field(MONITORING_BLOCK1["supply_temp"], 18.0)
+        self._update(0.0)
+
+    def set_field(self, field: Field, value: Any) -> None:
+        """Set a field of the register map, multi-item formats take a tuple."""
+        self.set_registers(field.address, _encode(field, value))
+
+    def field(self, field: Field) -> Any:
+        return field.unpack(self.registers(field.address, field.count))
+
+    def set_registers(self, address: int, values: Iterable[int]) -> None:
+        for offset, value in enumerate(values):
+            self._registers[address + offset] = value & 0xFFFF
+
+    def registers(self, address: int, count: int) -> list[int]:
+        return [self._registers.get(address + i, 0) for i in range(count)]
+
+    # -- alarms
+
+    def raise_alarm(
+        self, code: int, timestamp: datetime.datetime | None = None
+    ) -> None:
+        """Make an alarm active and add it to the front of the history."""
+        count_field = ACTIVE_ALARMS_BLOCK["count"]
+        count = self.field(count_field)
+        if count < Alarms.MAX_ACTIVE_ALERTS:
+            self.set_registers(ACTIVE_ALARMS_BLOCK["codes"].address + count, [code])
+            self.set_field(count_field, count + 1)
+
+        entry = HISTORY_ENTRY_BLOCK.range(is_extended=False)
+        history_count = self.field(HISTORY_COUNT)
+        # the newest entry comes first, the oldest one drops out once the history is full
+        kept = min(history_count, Alarms.MAX_HISTORY_ALERTS - 1)
+        self.set_registers(
+            entry.address + entry.count,
+            self.registers(entry.address, kept * entry.count),
+        )
+        if timestamp is None:
+            timestamp = datetime.datetime.now()
+        self.set_field(
+            HISTORY_ENTRY_BLOCK["timestamp"],
+            (
+                timestamp.year,
+                timestamp.month,
+                timestamp.day,
+                timestamp.hour,
+                timestamp.minute,
+                timestamp.second,
+            ),
+        )
+        self.set_field(HISTORY_ENTRY_BLOCK["alarm"], code)
+        self.set_field(HISTORY_COUNT, kept + 1)
+
+    # -- dynamics
+
+    def _update(self, elapsed: float) -> None:
+        rng = self._rng
+        running = bool(self.field(AHU_ON))
+        mode = OperationMode(self.field(MODES_BLOCK["operation_mode"]))
+        block1 = MONITORING_BLOCK1
+        block2 = MONITORING_BLOCK2
+
+        mode_block = MODE_BLOCKS.get(mode, MODE_BLOCKS[OperationMode.COMFORT1])
+        supply_setpoint = self.field(mode_block["supply_flow"]) if running else 0
+        extract_setpoint = self.field(mode_block["extract_flow"]) if running else 0
+        temp_setpoint = self.field(mode_block["setpoint_temperature"])
+
+        self.set_field(
+            block1["c5_status"], C5Status.RUNNING if running else C5Status.STOP
+        )
+        self.set_field(block1["mode"], mode)
+        self.set_field(block1["supply_flow_setpoint"], supply_setpoint)
+        self.set_field(block1["extract_flow_setpoint"], extract_setpoint)
+        self.set_field(block1["temp_setpoint"], temp_setpoint)
+        self.set_field(block1["supply_air_temp_setpoint"], temp_setpoint)
+
+        # first order lag towards the target, the noise keeps the values from settling completely
+        def approach(current: float, target: float, response: float) -> float:
+            return target + (current - target) * math.exp(-elapsed / response)
+
+        flow_noise = 1.0 + rng.uniform(-0.01, 0.01)
+        supply_flow = round(
+            approach(self.field(block1["supply_flow"]), supply_setpoint, _FLOW_RESPONSE)
+            * flow_noise
+        )
+        exhaust_flow = round(
+            approach(
+                self.field(block1["exhaust_flow"]), extract_setpoint, _FLOW_RESPONSE
+            )
+            * flow_noise
+        )
+        self.set_field(block1["supply_flow"], supply_flow)
+        self.set_field(block1["exhaust_flow"], exhaust_flow)
+        supply_level = min(100.0, 100.0 * supply_flow / _NOMINAL_FLOW)
+        exhaust_level = min(100.0, 100.0 * exhaust_flow / _NOMINAL_FLOW)
+        self.set_field(block1["supply_fan_level"], supply_level)
+        self.set_field(block1["exhaust_fan_level"], exhaust_level)
+
+        # warmest in the afternoon
+        now = datetime.datetime.now()
+        hour = now.hour + now.minute / 60
+        outdoor_temp = 5.0 + 6.0 * math.sin((hour - 9.0) / 24.0 * 2.0 * math.pi)
+        outdoor_temp += rng.gauss(0.0, 0.1)
+        extract_temp = approach(self.field(block1["extract_temp"]), 21.5, 3600.0)
+        extract_temp += rng.gauss(0.0, 0.05)
+        efficiency = 80 if running else 0
+        recovered = outdoor_temp + (extract_temp - outdoor_temp) * efficiency / 100
+        supply_temp = approach(
+            self.field(block1["supply_temp"]),
+            max(recovered, temp_setpoint) if running else extract_temp,
+            _TEMP_RESPONSE,
+        )
+        supply_temp += rng.gauss(0.0, 0.05)
+        exhaust_temp = extract_temp - (extract_temp - outdoor_temp) * efficiency / 100
+        self.set_field(block1["outdoor_temp"], round(outdoor_temp, 1))
+        self.set_field(block1["extract_temp"], round(extract_temp, 1))
+        self.set_field(block1["supply_temp"], round(supply_temp, 1))
+        self.set_field(block1["exhaust_temp"], round(exhaust_temp, 1))
+        if self.is_extended:
+            self.set_field(block1["internal_supply_temp"], round(supply_temp, 1))
+        heater_level = (
+            min(100.0, max(0.0, (temp_setpoint - recovered) * 20.0)) if running else 0.0
+        )
+        self.set_field(block1["electric_heater_level"], round(heater_level, 1))
+        self.set_field(block1["heat_exchanger_level"], 100.0 if running else 0.0)
+        self.set_field(block1["supply_air_humidity"], 40.0 + rng.uniform(-0.5, 0.5))
+        self.set_field(block1["supply_air_pressure"], round(supply_flow / 3))
+        self.set_field(block1["extract_air_pressure"], round(exhaust_flow / 3))
+
+        self.set_field(block2["heat_exchanger_thermal_efficiency"], efficiency)
+        self.set_field(block2["energy_saving"], efficiency)
+        # fan power grows with the cube of the flow
+        supply_power = round(150 * (supply_flow / _NOMINAL_FLOW) ** 3)
+        exhaust_power = round(150 * (exhaust_flow / _NOMINAL_FLOW) ** 3)
+        self.set_field(block2["supply_fan_power"], supply_power)
+        self.set_field(block2["exhaust_fan_power"], exhaust_power)
+        self.set_field(block2["supply_sfp"], 1.2 if running else 0.0)
+        self.set_field(block2["exhaust_sfp"], 1.1 if running else 0.0)
+        if running:
+            hours = elapsed / 3600.0
+            self._count(block2["air_heater_operation_hours"], hours)
+            self._count(block2["supply_fan_operation_hours_or_kwh"], hours)
+            self._count(block2["exhaust_fan_operation_hours_or_kwh"], hours)
+            self._count(block2["heat_exchanger_operation_kwh"], hours * 2.0)
+            self._count(block2["air_heater_operation_kwh"], hours * heater_level / 50)
+
+    def _count(self, field: Field, increment: float) -> None:
+        total = self._fractions.get(field.address, 0.0) + increment
+        whole = int(total)
+        self._fractions[field.address] = total - whole
+        if whole:
+            self.set_field(field, self.field(field) + whole)
+
+    def _tick(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        if elapsed > 0.0:
+            self._update(elapsed)
+
+    # -- requests
+
+    def handle(self, unit: int, pdu: bytes) -> bytes:
+        """Answer the request PDU with a response PDU."""
+        function = pdu[0]
+        if unit not in (self.unit, 0):
+            return bytes((function | 0x80, _GATEWAY_TARGET_FAILED))
+        try:
+            if function == _READ_HOLDING_REGISTERS:
+                address, count = struct.unpack_from(">HH", pdu, 1)
+                registers = self._read(address, count)
+                return struct.pack(f">BB{count}H", function, 2 * count, *registers)
+            if function == _WRITE_SINGLE_REGISTER:
+                address, value = struct.unpack_from(">HH", pdu, 1)
+                self._write(address, [value])
+                return pdu[:5]
+            if function == _WRITE_MULTIPLE_REGISTERS:
+                address, count = struct.unpack_from(">HH", pdu, 1)
+                values = struct.unpack_from(f">{count}H", pdu, 6)
+                self._write(address, values)
+                return pdu[:5]
+        except _ExceptionResponse as exc:
+            return bytes((function | 0x80, exc.code))
+        return bytes((function | 0x80, _ILLEGAL_FUNCTION))
+
+    def _read(self, address: int, count: int) -> list[int]:
+        if not 1 <= count <= self.max_read_count:
+            raise _ExceptionResponse(_ILLEGAL_DATA_VALUE)
+        addresses = range(address, address + count)
+        if not any(address in self._readable for address in addresses):
+            raise _ExceptionResponse(_ILLEGAL_DATA_ADDRESS)
+        if not self.is_extended and self._touches_extended(addresses):
+            raise _ExceptionResponse(_ILLEGAL_DATA_ADDRESS)
+        self._tick()
+        return self.registers(address, count)
+
+    def _write(self, address: int, values: Iterable[int]) -> None:
+        values = list(values)
+        if not 1 <= len(values) <= MAX_READ_COUNT:
+            raise _ExceptionResponse(_ILLEGAL_DATA_VALUE)
+        addresses = range(address, address + len(values))
+        if any(address not in self._writable for address in addresses):
+            raise _ExceptionResponse(_ILLEGAL_DATA_ADDRESS)
+        self._tick()
+        count_address = ACTIVE_ALARMS_BLOCK["count"].address
+        if address == count_address:
+            if values != [_ALARM_RESET]:
+                raise _ExceptionResponse(_ILLEGAL_DATA_VALUE)
+            self.set_registers(count_address, [0])
+            return
+        self.set_registers(address, values)
+
+    def _touches_extended(self, addresses: range) -> bool:
+        return any(
+            field.extended
+            and field.address < addresses.stop
+            and addresses.start < field.address + field.count
+            for block in (MODES_BLOCK, SETTINGS_BLOCK, MONITORING_BLOCK1)
+            for field in block.fields
+        )
+
+    # -- server
+
+    @property
+    def host(self) -> str:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[0]
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening, port 0 picks a free port (see `port`)."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        _LOGGER.debug("simulator listening on %s:%s", self.host, self.port)
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        # the connections end once they see the EOF
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = writer
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP.size)
+                transaction_id, protocol_id, length, unit = _MBAP.unpack(header)
+                pdu = await reader.readexactly(length - 1)
+                if protocol_id != 0:
+                    continue
+                response = asyncio.create_task(
+                    self._respond(writer, transaction_id, unit, pdu)
+                )
+                pending.add(response)
+                response.add_done_callback(pending.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for response in pending:
+                response.cancel()
+            self._connections.pop(task, None)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        transaction_id: int,
+        unit: int,
+        pdu: bytes,
+    ) -> None:
+        delay = self.latency + self._rng.uniform(0.0, self.jitter)
+        if delay > 0.0:
+            await asyncio.sleep(delay)
+        response = self.handle(unit, pdu)
+        writer.write(_MBAP.pack(transaction_id, 0, len(response) + 1, unit) + response)
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+
+    async def __aenter__(self) -> "Simulator":
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+
+class _ExceptionResponse(Exception):
+    def __init__(self, code: int) -> None:
+        super().__init__(code)
+        self.code = code
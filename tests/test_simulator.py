@@ -0,0 +1,45 @@
+import pytest
+from komfovent_c5.api import (
+    Alarms,
+    Client,
+    FlowUnits,
+    ModbusError,
+    Modes,
+    Monitoring,
+    OperationMode,
+)
+
+from tests.simulator import Simulator
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_simulator():
+    async with Simulator(firmware_version=2100, latency=0.001, seed=1) as simulator:
+        assert not simulator.is_extended
+        client = Client(host=simulator.host, port=simulator.port)
+        await client.connect()
+        modes = Modes(client)
+        await modes.set_operation_mode(OperationMode.ECONOMY2)
+        state = await modes.read_all(is_extended=False)
+        assert state.operation_mode == OperationMode.ECONOMY2
+        assert state.vav_sensors_range is None
+
+        monitoring = await Monitoring(client).read_all(
+            units=FlowUnits.CUBIC_METER_PER_HOUR, is_extended=False
+        )
+        assert monitoring.mode == OperationMode.ECONOMY2
+        assert monitoring.supply_flow_setpoint == 150
+
+        # only part of the extended set
+        with pytest.raises(ModbusError) as exc_info:
+            await client.read_many_u16(Modes.REG_VAV_SENSORS_RANGE, 1)
+        assert exc_info.value.exception_code == 0x02
+
+        simulator.raise_alarm(4)
+        alarms = Alarms(client)
+        assert [alarm.code for alarm in await alarms.read_active()] == [4]
+        assert [entry.alarm.code for entry in await alarms.read_history()] == [4]
+        await alarms.reset_active()
+        assert await alarms.read_active() == []
+        await client.disconnect()